@@ -0,0 +1,280 @@
+"""
+Concurrent GPT processing with asyncio and AsyncOpenAI.
+
+Pages are sent with bounded concurrency while a pair of token buckets keeps
+the request rate under the configured requests/minute and tokens/minute
+limits. A 429 pauses every in-flight worker (honouring Retry-After when the
+API sends it) before the page is retried; timeouts, dropped connections and
+5xx errors back off and retry just that request. Results are returned in the same
+order as the input pages.
+
+Requests run on one background event loop per processor, so synchronous
+callers on other threads (the streaming pipeline's GPT workers, queue
+workers) share the same limiter and backoff as batches.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    RateLimitError,
+)
+
+from digitize.ai_processor.cache import ResponseCache
+from digitize.ai_processor.gpt_processor import (
+    EditsError,
+    GPTProcessor,
+    ProcessedText,
+    TruncatedResponseError,
+)
+from digitize.ai_processor.tokens import count_message_tokens
+from digitize.config.settings import OpenAIConfig
+from digitize.ocr.extractor import OCRResult
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Token buckets for requests/minute and tokens/minute; 0 disables a limit."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.rpm = requests_per_minute
+        self.tpm = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    async def acquire(self, tokens: int):
+        """Wait until one request and `tokens` tokens are available, then take them."""
+        if self.tpm:
+            tokens = min(tokens, self.tpm)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._refill()
+                request_ok = not self.rpm or self._requests >= 1
+                tokens_ok = not self.tpm or self._tokens >= tokens
+                if request_ok and tokens_ok:
+                    if self.rpm:
+                        self._requests -= 1
+                    if self.tpm:
+                        self._tokens -= tokens
+                    return
+
+                wait = 0.0
+                if not request_ok:
+                    wait = max(wait, (1 - self._requests) * 60 / self.rpm)
+                if not tokens_ok:
+                    wait = max(wait, (tokens - self._tokens) * 60 / self.tpm)
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Stop handing out capacity for `seconds` (used after a 429)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def _retry_after(error: APIStatusError) -> float | None:
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class AsyncGPTProcessor(GPTProcessor):
+    """GPTProcessor whose requests run concurrently under shared rate limits."""
+
+    def __init__(self, config: OpenAIConfig | None = None):
+        super().__init__(config)
+        self.limiter = RateLimiter(self.config.requests_per_minute, self.config.tokens_per_minute)
+        # Created with the event loop: an AsyncOpenAI client is tied to the loop that uses it
+        self.async_client: AsyncOpenAI | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_lock = threading.Lock()
+
+    def _run(self, coro):
+        """Run a coroutine on the processor's event loop and wait for it (from any thread)."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="gpt-event-loop", daemon=True).start()
+                # Retries are handled here so 429s can pause every worker, not just one
+                self.async_client = AsyncOpenAI(
+                    api_key=self.config.api_key, base_url=self.config.base_url, max_retries=0
+                )
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self):
+        """Close the API clients and stop the event loop."""
+        super().close()
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self.async_client.close(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            self.async_client = None
+
+    def _complete(self, request: dict) -> str:
+        """Synchronous requests (single pages, packs, metadata) go through the shared limiter too."""
+        return self._run(self._acomplete(request, self.limiter))
+
+    def _process_pages(self, ocr_results: list[OCRResult]) -> list[ProcessedText]:
+        """Send pages to GPT concurrently; results keep input order."""
+        return self._run(self.aprocess_batch(ocr_results))
+
+    async def aprocess_batch(self, ocr_results: list[OCRResult]) -> list[ProcessedText]:
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        done = 0
+
+        async def run(group: list[OCRResult]) -> list[ProcessedText]:
+            nonlocal done
+            async with semaphore:
+                processed = await self._aprocess_group(group, self.limiter)
+            done += len(group)
+            logger.info(f"GPT processing {done}/{len(ocr_results)}")
+            return processed
+
+        if self.config.pack_pages and self.config.response_mode != "spans":
+            groups = self.pack_pages(ocr_results)
+        else:
+            groups = [[result] for result in ocr_results]
+
+        # gather() returns results in argument order, i.e. page order
+        results = await asyncio.gather(*(run(group) for group in groups))
+        return [processed for group in results for processed in group]
+
+    async def _aprocess_group(self, group: list[OCRResult], limiter: RateLimiter) -> list[ProcessedText]:
+        """Async _process_group: one packed request, or one request per page as fallback."""
+        if len(group) > 1:
+            try:
+                request = self._packed_request(group)
+                raw_response = await self._acomplete(request, limiter)
+                return self._parse_packed(raw_response, group)
+            except Exception as e:
+                logger.warning(f"Packed request failed ({e}); retrying {len(group)} pages individually")
+
+        processed = []
+        for result in group:
+            try:
+                processed.append(await self.aprocess_text(result, limiter))
+            except Exception as e:
+                logger.error(f"GPT processing failed for {result.file_path} p{result.page_number}: {e}")
+                processed.append(self._empty_result(result, error=str(e)))
+        return processed
+
+    async def aprocess_text(self, ocr_result: OCRResult, limiter: RateLimiter) -> ProcessedText:
+        """Async counterpart of process_text, retrying with backoff on rate limits."""
+        if not ocr_result.raw_text.strip():
+            logger.warning(f"Empty OCR text for {ocr_result.file_path} page {ocr_result.page_number}")
+            return self._empty_result(ocr_result)
+
+        if self.config.response_mode == "spans":
+            spans = self.low_confidence_spans(ocr_result)
+            if spans is not None:
+                return await self._aprocess_spans(ocr_result, spans, limiter)
+
+        chunks = self.split_page(ocr_result)
+        if len(chunks) > 1:
+            logger.info(
+                f"  {ocr_result.file_path} p{ocr_result.page_number} is too long for one request; "
+                f"processing it in {len(chunks)} chunks"
+            )
+            parts = [await self._aprocess_single(chunk, limiter) for chunk in chunks]
+            return self.merge_chunks(ocr_result, parts)
+        return await self._aprocess_single(ocr_result, limiter)
+
+    async def _aprocess_spans(
+        self, ocr_result: OCRResult, spans: list[tuple[int, int]], limiter: RateLimiter
+    ) -> ProcessedText:
+        if not spans:
+            return self._text_only_result(ocr_result, ocr_result.raw_text, "No low-confidence words")
+        raw_response = await self._acomplete(self._spans_request(ocr_result, spans), limiter)
+        try:
+            return self._parse_spans(raw_response, ocr_result, spans)
+        except EditsError as e:
+            logger.warning(f"Span corrections did not apply ({e}); re-requesting full text")
+            request = self._page_request(ocr_result, response_mode="full")
+            return self._parse_response(await self._acomplete(request, limiter), ocr_result)
+
+    async def _aprocess_single(self, ocr_result: OCRResult, limiter: RateLimiter) -> ProcessedText:
+        raw_response = await self._acomplete(self._page_request(ocr_result), limiter)
+        try:
+            return self._parse_response(raw_response, ocr_result)
+        except EditsError as e:
+            logger.warning(f"Corrections did not apply ({e}); re-requesting full text")
+            request = self._page_request(ocr_result, response_mode="full")
+            return self._parse_response(await self._acomplete(request, limiter), ocr_result)
+
+    async def _acomplete(self, request: dict, limiter: RateLimiter) -> str:
+        """
+        Async _complete: cache lookup, then a rate-limited call retried with
+        backoff on 429s, timeouts, connection errors and 5xx responses (up to
+        max_retries). The one retry of a truncated reply with the full
+        max_tokens is not counted against max_retries.
+        """
+        key = ResponseCache.key(request) if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        prompt_tokens = count_message_tokens(request["messages"], self.config.model)
+        sent = request
+        attempt = 0
+        while True:
+            await limiter.acquire(prompt_tokens + sent["max_tokens"])
+            try:
+                response = await self.async_client.chat.completions.create(**sent)
+            except RateLimitError as e:
+                if attempt == self.config.max_retries:
+                    raise
+                delay = _retry_after(e) or min(60.0, 2 ** attempt + random.random())
+                logger.warning(f"Rate limited; pausing all requests for {delay:.1f}s")
+                limiter.pause(delay)
+                attempt += 1
+                continue
+            except (APITimeoutError, APIConnectionError, InternalServerError) as e:
+                if attempt == self.config.max_retries:
+                    raise
+                retry_after = _retry_after(e) if isinstance(e, APIStatusError) else None
+                delay = retry_after or min(60.0, 2 ** attempt + random.random())
+                logger.warning(f"GPT request failed ({e}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            if response.choices[0].finish_reason == "length":
+                if sent["max_tokens"] >= self.config.max_tokens:
+                    raise TruncatedResponseError(f"Response truncated at max_tokens={sent['max_tokens']}")
+                logger.warning(
+                    f"Response truncated at max_tokens={sent['max_tokens']}; retrying with {self.config.max_tokens}"
+                )
+                sent = {**request, "max_tokens": self.config.max_tokens}
+                continue
+
+            raw_response = response.choices[0].message.content
+            # Cached under the original request, which is what later runs will look up
+            self._cache_response(key, raw_response)
+            return raw_response
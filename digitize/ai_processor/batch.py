@@ -0,0 +1,307 @@
+"""
+OpenAI Batch API submission for bulk (overnight) digitization.
+
+Instead of one chat completion per page, every page request for one or more
+books is written to a JSONL file, uploaded through the Files API and run as
+a batch job, which is cheaper and has its own rate limits. Job state (the
+pages, their books and the batch IDs) is kept in a JSON file under
+`OpenAIConfig.batch_dir`, so polling and result collection can resume in a
+new process after a restart.
+
+Pages whose request is already in the GPT response cache are not submitted,
+and collected replies are added to the cache. With the book metadata pass
+enabled, each book's metadata request is submitted in the same batch. Pages
+too long for one request are submitted as several chunk requests and merged
+when collected. Pages are cleaned and routed as in process_batch: local-only
+pages are not submitted, and cheaper-model pages go into their own batches
+(a batch input file may only target one model).
+"""
+
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import asdict, replace
+from pathlib import Path
+
+from digitize.ai_processor.cache import ResponseCache
+from digitize.ai_processor.gpt_processor import BookMetadata, EditsError, GPTProcessor, ProcessedText
+from digitize.ocr.extractor import OCRResult
+
+logger = logging.getLogger(__name__)
+
+ENDPOINT = "/v1/chat/completions"
+# Batch API limit on requests per input file
+MAX_BATCH_REQUESTS = 50000
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class GPTBatchProcessor(GPTProcessor):
+    """Runs page processing through the OpenAI Batch API with resumable job state."""
+
+    def submit(self, books: dict[str, list[OCRResult]], manifest: dict[str, dict] | None = None) -> str:
+        """
+        Write the page requests of `books` ({source: ocr_results}) to JSONL,
+        upload and submit them, and return a local job ID. `manifest` (the
+        size, mtime and hash of each scan file when it was OCR'd) is kept in
+        the job state for storing the books later; see job_manifest().
+        """
+        job_id = time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:8]
+        job_dir = self._job_dir(job_id)
+        job_dir.mkdir(parents=True, exist_ok=True)
+
+        state = {
+            "job_id": job_id,
+            "created_at": time.time(),
+            "sources": list(books),
+            "pages": {},
+            # Metadata-pass request ID -> source
+            "books": {},
+            "cached": {},
+            "batches": [],
+            "manifest": manifest or {},
+        }
+        lines = []
+
+        def add(custom_id: str, request: dict):
+            cached = self.cache.get(ResponseCache.key(request)) if self.cache else None
+            if cached is not None:
+                state["cached"][custom_id] = cached
+            else:
+                lines.append({"custom_id": custom_id, "method": "POST", "url": ENDPOINT, "body": request})
+
+        for source, ocr_results in books.items():
+            pages = [self.clean_page(r) for r in ocr_results]
+            if self.config.book_metadata and any(p.raw_text.strip() for p in pages):
+                custom_id = f"book-{len(state['books'])}"
+                state["books"][custom_id] = source
+                add(custom_id, self._metadata_request(pages))
+
+            for result, page in zip(ocr_results, pages):
+                custom_id = f"page-{len(state['pages'])}"
+                path = self.route(page)
+                # Word boxes are not needed to rebuild ProcessedText; keep state small
+                state["pages"][custom_id] = {
+                    "source": source,
+                    "ocr": asdict(page) | {"words": []},
+                    "original": result.raw_text,
+                    "path": path,
+                }
+                if path in ("empty", "local"):
+                    continue
+                processor = self.processor_for(path)
+                if self.config.response_mode == "spans":
+                    spans = processor.low_confidence_spans(page)
+                    if spans is not None:
+                        # Word data is not kept in the state; store the spans themselves
+                        state["pages"][custom_id]["spans"] = spans
+                        if spans:
+                            add(custom_id, processor._spans_request(page, spans))
+                        continue
+                chunks = processor.split_page(page)
+                if len(chunks) == 1:
+                    add(custom_id, processor._page_request(page))
+                    continue
+                state["pages"][custom_id]["chunks"] = len(chunks)
+                for k, chunk in enumerate(chunks):
+                    add(f"{custom_id}.{k}", processor._page_request(chunk))
+
+        # Persist before uploading so a crash mid-submit leaves a traceable job
+        self._save_state(state)
+
+        by_model: dict[str, list[dict]] = {}
+        for line in lines:
+            by_model.setdefault(line["body"]["model"], []).append(line)
+        inputs = [
+            model_lines[start:start + MAX_BATCH_REQUESTS]
+            for model_lines in by_model.values()
+            for start in range(0, len(model_lines), MAX_BATCH_REQUESTS)
+        ]
+
+        for i, input_lines in enumerate(inputs):
+            input_path = job_dir / f"input-{i}.jsonl"
+            with open(input_path, "w", encoding="utf-8") as f:
+                for line in input_lines:
+                    f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+            with open(input_path, "rb") as f:
+                uploaded = self.client.files.create(file=f, purpose="batch")
+            batch = self.client.batches.create(
+                input_file_id=uploaded.id,
+                endpoint=ENDPOINT,
+                completion_window="24h",
+                metadata={"digitize_job": job_id},
+            )
+            state["batches"].append({"id": batch.id, "input_file_id": uploaded.id, "status": batch.status})
+            self._save_state(state)
+            logger.info(f"  Submitted batch {batch.id} ({len(input_lines)} requests)")
+
+        logger.info(
+            f"Batch job {job_id}: {len(lines)} requests submitted, "
+            f"{len(state['cached'])} served from cache"
+        )
+        return job_id
+
+    def wait(self, job_id: str) -> dict:
+        """Poll the job's batches until all reach a terminal status; returns the job state."""
+        state = self._load_state(job_id)
+        while True:
+            pending = [b for b in state["batches"] if b["status"] not in TERMINAL_STATUSES]
+            if not pending:
+                return state
+
+            for entry in pending:
+                batch = self.client.batches.retrieve(entry["id"])
+                entry.update(
+                    status=batch.status,
+                    output_file_id=batch.output_file_id,
+                    error_file_id=batch.error_file_id,
+                )
+                counts = batch.request_counts
+                progress = f" ({counts.completed}/{counts.total})" if counts else ""
+                logger.info(f"  Batch {batch.id}: {batch.status}{progress}")
+            self._save_state(state)
+
+            if any(b["status"] not in TERMINAL_STATUSES for b in state["batches"]):
+                time.sleep(self.config.batch_poll_seconds)
+
+    def collect(self, job_id: str) -> dict[str, list[ProcessedText]]:
+        """Download batch output and rebuild ProcessedText per page, grouped by source in page order."""
+        state = self._load_state(job_id)
+        responses = dict(state["cached"])
+        errors: dict[str, str] = {}
+
+        for entry in state["batches"]:
+            for file_key in ("output_file_id", "error_file_id"):
+                file_id = entry.get(file_key)
+                if not file_id:
+                    continue
+                content = self.client.files.content(file_id).text
+                for line in content.splitlines():
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    response = record.get("response") or {}
+                    if response.get("status_code") == 200:
+                        choice = response["body"]["choices"][0]
+                        if choice.get("finish_reason") == "length":
+                            errors[record["custom_id"]] = "Response truncated (finish_reason=length)"
+                        else:
+                            responses[record["custom_id"]] = choice["message"]["content"]
+                    else:
+                        errors[record["custom_id"]] = str(record.get("error") or response.get("body"))
+            if entry["status"] != "completed":
+                logger.warning(f"  Batch {entry['id']} ended as '{entry['status']}'")
+
+        results: dict[str, list[ProcessedText]] = {source: [] for source in state["sources"]}
+        for custom_id, page in state["pages"].items():
+            ocr_result = _ocr_from_dict(page["ocr"])
+            path = page.get("path", "gpt")
+            processor = self.processor_for(path)
+            if path == "empty" or not ocr_result.raw_text.strip():
+                processed = self._empty_result(ocr_result)
+            elif path == "local":
+                processed = self._local_result(ocr_result)
+            elif "spans" in page:
+                spans = [tuple(span) for span in page["spans"]]
+                processed = processor._collect_page(custom_id, ocr_result, state, responses, errors, spans)
+            elif page.get("chunks"):
+                parts = [
+                    processor._collect_page(f"{custom_id}.{k}", chunk, state, responses, errors)
+                    for k, chunk in enumerate(processor.split_page(ocr_result))
+                ]
+                processed = self.merge_chunks(ocr_result, parts)
+            else:
+                processed = processor._collect_page(custom_id, ocr_result, state, responses, errors)
+            processed = replace(
+                processed,
+                original_ocr=page.get("original", ocr_result.raw_text),
+                processing_path=path,
+                source_page=ocr_result.source_page,
+            )
+            results[page["source"]].append(processed)
+
+        for custom_id, source in state.get("books", {}).items():
+            book: BookMetadata | None = None
+            try:
+                book = self._parse_book_metadata(responses[custom_id])
+                if self.cache and custom_id not in state["cached"]:
+                    pages = [
+                        _ocr_from_dict(page["ocr"]) for page in state["pages"].values() if page["source"] == source
+                    ]
+                    request = self._metadata_request(pages)
+                    self._cache_response(ResponseCache.key(request), responses[custom_id])
+            except KeyError:
+                logger.warning(f"  No metadata response for {source}: {errors.get(custom_id, 'missing')}")
+            except Exception as e:
+                logger.warning(f"  Unparseable metadata response for {source}: {e}")
+            results[source] = self.apply_book_metadata(results[source], book)
+
+        answered = sum(1 for pages in results.values() for p in pages if p.cleaned_text)
+        logger.info(f"Batch job {job_id}: {answered}/{len(state['pages'])} pages answered")
+        return results
+
+    def job_manifest(self, job_id: str) -> dict[str, dict]:
+        """The scan file manifest recorded when the job was submitted."""
+        return self._load_state(job_id).get("manifest", {})
+
+    def _collect_page(
+        self,
+        custom_id: str,
+        ocr_result: OCRResult,
+        state: dict,
+        responses: dict[str, str],
+        errors: dict[str, str],
+        spans: list[tuple[int, int]] | None = None,
+    ) -> ProcessedText:
+        """ProcessedText for one page, chunk or spans request of a finished job."""
+        if spans == []:
+            return self._text_only_result(ocr_result, ocr_result.raw_text, "No low-confidence words")
+        if custom_id not in responses:
+            return self._empty_result(ocr_result, error=errors.get(custom_id, "No response in batch output"))
+
+        raw_response = responses[custom_id]
+        try:
+            if spans is None:
+                processed = self._parse_response(raw_response, ocr_result)
+            else:
+                processed = self._parse_spans(raw_response, ocr_result, spans)
+        except EditsError as e:
+            # Rare; fix these pages up with an immediate full-text request
+            logger.warning(f"  {custom_id}: corrections did not apply ({e}); requesting full text")
+            try:
+                return self._process_full(ocr_result)
+            except Exception as e:
+                return self._empty_result(ocr_result, error=str(e))
+        except Exception as e:
+            return self._empty_result(ocr_result, error=f"Unparseable batch response: {e}")
+
+        if self.cache and custom_id not in state["cached"]:
+            if spans is None:
+                request = self._page_request(ocr_result)
+            else:
+                request = self._spans_request(ocr_result, spans)
+            self._cache_response(ResponseCache.key(request), raw_response)
+        return processed
+
+    def _job_dir(self, job_id: str) -> Path:
+        return Path(os.path.expanduser(self.config.batch_dir)) / job_id
+
+    def _save_state(self, state: dict):
+        path = self._job_dir(state["job_id"]) / "state.json"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _load_state(self, job_id: str) -> dict:
+        path = self._job_dir(job_id) / "state.json"
+        if not path.is_file():
+            raise FileNotFoundError(f"No batch job state found for '{job_id}' at {path}")
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+
+def _ocr_from_dict(data: dict) -> OCRResult:
+    return OCRResult(**(data | {"words": []}))
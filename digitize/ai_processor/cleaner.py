@@ -0,0 +1,155 @@
+"""
+Local, rule-based cleanup of OCR text.
+
+Runs before GPT processing and fixes the mechanical errors Tesseract output
+reliably contains: ligature glyphs, words hyphenated across line ends, stray
+spacing and a few character confusions inside words. Quotes are left as
+printed, since their style is language-specific.
+
+A line-end hyphen is only removed when the page language's dictionary
+(pyspellchecker) says so: the joined word is known, or the two pieces are
+not both words. "exam-\nple" becomes "example" but "well-\nknown" keeps its
+hyphen. Without a dictionary only soft hyphens are rejoined. An optional
+dictionary pass corrects unknown lowercase words that are exactly one edit
+away from a single known word. High-confidence pages can then skip GPT (see
+GPTProcessor.route).
+"""
+
+import logging
+import re
+from functools import lru_cache
+
+try:
+    from spellchecker import SpellChecker
+except ImportError:  # optional dependency
+    SpellChecker = None
+
+logger = logging.getLogger(__name__)
+
+_TRANSLATION = str.maketrans({
+    # Ligature glyphs
+    "ﬀ": "ff",
+    "ﬁ": "fi",
+    "ﬂ": "fl",
+    "ﬃ": "ffi",
+    "ﬄ": "ffl",
+    "ﬅ": "st",
+    "ﬆ": "st",
+})
+
+# A word hyphenated across a line end: "exam-\nple" (see _join_hyphenated)
+_HYPHEN_BREAK = re.compile(r"([^\W\d_]+)([-\u00ad\u2010])[ \t]*\n[ \t]*([^\W\d_]+)")
+_CONFUSIONS = [
+    (re.compile(r"(?<=[a-z])0(?=[a-z])"), "o"),
+    (re.compile(r"(?<=[a-z])\|(?=[a-z])"), "l"),
+]
+_SPACING = [
+    (re.compile(r"[ \t]+"), " "),
+    (re.compile(r" +\n"), "\n"),
+    (re.compile(r" +([,.)\]])"), r"\1"),
+    (re.compile(r"([(\[]) +"), r"\1"),
+    (re.compile(r"\n{3,}"), "\n\n"),
+]
+_WORD = re.compile(r"\b[^\W\d_]{4,}\b")
+
+# Tesseract pack -> (language name, ISO 639-1 code)
+TESSERACT_LANGUAGES = {
+    "eng": ("English", "en"),
+    "fra": ("French", "fr"),
+    "deu": ("German", "de"),
+    "spa": ("Spanish", "es"),
+    "ita": ("Italian", "it"),
+    "por": ("Portuguese", "pt"),
+    "nld": ("Dutch", "nl"),
+    "pol": ("Polish", "pl"),
+    "tur": ("Turkish", "tr"),
+    "rus": ("Russian", "ru"),
+    "ukr": ("Ukrainian", "uk"),
+    "ara": ("Arabic", "ar"),
+    "fas": ("Persian", "fa"),
+    "heb": ("Hebrew", "he"),
+    "ell": ("Greek", "el"),
+    "hin": ("Hindi", "hi"),
+    "chi_sim": ("Chinese", "zh"),
+    "chi_tra": ("Chinese", "zh"),
+    "jpn": ("Japanese", "ja"),
+    "kor": ("Korean", "ko"),
+}
+# Dictionaries shipped with pyspellchecker
+SPELLCHECK_LANGUAGES = {"en", "es", "fr", "pt", "de", "it", "ru", "ar", "nl", "lv", "eu", "fa"}
+
+
+def language_info(tesseract_lang: str) -> tuple[str, str]:
+    """(name, ISO code) for a single Tesseract pack; ("Unknown", "und") for combinations."""
+    return TESSERACT_LANGUAGES.get(tesseract_lang, ("Unknown", "und"))
+
+
+def _dictionary(language: str):
+    """pyspellchecker dictionary for a Tesseract pack, or None if unavailable."""
+    code = language_info(language)[1]
+    if SpellChecker is None or code not in SPELLCHECK_LANGUAGES:
+        return None
+    return _spell_checker(code)
+
+
+@lru_cache(maxsize=8)
+def _spell_checker(code: str):
+    try:
+        return SpellChecker(language=code, distance=1)
+    except Exception as e:
+        logger.warning(f"No spelling dictionary for '{code}': {e}")
+        return None
+
+
+class LocalCleaner:
+    """Rule-based OCR text cleanup with an optional dictionary spell fix."""
+
+    def __init__(self, spellcheck: bool = False):
+        if spellcheck and SpellChecker is None:
+            logger.warning("pyspellchecker is not installed; dictionary correction is disabled")
+        self.spellcheck = spellcheck and SpellChecker is not None
+
+    def clean(self, text: str, language: str = "") -> str:
+        """Clean `text`; `language` is the Tesseract pack the page was read with."""
+        checker = _dictionary(language)
+        text = text.translate(_TRANSLATION)
+        text = _HYPHEN_BREAK.sub(lambda match: _join_hyphenated(match, checker), text)
+        text = text.replace("\u00ad", "")  # leftover soft hyphens
+        for pattern, replacement in _CONFUSIONS:
+            text = pattern.sub(replacement, text)
+        for pattern, replacement in _SPACING:
+            text = pattern.sub(replacement, text)
+
+        if self.spellcheck and checker is not None:
+            text = _spell_fix(text, checker)
+        return text.strip()
+
+
+def _join_hyphenated(match: re.Match, checker) -> str:
+    """Join a line-end hyphenation unless it may be a real hyphenated compound."""
+    head, hyphen, tail = match.groups()
+    if hyphen == "\u00ad":
+        return head + tail  # a soft hyphen only ever marks a line break
+    if checker is None or not tail.islower():
+        return match.group(0)
+    joined = (head + tail).lower()
+    known = checker.known([joined, head.lower(), tail])
+    if joined in known or not {head.lower(), tail} <= known:
+        return head + tail
+    return match.group(0)
+
+
+def _spell_fix(text: str, checker) -> str:
+    """Replace unknown lowercase words that have exactly one known word one edit away."""
+    words = {w for w in _WORD.findall(text) if w.islower()}  # leave names and acronyms alone
+    unknown = checker.unknown(words)
+    fixes = {}
+    for word in unknown:
+        candidates = checker.candidates(word) or set()
+        if len(candidates) == 1:
+            (candidate,) = candidates
+            if candidate != word:
+                fixes[word] = candidate
+    if not fixes:
+        return text
+    return _WORD.sub(lambda m: fixes.get(m.group(0), m.group(0)), text)
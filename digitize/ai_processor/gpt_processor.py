@@ -12,12 +12,16 @@ Responsibilities:
 
 import json
 import logging
-from dataclasses import dataclass, field
+from collections import Counter
+from dataclasses import dataclass, field, replace
 
 from openai import OpenAI
 
+from digitize.ai_processor.cache import ResponseCache
+from digitize.ai_processor.cleaner import LocalCleaner, language_info
+from digitize.ai_processor.tokens import count_tokens, split_text
 from digitize.config.settings import OpenAIConfig
-from digitize.ocr.extractor import OCRResult
+from digitize.ocr.extractor import TEXT_LAYER, OCRResult
 
 logger = logging.getLogger(__name__)
 
@@ -51,6 +55,161 @@ Always respond in valid JSON with this exact structure:
 }"""
 
 
+BOOK_METADATA_PROMPT = """You are a literary scholar and expert text analyst. You receive raw OCR text
+of the first pages of a scanned physical book (cover, title page, copyright page,
+table of contents, opening text), each introduced by a line "=== PAGE n ===".
+Identify the book as a whole.
+
+Always respond in valid JSON with this exact structure:
+{
+  "title": "book title or null",
+  "author": "author or null",
+  "genre": "genre or null",
+  "estimated_period": "estimated time period of writing or null",
+  "detected_language": "language name of the main text (e.g., English, Arabic, Russian, Japanese)",
+  "language_code": "ISO 639-1 code (e.g., en, ar, ru, ja)",
+  "writing_style": "description of the writing style"
+}"""
+
+PAGE_PROMPT = """You are a literary scholar and expert text analyst. You receive raw OCR text
+extracted from one page of a scanned physical book whose title, author and
+language are already known. Your job is to:
+
+1. CLEAN the text: fix OCR errors, broken words, garbled characters, and formatting issues.
+   Preserve the original language — do NOT translate.
+2. IDENTIFY the chapter/section, key themes and notable passages.
+3. GENERATE a concise summary of the content.
+
+Always respond in valid JSON with this exact structure:
+{
+  "cleaned_text": "the corrected full text preserving original language",
+  "chapter": "detected chapter/section name or null",
+  "themes": ["theme1", "theme2"],
+  "key_passages": ["notable quote or passage 1", "notable quote or passage 2"],
+  "summary": "a concise summary of the content",
+  "confidence_notes": "any issues or uncertainties about the OCR quality or interpretation"
+}"""
+
+EDITS_PROMPT_SUFFIX = """
+
+Do NOT return "cleaned_text". Instead, in its place, return your corrections as a
+list of edits against the raw OCR text:
+  "corrections": [{"offset": <character offset of "original" in the raw text>,
+                   "original": "the exact raw substring being replaced",
+                   "replacement": "the corrected text"}]
+Copy every "original" character for character from the raw text, keep edits from
+overlapping, and return an empty list if the text needs no corrections."""
+
+SPANS_PROMPT = """You are an expert proofreader of OCR output from scanned physical books. You
+receive numbered fragments of one page. In each fragment the text between ⟦ and ⟧
+was read with low confidence by the OCR engine; the text around it is context.
+
+Return the corrected text of each marked span only — not the context. Preserve the
+original language — do NOT translate. If a span is already correct, return it
+unchanged.
+
+Always respond in valid JSON with this exact structure:
+{"corrections": {"1": "corrected text of span 1", "2": "corrected text of span 2"}}"""
+
+PACKED_PROMPT_SUFFIX = """
+
+You may receive SEVERAL pages at once, each introduced by a line "=== PAGE n ===".
+In that case process every page independently and respond with valid JSON of the form:
+{"pages": {"1": <object with the structure above for page 1>, "2": <...>, ...}}
+with exactly one entry per page number given, and no other keys."""
+
+# Prompt tokens added per page by the packed-page delimiters and instructions
+PACKED_PAGE_OVERHEAD_TOKENS = 20
+
+# Output budget per request: the cleaned text is about as long as the OCR text
+# (plus JSON escaping), and each page adds summary, themes and passages
+OUTPUT_TOKEN_RATIO = 1.3
+OUTPUT_OVERHEAD_TOKENS = 500
+METADATA_MAX_TOKENS = 600
+
+# Pages with a larger share of low-confidence words get a full-page request instead
+SPANS_MAX_LOW_RATIO = 0.5
+# How far an OCR word may sit from the previous one in raw_text and still be matched
+SPANS_MAX_GAP = 20
+SPAN_OVERHEAD_TOKENS = 10
+
+
+class TruncatedResponseError(ValueError):
+    """The model stopped at max_tokens (finish_reason "length"), so its JSON is incomplete."""
+
+
+class EditsError(ValueError):
+    """A correction list that cannot be applied cleanly to the raw OCR text."""
+
+
+def apply_edits(text: str, edits: list) -> str:
+    """
+    Apply a list of {"offset", "original", "replacement"} edits to `text`.
+
+    Each edit is anchored on its `original` substring; the offset only chooses
+    between several occurrences (the nearest one wins), since models are not
+    exact at counting characters. Raises EditsError if an edit is malformed,
+    its original text is not found, or two edits overlap.
+    """
+    if not isinstance(edits, list):
+        raise EditsError("corrections is not a list")
+
+    spans = []
+    for edit in edits:
+        if not isinstance(edit, dict):
+            raise EditsError(f"malformed edit: {edit!r}")
+        original = edit.get("original")
+        replacement = edit.get("replacement")
+        if not isinstance(original, str) or not original or not isinstance(replacement, str):
+            raise EditsError(f"malformed edit: {edit!r}")
+
+        positions = []
+        start = text.find(original)
+        while start != -1:
+            positions.append(start)
+            start = text.find(original, start + 1)
+        if not positions:
+            raise EditsError(f"original text not found: {original[:40]!r}")
+
+        hint = edit.get("offset")
+        if isinstance(hint, int):
+            start = min(positions, key=lambda p: abs(p - hint))
+        else:
+            start = positions[0]
+        spans.append((start, start + len(original), replacement))
+
+    spans.sort()
+    parts = []
+    position = 0
+    for start, end, replacement in spans:
+        if start < position:
+            raise EditsError(f"overlapping edits at offset {start}")
+        parts.append(text[position:start])
+        parts.append(replacement)
+        position = end
+    parts.append(text[position:])
+    return "".join(parts)
+
+
+def _text_source(ocr_result: OCRResult) -> str:
+    """How a page's text was obtained, for the prompt."""
+    if ocr_result.tier == TEXT_LAYER:
+        return "embedded PDF text layer, not OCR"
+    return f"OCR confidence: {ocr_result.confidence}%"
+
+
+@dataclass
+class BookMetadata:
+    """Book-level facts from the metadata pass, shared by every page of the book."""
+    title: str | None = None
+    author: str | None = None
+    genre: str | None = None
+    estimated_period: str | None = None
+    detected_language: str = "Unknown"
+    language_code: str = "und"
+    writing_style: str = ""
+
+
 @dataclass
 class ProcessedText:
     original_ocr: str
@@ -70,6 +229,13 @@ class ProcessedText:
     ocr_confidence: float
     source_file: str
     page_number: int
+    page_hash: str = ""
+    # How the page was processed: "gpt", "cheap" (cheaper model), "local" (no GPT call) or "empty"
+    processing_path: str = "gpt"
+    # Set when processing failed, so checkpointed runs can retry the page
+    error: str = ""
+    # Page number within source_file (page_number is the page in the book)
+    source_page: int = 0
 
 
 class GPTProcessor:
@@ -77,7 +243,18 @@ class GPTProcessor:
 
     def __init__(self, config: OpenAIConfig | None = None):
         self.config = config or OpenAIConfig()
-        self.client = OpenAI(api_key=self.config.api_key)
+        self.client = OpenAI(api_key=self.config.api_key, base_url=self.config.base_url)
+        self.cache = (
+            ResponseCache(
+                self.config.cache_path,
+                ttl_seconds=self.config.cache_ttl_days * 86400,
+                max_bytes=self.config.cache_max_mb * 1024 * 1024,
+            )
+            if self.config.cache_enabled
+            else None
+        )
+        self.cleaner = LocalCleaner(self.config.spellcheck) if self.config.local_cleanup else None
+        self._cheap_processor: GPTProcessor | None = None
 
     def process_text(self, ocr_result: OCRResult) -> ProcessedText:
         """Send OCR text to GPT for cleaning, understanding, and structuring."""
@@ -90,37 +267,254 @@ class GPTProcessor:
             f"({len(ocr_result.raw_text)} chars)"
         )
 
+        if self.config.response_mode == "spans":
+            spans = self.low_confidence_spans(ocr_result)
+            if spans is not None:
+                return self._process_spans(ocr_result, spans)
+
+        chunks = self.split_page(ocr_result)
+        if len(chunks) > 1:
+            logger.info(f"  Page is too long for one request; processing it in {len(chunks)} chunks")
+            return self.merge_chunks(ocr_result, [self._process_single(chunk) for chunk in chunks])
+        return self._process_single(ocr_result)
+
+    def _process_single(self, ocr_result: OCRResult) -> ProcessedText:
+        raw_response = self._complete(self._page_request(ocr_result))
+        try:
+            return self._parse_response(raw_response, ocr_result)
+        except EditsError as e:
+            logger.warning(f"Corrections did not apply ({e}); re-requesting full text")
+            return self._process_full(ocr_result)
+
+    def _process_full(self, ocr_result: OCRResult) -> ProcessedText:
+        """Synchronous full-text request, the fallback when a correction list does not apply."""
+        request = self._page_request(ocr_result, response_mode="full")
+        return self._parse_response(self._complete(request), ocr_result)
+
+    def low_confidence_spans(self, ocr_result: OCRResult) -> list[tuple[int, int]] | None:
+        """
+        Character ranges of `raw_text` covering runs of consecutive OCR words
+        below `span_confidence`. Words are matched to the text in reading
+        order; words the local cleaner changed are not found and count as
+        confident. Returns None when the page has no word data or too large a
+        share of it is low-confidence, i.e. when a full-page request is better.
+        """
+        words = [w for w in ocr_result.words if w.text.strip()]
+        if not words:
+            return None
+        low = sum(1 for w in words if w.confidence < self.config.span_confidence)
+        if low / len(words) > SPANS_MAX_LOW_RATIO:
+            return None
+
+        text = ocr_result.raw_text
+        spans: list[tuple[int, int]] = []
+        run: tuple[int, int] | None = None
+        cursor = 0
+        for word in words:
+            start = text.find(word.text, cursor, cursor + SPANS_MAX_GAP + len(word.text))
+            if start != -1:
+                cursor = start + len(word.text)
+                if word.confidence < self.config.span_confidence:
+                    run = (run[0] if run else start, cursor)
+                    continue
+            if run:
+                spans.append(run)
+                run = None
+        if run:
+            spans.append(run)
+        return spans
+
+    def _process_spans(self, ocr_result: OCRResult, spans: list[tuple[int, int]]) -> ProcessedText:
+        """Correct only the low-confidence spans of a page; the rest of the text is kept as is."""
+        if not spans:
+            return self._text_only_result(ocr_result, ocr_result.raw_text, "No low-confidence words")
+        raw_response = self._complete(self._spans_request(ocr_result, spans))
+        try:
+            return self._parse_spans(raw_response, ocr_result, spans)
+        except EditsError as e:
+            logger.warning(f"Span corrections did not apply ({e}); re-requesting full text")
+            return self._process_full(ocr_result)
+
+    def _spans_request(self, ocr_result: OCRResult, spans: list[tuple[int, int]]) -> dict:
+        text = ocr_result.raw_text
+        context = self.config.span_context_chars
+
+        fragments = "\n".join(
+            # Context is flattened to one line per fragment; the span itself is sent verbatim
+            f"[{i}] {text[max(0, start - context):start].replace(chr(10), ' ')}"
+            f"⟦{text[start:end]}⟧{text[end:end + context].replace(chr(10), ' ')}"
+            for i, (start, end) in enumerate(spans, start=1)
+        )
         user_message = (
-            f"Here is raw OCR text extracted from a scanned book page "
-            f"(OCR confidence: {ocr_result.confidence}%):\n\n"
-            f"---\n{ocr_result.raw_text}\n---\n\n"
-            f"Please clean, analyze, and structure this text."
+            f"OCR language: {ocr_result.language}. Low-confidence spans from one page:\n\n"
+            f"{fragments}\n\nPlease correct each marked span."
         )
-
-        response = self.client.chat.completions.create(
-            model=self.config.model,
-            temperature=self.config.temperature,
-            max_tokens=self.config.max_tokens,
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
+        span_tokens = sum(count_tokens(text[start:end], self.config.model) for start, end in spans)
+        max_tokens = int(span_tokens * OUTPUT_TOKEN_RATIO) + len(spans) * SPAN_OVERHEAD_TOKENS + 50
+        return self._request(
+            [
+                {"role": "system", "content": SPANS_PROMPT},
                 {"role": "user", "content": user_message},
             ],
+            min(self.config.max_tokens, max_tokens),
+        )
+
+    def _parse_spans(
+        self, raw_response: str, ocr_result: OCRResult, spans: list[tuple[int, int]]
+    ) -> ProcessedText:
+        corrections = json.loads(raw_response).get("corrections")
+        if not isinstance(corrections, dict):
+            raise EditsError("corrections is not an object")
+
+        text = ocr_result.raw_text
+        parts = []
+        position = 0
+        changed = 0
+        for i, (start, end) in enumerate(spans, start=1):
+            original = text[start:end]
+            replacement = corrections.get(str(i), original)
+            # Guard against the model rewriting context into the span
+            if not isinstance(replacement, str) or len(replacement) > 2 * len(original) + 20:
+                replacement = original
+            changed += replacement != original
+            parts.append(text[position:start])
+            parts.append(replacement)
+            position = end
+        parts.append(text[position:])
+        return self._text_only_result(
+            ocr_result,
+            "".join(parts),
+            f"Corrected {changed} of {len(spans)} low-confidence span(s)",
         )
 
+    def split_page(self, ocr_result: OCRResult) -> list[OCRResult]:
+        """
+        The page itself, or paragraph-aligned chunks of it when its text is too
+        long for one request (over `chunk_tokens`, or too long for its cleaned
+        copy to fit in `max_tokens`).
+        """
+        limit = min(
+            self.config.chunk_tokens,
+            int((self.config.max_tokens - OUTPUT_OVERHEAD_TOKENS) / OUTPUT_TOKEN_RATIO),
+        )
+        chunks = split_text(ocr_result.raw_text, max(limit, 1), self.config.model)
+        if len(chunks) <= 1:
+            return [ocr_result]
+        return [replace(ocr_result, raw_text=chunk, words=[]) for chunk in chunks]
+
+    @staticmethod
+    def merge_chunks(ocr_result: OCRResult, parts: list[ProcessedText]) -> ProcessedText:
+        """Combine the results of a split page back into one page result."""
+        return replace(
+            parts[0],
+            original_ocr=ocr_result.raw_text,
+            cleaned_text="\n\n".join(p.cleaned_text for p in parts),
+            chapter=next((p.chapter for p in parts if p.chapter), None),
+            themes=list(dict.fromkeys(theme for p in parts for theme in p.themes)),
+            key_passages=[passage for p in parts for passage in p.key_passages],
+            summary=" ".join(p.summary for p in parts if p.summary),
+            confidence_notes=" ".join(p.confidence_notes for p in parts if p.confidence_notes),
+        )
+
+    def output_budget(self, page_tokens: int, pages: int = 1) -> int:
+        """max_tokens for a request covering `pages` pages of `page_tokens` OCR tokens in total."""
+        needed = int(page_tokens * OUTPUT_TOKEN_RATIO) + pages * OUTPUT_OVERHEAD_TOKENS
+        return min(self.config.max_tokens, needed)
+
+    def _page_request(self, ocr_result: OCRResult, response_mode: str | None = None) -> dict:
+        """Request for one page, with max_tokens sized to the page."""
+        page_tokens = count_tokens(ocr_result.raw_text, self.config.model)
+        return self._request(
+            self._build_messages(ocr_result, response_mode), self.output_budget(page_tokens)
+        )
+
+    def _request(self, messages: list[dict], max_tokens: int | None = None) -> dict:
+        """chat.completions.create arguments for a JSON-mode request."""
+        return {
+            "model": self.config.model,
+            "temperature": self.config.temperature,
+            "max_tokens": max_tokens or self.config.max_tokens,
+            "response_format": {"type": "json_object"},
+            "messages": messages,
+        }
+
+    def _complete(self, request: dict) -> str:
+        """
+        Run a chat completion, serving identical requests from the response
+        cache. A reply cut off by a sized-down max_tokens is retried once with
+        the configured maximum; one cut off at the maximum raises
+        TruncatedResponseError instead of returning incomplete JSON.
+        """
+        key = ResponseCache.key(request) if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = self.client.chat.completions.create(**request)
+        if response.choices[0].finish_reason == "length" and request["max_tokens"] < self.config.max_tokens:
+            logger.warning(
+                f"Response truncated at max_tokens={request['max_tokens']}; retrying with {self.config.max_tokens}"
+            )
+            response = self.client.chat.completions.create(**{**request, "max_tokens": self.config.max_tokens})
+        if response.choices[0].finish_reason == "length":
+            raise TruncatedResponseError(f"Response truncated at max_tokens={self.config.max_tokens}")
+
         raw_response = response.choices[0].message.content
-        data = json.loads(raw_response)
+        self._cache_response(key, raw_response)
+        return raw_response
+
+    def _cache_response(self, key: str | None, raw_response: str):
+        """Store a response if caching is on and it is well-formed JSON."""
+        if not key:
+            return
+        try:
+            json.loads(raw_response)
+        except (TypeError, json.JSONDecodeError):
+            return
+        self.cache.put(key, raw_response)
+
+    def _system_prompt(self, response_mode: str | None = None) -> str:
+        """
+        Per-page system prompt: the slim PAGE_PROMPT when book metadata comes
+        from a separate pass, asking for a correction list in "edits" mode.
+        """
+        prompt = PAGE_PROMPT if self.config.book_metadata else SYSTEM_PROMPT
+        if (response_mode or self.config.response_mode) == "edits":
+            prompt += EDITS_PROMPT_SUFFIX
+        return prompt
+
+    def _build_messages(self, ocr_result: OCRResult, response_mode: str | None = None) -> list[dict]:
+        user_message = (
+            f"Here is raw OCR text extracted from a scanned book page "
+            f"({_text_source(ocr_result)}):\n\n"
+            f"---\n{ocr_result.raw_text}\n---\n\n"
+            f"Please clean, analyze, and structure this text."
+        )
+        return [
+            {"role": "system", "content": self._system_prompt(response_mode)},
+            {"role": "user", "content": user_message},
+        ]
+
+    def _parse_response(self, raw_response: str, ocr_result: OCRResult) -> ProcessedText:
+        return self._from_data(json.loads(raw_response), ocr_result)
 
-        metadata = data.get("metadata", {})
+    def _from_data(self, data: dict, ocr_result: OCRResult) -> ProcessedText:
+        metadata = data.get("metadata") or {}
+        if "cleaned_text" not in data and "corrections" in data:
+            cleaned_text = apply_edits(ocr_result.raw_text, data["corrections"])
+        else:
+            cleaned_text = data.get("cleaned_text", ocr_result.raw_text)
 
         return ProcessedText(
             original_ocr=ocr_result.raw_text,
-            cleaned_text=data.get("cleaned_text", ocr_result.raw_text),
+            cleaned_text=cleaned_text,
             detected_language=data.get("detected_language", "Unknown"),
             language_code=data.get("language_code", "und"),
             title=metadata.get("title"),
             author=metadata.get("author"),
-            chapter=metadata.get("chapter"),
+            # Fall back to the running header found by OCR layout analysis
+            chapter=data.get("chapter") or metadata.get("chapter") or ocr_result.header or None,
             genre=metadata.get("genre"),
             estimated_period=metadata.get("estimated_period"),
             themes=data.get("themes", []),
@@ -131,13 +525,286 @@ class GPTProcessor:
             ocr_confidence=ocr_result.confidence,
             source_file=ocr_result.file_path,
             page_number=ocr_result.page_number,
+            page_hash=ocr_result.page_hash,
+        )
+
+    def extract_book_metadata(self, ocr_results: list[OCRResult]) -> BookMetadata | None:
+        """
+        Book-level metadata from the first `metadata_pages` non-empty pages, in
+        one request. Returns None (and logs) if the request or its reply fails.
+        """
+        if not any(r.raw_text.strip() for r in ocr_results):
+            return None
+        logger.info("Extracting book metadata with GPT")
+        try:
+            raw_response = self._complete(self._metadata_request(ocr_results))
+            return self._parse_book_metadata(raw_response)
+        except Exception as e:
+            logger.warning(f"Book metadata pass failed: {e}")
+            return None
+
+    def _metadata_request(self, ocr_results: list[OCRResult]) -> dict:
+        return self._request(self._build_metadata_messages(ocr_results), METADATA_MAX_TOKENS)
+
+    def _build_metadata_messages(self, ocr_results: list[OCRResult]) -> list[dict]:
+        pages = [r for r in ocr_results if r.raw_text.strip()][: self.config.metadata_pages]
+        page_blocks = "\n\n".join(
+            f"=== PAGE {r.page_number} ===\n{r.raw_text}" for r in pages
+        )
+        return [
+            {"role": "system", "content": BOOK_METADATA_PROMPT},
+            {"role": "user", "content": f"Here are the first pages of the book:\n\n{page_blocks}"},
+        ]
+
+    def _parse_book_metadata(self, raw_response: str) -> BookMetadata:
+        data = json.loads(raw_response)
+        return BookMetadata(
+            title=data.get("title"),
+            author=data.get("author"),
+            genre=data.get("genre"),
+            estimated_period=data.get("estimated_period"),
+            detected_language=data.get("detected_language") or "Unknown",
+            language_code=data.get("language_code") or "und",
+            writing_style=data.get("writing_style") or "",
+        )
+
+    @staticmethod
+    def apply_book_metadata(
+        processed_pages: list[ProcessedText], book: BookMetadata | None
+    ) -> list[ProcessedText]:
+        """Fill the book-level fields of every page from the metadata pass."""
+        if book is None:
+            return processed_pages
+        return [
+            replace(
+                page,
+                title=book.title,
+                author=book.author,
+                genre=book.genre,
+                estimated_period=book.estimated_period,
+                detected_language=book.detected_language,
+                language_code=book.language_code,
+                writing_style=page.writing_style or book.writing_style,
+            )
+            for page in processed_pages
+        ]
+
+    def process_packed(self, ocr_results: list[OCRResult]) -> list[ProcessedText]:
+        """
+        Process several consecutive pages in one request, sharing one copy of
+        the system prompt. Raises ValueError if the reply does not contain
+        exactly one entry per page.
+        """
+        logger.info(
+            f"Processing {len(ocr_results)} packed pages with GPT: "
+            f"{ocr_results[0].file_path} p{ocr_results[0].page_number}-p{ocr_results[-1].page_number}"
+        )
+        raw_response = self._complete(self._packed_request(ocr_results))
+        return self._parse_packed(raw_response, ocr_results)
+
+    def _packed_request(self, ocr_results: list[OCRResult]) -> dict:
+        page_tokens = sum(count_tokens(r.raw_text, self.config.model) for r in ocr_results)
+        return self._request(
+            self._build_packed_messages(ocr_results), self.output_budget(page_tokens, len(ocr_results))
+        )
+
+    def _build_packed_messages(self, ocr_results: list[OCRResult]) -> list[dict]:
+        page_blocks = "\n\n".join(
+            f"=== PAGE {i} ({_text_source(r)}) ===\n{r.raw_text}"
+            for i, r in enumerate(ocr_results, start=1)
+        )
+        user_message = (
+            f"Here is raw OCR text extracted from {len(ocr_results)} consecutive scanned "
+            f"book pages:\n\n{page_blocks}\n\n"
+            f"Please clean, analyze, and structure each page separately."
+        )
+        return [
+            {"role": "system", "content": self._system_prompt() + PACKED_PROMPT_SUFFIX},
+            {"role": "user", "content": user_message},
+        ]
+
+    def _parse_packed(self, raw_response: str, ocr_results: list[OCRResult]) -> list[ProcessedText]:
+        data = json.loads(raw_response)
+        pages = data.get("pages")
+        expected = {str(i) for i in range(1, len(ocr_results) + 1)}
+        if not isinstance(pages, dict) or set(pages) != expected:
+            raise ValueError(f"Packed response has pages {sorted(pages or [])}, expected {sorted(expected)}")
+        return [self._from_data(pages[str(i)], r) for i, r in enumerate(ocr_results, start=1)]
+
+    def pack_pages(self, ocr_results: list[OCRResult]) -> list[list[OCRResult]]:
+        """
+        Group consecutive non-empty pages into packs whose combined page text
+        fits `pack_token_budget` and whose replies fit `max_tokens`; empty or
+        oversized pages stay on their own.
+        """
+        packs: list[list[OCRResult]] = []
+        current: list[OCRResult] = []
+        used = 0
+        for result in ocr_results:
+            tokens = count_tokens(result.raw_text, self.config.model) + PACKED_PAGE_OVERHEAD_TOKENS
+            if not result.raw_text.strip() or tokens > self.config.pack_token_budget:
+                if current:
+                    packs.append(current)
+                packs.append([result])
+                current, used = [], 0
+                continue
+            output = int((used + tokens) * OUTPUT_TOKEN_RATIO) + (len(current) + 1) * OUTPUT_OVERHEAD_TOKENS
+            if current and (
+                used + tokens > self.config.pack_token_budget
+                or len(current) >= self.config.pack_max_pages
+                or output > self.config.max_tokens
+            ):
+                packs.append(current)
+                current, used = [], 0
+            current.append(result)
+            used += tokens
+        if current:
+            packs.append(current)
+        return packs
+
+    def clean_page(self, ocr_result: OCRResult) -> OCRResult:
+        """The page with its text run through the local rule-based cleaner (if enabled)."""
+        if self.cleaner is None or not ocr_result.raw_text.strip():
+            return ocr_result
+        return replace(ocr_result, raw_text=self.cleaner.clean(ocr_result.raw_text, ocr_result.language))
+
+    def route(self, ocr_result: OCRResult) -> str:
+        """
+        Processing path for a (cleaned) page: "empty" for pages without text,
+        "local" at or above `bypass_confidence` (no GPT call), "cheap" at or
+        above `cheap_confidence` when a `cheap_model` is set, otherwise "gpt".
+        PDF text-layer pages have no OCR confidence and always go to "gpt".
+        """
+        if not ocr_result.raw_text.strip():
+            return "empty"
+        if ocr_result.tier == TEXT_LAYER:
+            return "gpt"
+        if self.config.bypass_confidence and ocr_result.confidence >= self.config.bypass_confidence:
+            return "local"
+        if (
+            self.config.cheap_model
+            and self.config.cheap_confidence
+            and ocr_result.confidence >= self.config.cheap_confidence
+        ):
+            return "cheap"
+        return "gpt"
+
+    @property
+    def cheap_processor(self) -> "GPTProcessor":
+        """A processor of the same kind using `cheap_model`, sharing this one's response cache."""
+        if self._cheap_processor is None:
+            config = replace(self.config, model=self.config.cheap_model, cache_enabled=False)
+            self._cheap_processor = type(self)(config)
+            self._cheap_processor.cache = self.cache
+        return self._cheap_processor
+
+    def processor_for(self, path: str) -> "GPTProcessor":
+        return self.cheap_processor if path == "cheap" else self
+
+    def close(self):
+        """Release the API client(s)."""
+        if self._cheap_processor is not None:
+            self._cheap_processor.close()
+        self.client.close()
+
+    def process_batch(
+        self, ocr_results: list[OCRResult], book: BookMetadata | None = None
+    ) -> list[ProcessedText]:
+        """
+        Process multiple OCR results: clean each page locally, route it (full
+        GPT, cheaper model, local-only or empty) and process each route.
+        Results keep input order and record the path each page took. `book`
+        is book-level metadata that is already known (e.g. when updating some
+        pages of a stored book); it replaces the metadata pass.
+        """
+        pages = [self.clean_page(r) for r in ocr_results]
+        if book is None and self.config.book_metadata:
+            book = self.extract_book_metadata(pages)
+        processed = self._route_pages(ocr_results, pages)
+        counts = Counter(page.processing_path for page in processed)
+        logger.info("  Processing paths: " + ", ".join(f"{path} {n}" for path, n in sorted(counts.items())))
+        return self.apply_book_metadata(processed, book)
+
+    def process_pages(self, ocr_results: list[OCRResult]) -> list[ProcessedText]:
+        """
+        Clean, route and process a group of pages as process_batch does
+        (packing them if enabled) but without the book metadata pass. Failures
+        become empty results carrying the error. Safe to call from several threads.
+        """
+        return self._route_pages(ocr_results, [self.clean_page(r) for r in ocr_results])
+
+    def _route_pages(self, ocr_results: list[OCRResult], pages: list[OCRResult]) -> list[ProcessedText]:
+        """Route cleaned `pages` and process each route, in input order."""
+        paths = [self.route(page) for page in pages]
+
+        processed: list[ProcessedText | None] = [None] * len(pages)
+        for path in ("gpt", "cheap"):
+            indices = [i for i, p in enumerate(paths) if p == path]
+            if indices:
+                results = self.processor_for(path)._process_pages([pages[i] for i in indices])
+                for i, result in zip(indices, results):
+                    processed[i] = result
+        for i, path in enumerate(paths):
+            if path == "local":
+                processed[i] = self._local_result(pages[i])
+            elif path == "empty":
+                processed[i] = self._empty_result(pages[i])
+            processed[i] = replace(
+                processed[i],
+                original_ocr=ocr_results[i].raw_text,
+                processing_path=path,
+                source_page=ocr_results[i].source_page,
+            )
+        return processed
+
+    def process_page(self, ocr_result: OCRResult) -> ProcessedText:
+        """
+        Clean, route and process a single page, as process_batch does for each
+        page but without packing or the book metadata pass. Failures become an
+        empty result carrying the error. Safe to call from several threads.
+        """
+        page = self.clean_page(ocr_result)
+        path = self.route(page)
+        if path == "local":
+            processed = self._local_result(page)
+        elif path == "empty":
+            processed = self._empty_result(page)
+        else:
+            try:
+                processed = self.processor_for(path).process_text(page)
+            except Exception as e:
+                logger.error(f"GPT processing failed for {page.file_path} p{page.page_number}: {e}")
+                processed = self._empty_result(page, error=str(e))
+        return replace(
+            processed,
+            original_ocr=ocr_result.raw_text,
+            processing_path=path,
+            source_page=ocr_result.source_page,
         )
 
-    def process_batch(self, ocr_results: list[OCRResult]) -> list[ProcessedText]:
-        """Process multiple OCR results through GPT."""
+    def _process_pages(self, ocr_results: list[OCRResult]) -> list[ProcessedText]:
+        """Send pages to GPT (packed if enabled), keeping input order."""
+        if self.config.pack_pages and self.config.response_mode != "spans":
+            groups = self.pack_pages(ocr_results)
+        else:
+            groups = [[result] for result in ocr_results]
+
+        processed = []
+        for group in groups:
+            logger.info(f"GPT processing {len(processed) + 1}/{len(ocr_results)}")
+            processed.extend(self._process_group(group))
+        return processed
+
+    def _process_group(self, group: list[OCRResult]) -> list[ProcessedText]:
+        """Process a pack, falling back to one request per page if the packed reply is unusable."""
+        if len(group) > 1:
+            try:
+                return self.process_packed(group)
+            except Exception as e:
+                logger.warning(f"Packed request failed ({e}); retrying {len(group)} pages individually")
+
         processed = []
-        for i, result in enumerate(ocr_results, start=1):
-            logger.info(f"GPT processing {i}/{len(ocr_results)}")
+        for result in group:
             try:
                 processed.append(self.process_text(result))
             except Exception as e:
@@ -145,6 +812,39 @@ class GPTProcessor:
                 processed.append(self._empty_result(result, error=str(e)))
         return processed
 
+    def _local_result(self, ocr_result: OCRResult) -> ProcessedText:
+        """Result for a page that skips GPT: the locally cleaned text, without analysis."""
+        result = self._text_only_result(
+            ocr_result,
+            ocr_result.raw_text,
+            f"Cleaned locally without GPT (OCR confidence {ocr_result.confidence}%)",
+        )
+        return replace(result, processing_path="local")
+
+    def _text_only_result(self, ocr_result: OCRResult, cleaned_text: str, notes: str) -> ProcessedText:
+        """Result carrying corrected text only (no summary, themes or passages)."""
+        language, code = language_info(ocr_result.language)
+        return ProcessedText(
+            original_ocr=ocr_result.raw_text,
+            cleaned_text=cleaned_text,
+            detected_language=language,
+            language_code=code,
+            title=None,
+            author=None,
+            chapter=ocr_result.header or None,
+            genre=None,
+            estimated_period=None,
+            themes=[],
+            key_passages=[],
+            summary="",
+            writing_style="",
+            confidence_notes=notes,
+            ocr_confidence=ocr_result.confidence,
+            source_file=ocr_result.file_path,
+            page_number=ocr_result.page_number,
+            page_hash=ocr_result.page_hash,
+        )
+
     def _empty_result(self, ocr_result: OCRResult, error: str = "") -> ProcessedText:
         return ProcessedText(
             original_ocr=ocr_result.raw_text,
@@ -164,4 +864,6 @@ class GPTProcessor:
             ocr_confidence=ocr_result.confidence,
             source_file=ocr_result.file_path,
             page_number=ocr_result.page_number,
+            page_hash=ocr_result.page_hash,
+            error=error,
         )
@@ -0,0 +1,92 @@
+"""
+Token counting and token-bounded text splitting for GPT requests.
+
+Counts use the model's tokenizer through tiktoken when it is installed; without
+it (or if its encoding files cannot be loaded) a conservative estimate of one
+token per four UTF-8 bytes is used, which over-counts rather than under-counts
+for non-Latin scripts.
+"""
+
+import logging
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:  # optional dependency
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "o200k_base"
+# Framing tokens added by the chat format per message and per request
+MESSAGE_OVERHEAD_TOKENS = 4
+REQUEST_OVERHEAD_TOKENS = 3
+# Split separators, coarsest first: paragraphs, then lines, then words
+SEPARATORS = ("\n\n", "\n", " ")
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str | None):
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding(DEFAULT_ENCODING)
+        except KeyError:
+            return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable ({e}); estimating token counts")
+        return None
+
+
+def count_tokens(text: str, model: str | None = None) -> int:
+    """Number of tokens `text` encodes to for `model` (estimated without tiktoken)."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text.encode("utf-8")) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: list[dict], model: str | None = None) -> int:
+    """Prompt size of a chat request, including per-message framing."""
+    return REQUEST_OVERHEAD_TOKENS + sum(
+        count_tokens(m["content"], model) + MESSAGE_OVERHEAD_TOKENS for m in messages
+    )
+
+
+def split_text(
+    text: str,
+    max_tokens: int,
+    model: str | None = None,
+    separators: tuple[str, ...] = SEPARATORS,
+) -> list[str]:
+    """
+    Split `text` into chunks of at most `max_tokens`, breaking at paragraph
+    boundaries where possible, then at line breaks, then between words.
+    Consecutive pieces are merged back together while they fit.
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return [text]
+    if not separators:
+        # A single unbroken run longer than the limit: cut it proportionally
+        size = max(1, len(text) * max_tokens // count_tokens(text, model))
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    separator, finer = separators[0], separators[1:]
+    chunks = []
+    current = ""
+    for piece in text.split(separator):
+        candidate = f"{current}{separator}{piece}" if current else piece
+        if count_tokens(candidate, model) <= max_tokens:
+            current = candidate
+            continue
+        if current:
+            chunks.append(current)
+        if count_tokens(piece, model) <= max_tokens:
+            current = piece
+        else:
+            chunks.extend(split_text(piece, max_tokens, model, finer))
+            current = ""
+    if current:
+        chunks.append(current)
+    return chunks
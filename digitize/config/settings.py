@@ -26,17 +26,86 @@ class DatabaseConfig:
 class OpenAIConfig:
     api_key: str = os.getenv("OPENAI_API_KEY", "")
     model: str = os.getenv("OPENAI_MODEL", "gpt-4o")
+    # Upper bound on max_tokens; each request is sized to its page below this
     max_tokens: int = int(os.getenv("OPENAI_MAX_TOKENS", "4096"))
+    # Pages with more OCR tokens than this are split at paragraph boundaries
+    chunk_tokens: int = int(os.getenv("OPENAI_CHUNK_TOKENS", "2000"))
     temperature: float = float(os.getenv("OPENAI_TEMPERATURE", "0.2"))
+    # Override the API endpoint (e.g. a proxy or a local OpenAI-compatible stub)
+    base_url: str | None = os.getenv("OPENAI_BASE_URL") or None
+    # Concurrent GPT requests; above 1 the async, rate-limited processor is used
+    max_concurrency: int = int(os.getenv("OPENAI_MAX_CONCURRENCY", "1"))
+    requests_per_minute: int = int(os.getenv("OPENAI_RPM", "500"))
+    tokens_per_minute: int = int(os.getenv("OPENAI_TPM", "30000"))
+    max_retries: int = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+    # "full": the model returns the whole cleaned page; "edits": only a list of
+    # corrections against the raw OCR text, applied locally (far fewer output tokens);
+    # "spans": only low-confidence OCR spans are sent and corrected (no page analysis)
+    response_mode: str = os.getenv("OPENAI_RESPONSE_MODE", "full")
+    # Spans mode: words below this Tesseract confidence are sent, with this much context
+    span_confidence: float = float(os.getenv("OPENAI_SPAN_CONFIDENCE", "60"))
+    span_context_chars: int = int(os.getenv("OPENAI_SPAN_CONTEXT_CHARS", "60"))
+    # Two-tier mode: one book-level metadata request on the first pages, then a
+    # slimmer per-page prompt without title/author/genre/period/language
+    book_metadata: bool = os.getenv("OPENAI_BOOK_METADATA", "false").lower() == "true"
+    metadata_pages: int = int(os.getenv("OPENAI_METADATA_PAGES", "5"))
+    # Pack several short consecutive pages into one request (one copy of the system prompt)
+    pack_pages: bool = os.getenv("OPENAI_PACK_PAGES", "false").lower() == "true"
+    pack_token_budget: int = int(os.getenv("OPENAI_PACK_TOKENS", "2000"))
+    pack_max_pages: int = int(os.getenv("OPENAI_PACK_MAX_PAGES", "6"))
+    # Local rule-based cleanup before GPT (hyphenation, ligatures, OCR confusions)
+    local_cleanup: bool = os.getenv("LOCAL_CLEANUP", "false").lower() == "true"
+    # Dictionary spell fix during local cleanup (needs pyspellchecker)
+    spellcheck: bool = os.getenv("LOCAL_SPELLCHECK", "false").lower() == "true"
+    # Pages at or above this OCR confidence skip GPT entirely (0 = never)
+    bypass_confidence: float = float(os.getenv("GPT_BYPASS_CONFIDENCE", "0"))
+    # Pages at or above this OCR confidence use cheap_model instead (0 or no model = never)
+    cheap_model: str = os.getenv("OPENAI_CHEAP_MODEL", "")
+    cheap_confidence: float = float(os.getenv("OPENAI_CHEAP_CONFIDENCE", "0"))
+    # Persistent response cache (SQLite; one file can be shared by several processes)
+    cache_enabled: bool = os.getenv("GPT_CACHE", "true").lower() == "true"
+    cache_path: str = os.getenv("GPT_CACHE_PATH", "~/.cache/digitize/gpt_responses.sqlite3")
+    cache_ttl_days: int = int(os.getenv("GPT_CACHE_TTL_DAYS", "90"))
+    cache_max_mb: int = int(os.getenv("GPT_CACHE_MAX_MB", "1024"))
+    # Batch API jobs: local state directory and status polling interval
+    batch_dir: str = os.getenv("OPENAI_BATCH_DIR", "~/.cache/digitize/batches")
+    batch_poll_seconds: int = int(os.getenv("OPENAI_BATCH_POLL_SECONDS", "60"))
 
 
 @dataclass
 class OCRConfig:
     tesseract_lang: str = os.getenv("TESSERACT_LANG", "eng")
     preprocessing: bool = True
+    # fast | balanced | max-quality (see BookOCR.preprocess_image)
+    preprocess_profile: str = os.getenv("OCR_PREPROCESS_PROFILE", "max-quality")
+    # Deskew search range (degrees); a page skewed past it falls back to a minAreaRect estimate
+    deskew_max_angle: float = float(os.getenv("OCR_DESKEW_MAX_ANGLE", "5"))
     dpi: int = int(os.getenv("OCR_DPI", "300"))
+    # Use a PDF's embedded text layer instead of OCR where it is usable
+    use_text_layer: bool = os.getenv("OCR_TEXT_LAYER", "true").lower() == "true"
+    text_layer_min_chars: int = int(os.getenv("OCR_TEXT_LAYER_MIN_CHARS", "50"))
+    # PDF pages rasterized per window; bounds memory/temp-disk use for long PDFs
+    pdf_window: int = int(os.getenv("OCR_PDF_WINDOW", "8"))
+    # Number of OCR worker processes; 1 keeps OCR in the calling process
+    workers: int = int(os.getenv("OCR_WORKERS", "1"))
+    # Skip preprocessing on clean scans, escalate to heavier tiers on low confidence
+    adaptive_preprocessing: bool = os.getenv("OCR_ADAPTIVE", "false").lower() == "true"
+    # Mean word confidence (%) below which a page is re-run with the next tier
+    reocr_confidence: float = float(os.getenv("OCR_REOCR_CONFIDENCE", "70"))
+    # Crop to detected text blocks before OCR (drops margins, figures, headers, folios)
+    layout_analysis: bool = os.getenv("OCR_LAYOUT", "false").lower() == "true"
+    # off | page | book — narrow a multi-language TESSERACT_LANG per page/book via script detection
+    language_detection: str = os.getenv("OCR_LANGUAGE_DETECTION", "off")
+    # pytesseract (subprocess per call) | tesserocr (persistent in-process API)
+    engine: str = os.getenv("OCR_ENGINE", "pytesseract")
+    # Build page text from the image_to_data pass instead of a second image_to_string run
+    single_pass: bool = os.getenv("OCR_SINGLE_PASS", "false").lower() == "true"
+    # Persistent OCR result cache (keyed by page content + OCR settings)
+    cache_enabled: bool = os.getenv("OCR_CACHE", "true").lower() == "true"
+    cache_dir: str = os.getenv("OCR_CACHE_DIR", "~/.cache/digitize/ocr")
+    cache_max_mb: int = int(os.getenv("OCR_CACHE_MAX_MB", "2048"))
     supported_formats: list[str] = field(
-        default_factory=lambda: [".png", ".jpg", ".jpeg", ".tiff", ".bmp", ".pdf"]
+        default_factory=lambda: [".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".pdf"]
     )
 
 
@@ -45,5 +114,24 @@ class PipelineConfig:
     db: DatabaseConfig = field(default_factory=DatabaseConfig)
     openai: OpenAIConfig = field(default_factory=OpenAIConfig)
     ocr: OCRConfig = field(default_factory=OCRConfig)
+    # Pages committed per transaction in streaming mode
     batch_size: int = int(os.getenv("BATCH_SIZE", "10"))
+    # Streaming mode: OCR, GPT and storage run concurrently with bounded queues between them
+    streaming: bool = os.getenv("PIPELINE_STREAMING", "false").lower() == "true"
+    queue_size: int = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+    gpt_workers: int = int(os.getenv("PIPELINE_GPT_WORKERS", "4"))
+    # Checkpointed runs: per-page stage status is recorded so a failed run can be resumed
+    checkpoints: bool = os.getenv("PIPELINE_CHECKPOINTS", "false").lower() == "true"
+    # Where run state is kept (SQLAlchemy URL); empty means the main database
+    run_state_url: str = os.getenv("RUN_STATE_URL", "")
+    # Distributed workers: job lease length (extended by heartbeats), idle poll interval, tries per job
+    worker_lease_seconds: int = int(os.getenv("WORKER_LEASE_SECONDS", "300"))
+    worker_poll_seconds: float = float(os.getenv("WORKER_POLL_SECONDS", "10"))
+    job_max_attempts: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    # Skip near-duplicate page images (re-scans, double-feeds) before OCR
+    dedup_pages: bool = os.getenv("DEDUP_PAGES", "false").lower() == "true"
+    # Also skip pages matching pages already stored for other books
+    dedup_across_collection: bool = os.getenv("DEDUP_ACROSS_COLLECTION", "false").lower() == "true"
+    # Max differing bits (of 256) for two page hashes to count as near-duplicates
+    dedup_max_distance: int = int(os.getenv("DEDUP_MAX_DISTANCE", "20"))
     scan_directory: str = os.getenv("SCAN_DIRECTORY", "./scans")
@@ -8,6 +8,21 @@ Usage:
     # Digitize a directory of scanned pages
     python -m digitize.main digitize --source /path/to/book_scans/
 
+    # Re-OCR everything, ignoring (or first wiping) the OCR cache
+    python -m digitize.main digitize --source /path/to/book_scans/ --no-ocr-cache
+    python -m digitize.main digitize --source /path/to/book_scans/ --clear-ocr-cache
+
+    # Call GPT for every page even if an identical request was answered before
+    python -m digitize.main digitize --source /path/to/book_scans/ --no-gpt-cache
+
+    # Re-digitize only new, changed or removed scan files of a stored book
+    python -m digitize.main update --book-id 1
+
+    # Record per-page progress, then resume an interrupted or partly failed run
+    python -m digitize.main digitize --source /path/to/book_scans/ --checkpoint
+    python -m digitize.main digitize --resume 20250101-120000-ab12cd
+    python -m digitize.main runs
+
     # List all digitized books
     python -m digitize.main list
 
@@ -20,18 +35,39 @@ Usage:
     # List all discovered themes
     python -m digitize.main themes
 
+    # Compare OCR preprocessing profiles (time and confidence) on sample pages
+    python -m digitize.main bench-preprocess --source /path/to/book_scans/ --pages 5
+
+    # Share work across machines: queue books (or single pages), run workers anywhere
+    python -m digitize.main enqueue --source /path/to/book1/ /path/to/book2.pdf
+    python -m digitize.main enqueue --source /path/to/book3/ --pages
+    python -m digitize.main worker
+    python -m digitize.main jobs
+
     # Initialize the database (run once)
     python -m digitize.main init
+
+    # Bulk backfill through the OpenAI Batch API (cheaper, not interactive)
+    python -m digitize.main batch-submit --source /path/to/book1/ /path/to/book2.pdf
+    python -m digitize.main batch-resume --job-id 20250101-120000-ab12cd34
 """
 
 import argparse
 import json
 import logging
 import sys
+import time
+from dataclasses import replace
+from pathlib import Path
 
 from digitize.config.settings import PipelineConfig
+from digitize.ocr.cache import OCRCache
+from digitize.ocr.extractor import PREPROCESS_PROFILES, BookOCR, average_confidence
 from digitize.pipeline.orchestrator import DigitizationPipeline
+from digitize.pipeline.worker import QueueWorker
+from digitize.storage.jobs import JobQueue
 from digitize.storage.repository import BookRepository
+from digitize.storage.runs import RunStore
 
 
 def setup_logging(verbose: bool = False):
@@ -50,12 +86,166 @@ def cmd_init(config: PipelineConfig):
     print("Database initialized successfully.")
 
 
-def cmd_digitize(config: PipelineConfig, source: str):
-    """Run the full digitization pipeline."""
+def cmd_digitize(
+    config: PipelineConfig,
+    source: str,
+    no_ocr_cache: bool = False,
+    clear_ocr_cache: bool = False,
+    no_gpt_cache: bool = False,
+    streaming: bool = False,
+    checkpoint: bool = False,
+    resume: str | None = None,
+):
+    """Run the full digitization pipeline, or resume a checkpointed run."""
+    if clear_ocr_cache:
+        OCRCache(config.ocr.cache_dir, config.ocr.cache_max_mb * 1024 * 1024).clear()
+    if no_ocr_cache:
+        config.ocr.cache_enabled = False
+    if no_gpt_cache:
+        config.openai.cache_enabled = False
+    if streaming:
+        config.streaming = True
+    if checkpoint:
+        config.checkpoints = True
+
     pipeline = DigitizationPipeline(config)
     pipeline.setup()
-    book_id = pipeline.run(source)
+    try:
+        book_id = pipeline.resume(resume) if resume else pipeline.run(source)
+    finally:
+        pipeline.close()
+        if pipeline.run_id:
+            print(f"Run ID: {pipeline.run_id}")
     print(f"\nDigitization complete. Book saved with ID: {book_id}")
+    if pipeline.run_id:
+        run = pipeline.run_store.get_run(pipeline.run_id)
+        if run["status"] != "completed":
+            print(f"Some pages failed; retry them with: python -m digitize.main digitize --resume {pipeline.run_id}")
+    if pipeline.dedup_report.duplicate_of:
+        print(f"Skipped {len(pipeline.dedup_report.duplicate_of)} duplicate page(s):")
+        for line in pipeline.dedup_report.summary_lines():
+            print(f"  {line}")
+    if pipeline.ocr.cache:
+        stats = pipeline.ocr.cache.stats()
+        print(f"OCR cache: {stats['hits']} hits, {stats['misses']} misses")
+    if pipeline.processor.cache:
+        stats = pipeline.processor.cache.stats()
+        print(f"GPT cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
+    for stats in pipeline.stage_stats:
+        print(stats.summary())
+
+
+def cmd_update(config: PipelineConfig, book_id: int, source: str | None):
+    """Re-process only the scan files of a book that were added or changed."""
+    pipeline = DigitizationPipeline(config)
+    pipeline.setup()
+    try:
+        report = pipeline.update(book_id, source)
+    finally:
+        pipeline.close()
+    print(
+        f"\nBook {book_id}: {len(report.changed)} changed, {len(report.added)} new, "
+        f"{len(report.moved)} moved, {len(report.removed)} removed, {len(report.unchanged)} unchanged file(s)"
+    )
+    for old, new in report.moved.items():
+        print(f"  Moved: {old} -> {new}")
+    for label, files in (("Changed", report.changed), ("New", report.added), ("Removed", report.removed)):
+        for file in files:
+            print(f"  {label}: {file}")
+    print(f"Processed {report.pages_processed} page(s); the book now has {report.total_pages} pages")
+    if report.failed:
+        print(f"GPT processing failed for {len(report.failed)} file(s), left as stored; run update again to retry:")
+        for file in report.failed:
+            print(f"  {file}")
+
+
+def cmd_runs(config: PipelineConfig):
+    """List checkpointed runs and their per-page progress."""
+    runs = RunStore(config.run_state_url or config.db.connection_string).list_runs()
+    if not runs:
+        print("No runs found.")
+        return
+    print(f"\n{'Run ID':<24} {'Status':<11} {'Book':<6} {'Pages':<40} Source")
+    print("-" * 100)
+    for r in runs:
+        pages = ", ".join(f"{status} {n}" for status, n in sorted(r["pages"].items())) or "-"
+        print(f"{r['id']:<24} {r['status']:<11} {str(r['book_id'] or '-'):<6} {pages:<40} {r['source_path']}")
+
+
+def job_queue(config: PipelineConfig, repo: BookRepository) -> JobQueue:
+    return JobQueue(repo, config.worker_lease_seconds, config.job_max_attempts)
+
+
+def cmd_enqueue(config: PipelineConfig, sources: list[str], pages: bool):
+    """Queue books (or each of their pages) for distributed workers."""
+    pipeline = DigitizationPipeline(config)
+    pipeline.setup()
+    queue = job_queue(config, pipeline.repository)
+    try:
+        for source in sources:
+            if pages:
+                book_id = pipeline.enqueue_pages(queue, source)
+                print(f"{source}: page jobs queued for book ID {book_id}")
+            else:
+                job_id = queue.enqueue_book(source)
+                print(f"{source}: queued as job {job_id}")
+    finally:
+        pipeline.close()
+
+
+def cmd_worker(config: PipelineConfig, name: str | None, drain: bool):
+    """Claim and run queued jobs until interrupted (or until the queue is empty)."""
+    pipeline = DigitizationPipeline(config)
+    pipeline.setup()
+    worker = QueueWorker(pipeline, job_queue(config, pipeline.repository), name, config.worker_poll_seconds)
+    try:
+        worker.run(drain=drain)
+    except KeyboardInterrupt:
+        print("\nInterrupted; the current job was returned to the queue.")
+    finally:
+        pipeline.close()
+    print(f"Worker {worker.name}: {worker.completed} jobs done, {worker.failed} failed")
+
+
+def cmd_jobs(config: PipelineConfig):
+    """Show queued job counts by kind and status."""
+    repo = BookRepository(config.db)
+    counts = job_queue(config, repo).counts()
+    if not counts:
+        print("No jobs found.")
+        return
+    statuses = ("pending", "running", "done", "failed")
+    print(f"\n{'Kind':<8} " + " ".join(f"{status:<8}" for status in statuses))
+    print("-" * 45)
+    for kind in ("book", "page", "finish"):
+        if any(k == kind for k, _ in counts):
+            print(f"{kind:<8} " + " ".join(f"{counts.get((kind, status), 0):<8}" for status in statuses))
+
+
+def cmd_batch_submit(config: PipelineConfig, sources: list[str], wait: bool):
+    """OCR books and submit their pages as an OpenAI Batch API job."""
+    pipeline = DigitizationPipeline(config)
+    pipeline.setup()
+    try:
+        job_id = pipeline.submit_batch_job(sources)
+        print(f"\nBatch job submitted: {job_id}")
+        if wait:
+            cmd_batch_resume(config, job_id, pipeline)
+        else:
+            print(f"Resume with: python -m digitize.main batch-resume --job-id {job_id}")
+    finally:
+        pipeline.close()
+
+
+def cmd_batch_resume(config: PipelineConfig, job_id: str, pipeline: DigitizationPipeline | None = None):
+    """Wait for a Batch API job to finish and store its books."""
+    if pipeline is None:
+        with DigitizationPipeline(config) as pipeline:
+            pipeline.setup()
+            book_ids = pipeline.finish_batch_job(job_id)
+    else:
+        book_ids = pipeline.finish_batch_job(job_id)
+    print(f"\nBatch job {job_id} complete. Book IDs: {', '.join(map(str, book_ids))}")
 
 
 def cmd_list_books(config: PipelineConfig):
@@ -84,6 +274,8 @@ def cmd_pages(config: PipelineConfig, book_id: int):
         return
     for p in pages:
         print(f"\n--- Page {p['page_number']} ---")
+        if p["processing_path"] and p["processing_path"] != "gpt":
+            print(f"Processed: {p['processing_path']}")
         if p["chapter"]:
             print(f"Chapter: {p['chapter']}")
         if p["themes"]:
@@ -122,6 +314,56 @@ def cmd_themes(config: PipelineConfig):
         print(f"{t['name']:<40} {t['page_count']:<6}")
 
 
+def cmd_bench_preprocess(config: PipelineConfig, source: str, max_pages: int):
+    """Time each preprocessing profile on sample pages and report OCR confidence."""
+    import cv2
+
+    ocr = BookOCR(replace(config.ocr, cache_enabled=False))
+    path = Path(source)
+    files = [path] if path.is_file() else sorted(
+        f for f in path.iterdir() if f.suffix.lower() in config.ocr.supported_formats
+    )
+
+    samples = []
+    for file in files:
+        if len(samples) >= max_pages:
+            break
+        if file.suffix.lower() == ".pdf":
+            for n in range(1, max_pages - len(samples) + 1):
+                try:
+                    samples.append(ocr.render_pdf_page(str(file), n))
+                except Exception:
+                    break
+        else:
+            image = cv2.imread(str(file))
+            if image is not None:
+                samples.append(image)
+
+    if not samples:
+        print(f"No readable pages found in: {source}")
+        return
+
+    rows = []
+    for profile in PREPROCESS_PROFILES:
+        elapsed, confidences, word_count = 0.0, [], 0
+        for image in samples:
+            start = time.perf_counter()
+            processed = ocr.preprocess_image(image, profile)
+            elapsed += time.perf_counter() - start
+            _, words = ocr.run_tesseract(processed)
+            confidences.append(average_confidence(words))
+            word_count += len(words)
+        rows.append((profile, elapsed / len(samples), sum(confidences) / len(confidences), word_count))
+
+    baseline = rows[-1][1]  # max-quality
+    print(f"\nPreprocessing profiles on {len(samples)} page(s):\n")
+    print(f"{'Profile':<14} {'Sec/page':<10} {'Time saved':<12} {'Mean conf':<10} {'Words':<8}")
+    print("-" * 58)
+    for profile, per_page, conf, words in rows:
+        saved = f"{(1 - per_page / baseline) * 100:.0f}%" if baseline else "-"
+        print(f"{profile:<14} {per_page:<10.3f} {saved:<12} {conf:<10.1f} {words:<8}")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Digitize physical book collections: OCR -> GPT -> PostgreSQL"
@@ -135,7 +377,49 @@ def main():
 
     # digitize
     p_digitize = subparsers.add_parser("digitize", help="Digitize scanned book pages")
-    p_digitize.add_argument("--source", "-s", required=True, help="Path to file or directory of scans")
+    p_digitize.add_argument("--source", "-s", help="Path to file or directory of scans")
+    p_digitize.add_argument("--no-ocr-cache", action="store_true", help="Bypass the OCR result cache")
+    p_digitize.add_argument("--clear-ocr-cache", action="store_true", help="Empty the OCR result cache first")
+    p_digitize.add_argument("--no-gpt-cache", action="store_true", help="Bypass the GPT response cache")
+    p_digitize.add_argument(
+        "--streaming", action="store_true", help="Overlap OCR, GPT and storage (see PIPELINE_STREAMING)"
+    )
+    p_digitize.add_argument(
+        "--checkpoint", action="store_true", help="Record per-page progress so the run can be resumed"
+    )
+    p_digitize.add_argument("--resume", "-r", metavar="RUN_ID", help="Resume a checkpointed run")
+
+    # update
+    p_update = subparsers.add_parser("update", help="Re-digitize only new or changed scans of a book")
+    p_update.add_argument("--book-id", "-b", type=int, required=True, help="Book ID")
+    p_update.add_argument("--source", "-s", help="Scan location, if it moved (default: the book's source)")
+
+    # runs
+    subparsers.add_parser("runs", help="List checkpointed digitization runs")
+
+    # batch-submit
+    p_batch = subparsers.add_parser("batch-submit", help="Digitize books via the OpenAI Batch API")
+    p_batch.add_argument("--source", "-s", nargs="+", required=True, help="Files or directories of scans")
+    p_batch.add_argument("--wait", action="store_true", help="Poll until the batch finishes, then store")
+
+    # batch-resume
+    p_resume = subparsers.add_parser("batch-resume", help="Wait for a Batch API job and store its books")
+    p_resume.add_argument("--job-id", "-j", required=True, help="Job ID printed by batch-submit")
+
+    # enqueue
+    p_enqueue = subparsers.add_parser("enqueue", help="Queue books for distributed workers")
+    p_enqueue.add_argument("--source", "-s", nargs="+", required=True, help="Files or directories of scans")
+    p_enqueue.add_argument(
+        "--pages", action="store_true", help="Queue one job per page instead of one job per book"
+    )
+
+    # worker
+    p_worker = subparsers.add_parser("worker", help="Claim and run queued jobs")
+    p_worker.add_argument("--name", help="Worker name recorded on claimed jobs (default: host-pid)")
+    p_worker.add_argument("--drain", action="store_true", help="Exit once no job is left to claim")
+
+    # jobs
+    subparsers.add_parser("jobs", help="Show job queue status")
 
     # list
     subparsers.add_parser("list", help="List all digitized books")
@@ -151,6 +435,13 @@ def main():
     # themes
     subparsers.add_parser("themes", help="List all discovered themes")
 
+    # bench-preprocess
+    p_bench = subparsers.add_parser(
+        "bench-preprocess", help="Compare OCR preprocessing profiles on sample pages"
+    )
+    p_bench.add_argument("--source", "-s", required=True, help="Path to file or directory of scans")
+    p_bench.add_argument("--pages", "-n", type=int, default=5, help="Number of sample pages")
+
     args = parser.parse_args()
     setup_logging(args.verbose)
 
@@ -158,15 +449,29 @@ def main():
         parser.print_help()
         sys.exit(1)
 
+    if args.command == "digitize" and not (args.source or args.resume):
+        parser.error("digitize requires --source or --resume")
+
     config = PipelineConfig()
 
     commands = {
         "init": lambda: cmd_init(config),
-        "digitize": lambda: cmd_digitize(config, args.source),
+        "digitize": lambda: cmd_digitize(
+            config, args.source, args.no_ocr_cache, args.clear_ocr_cache, args.no_gpt_cache, args.streaming,
+            args.checkpoint, args.resume,
+        ),
+        "update": lambda: cmd_update(config, args.book_id, args.source),
+        "runs": lambda: cmd_runs(config),
+        "enqueue": lambda: cmd_enqueue(config, args.source, args.pages),
+        "worker": lambda: cmd_worker(config, args.name, args.drain),
+        "jobs": lambda: cmd_jobs(config),
+        "batch-submit": lambda: cmd_batch_submit(config, args.source, args.wait),
+        "batch-resume": lambda: cmd_batch_resume(config, args.job_id),
         "list": lambda: cmd_list_books(config),
         "pages": lambda: cmd_pages(config, args.book_id),
         "search": lambda: cmd_search(config, args.query),
         "themes": lambda: cmd_themes(config),
+        "bench-preprocess": lambda: cmd_bench_preprocess(config, args.source, args.pages),
     }
 
     commands[args.command]()
@@ -0,0 +1,143 @@
+"""
+Persistent, content-addressed cache for OCR results.
+
+Entries are JSON files named by a SHA-256 key (derived from the source bytes,
+the page number and the OCR settings that affect output), sharded into
+two-character subdirectories. The cache is bounded by total size; when it
+grows past the limit the least recently used entries (by mtime, refreshed
+on every hit) are evicted. The cache directory may be shared by several
+worker processes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached payload layout changes so stale entries are ignored
+CACHE_VERSION = 1
+
+
+class OCRCache:
+    """Size-bounded LRU cache of OCR results on disk."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(os.path.expanduser(directory))
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size: int | None = None
+
+    @staticmethod
+    def file_digest(path: str) -> str:
+        """SHA-256 of a file's contents, read in chunks."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(**fields) -> str:
+        """Build a cache key from a source digest, page number and OCR settings."""
+        payload = json.dumps({"version": CACHE_VERSION, **fields}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def contains(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def get(self, key: str) -> dict | None:
+        """Return the cached payload for `key`, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return payload
+
+    def put(self, key: str, payload: dict):
+        """Store a payload, evicting old entries if the cache is over its size limit."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # An overwritten entry's old size no longer counts
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+
+        # Write to a temp file and rename so concurrent readers never see partial JSON
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        if self._size is None:
+            self._size = self._scan_size()
+        else:
+            self._size += path.stat().st_size - replaced
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache is under 90% of its limit."""
+        entries = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+
+        self._size = total
+        if evicted:
+            logger.info(f"OCR cache: evicted {evicted} entries ({total / 1e6:.1f} MB kept)")
+
+    def clear(self):
+        """Remove every cached entry."""
+        if self.directory.exists():
+            shutil.rmtree(self.directory)
+        self._size = 0
+        logger.info(f"OCR cache cleared: {self.directory}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def _scan_size(self) -> int:
+        return sum(
+            p.stat().st_size for p in self.directory.glob("*/*.json") if p.is_file()
+        )
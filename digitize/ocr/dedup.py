@@ -0,0 +1,263 @@
+"""
+Duplicate page detection for book scans.
+
+Scanning stations produce re-scans, double-feeds and overlapping batch
+directories. Each page gets a perceptual difference hash (dHash) computed from
+a small grayscale thumbnail; pages whose hashes are within a Hamming distance
+threshold are near-duplicate candidates. Because pages of the same book share
+a layout, every candidate (within the book or among stored pages) is
+confirmed by correlating normalized thumbnails before a page is treated as a
+duplicate. Blank pages are never deduplicated.
+
+Pages are hashed one at a time and only a bounded number of thumbnails is
+kept in memory; an evicted or stored page's thumbnail is rendered again from
+its file when a hash matches it.
+"""
+
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+import cv2
+import numpy as np
+from PIL import Image
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+logger = logging.getLogger(__name__)
+
+# (file_path, page_number) — the identity of a page before OCR
+PageKey = tuple[str, int]
+
+HASH_SIZE = 16  # 16x16 dHash = 256 bits
+THUMBNAIL_WIDTH = 128
+THUMBNAIL_DPI = 30
+BLANK_STDDEV = 8.0  # thumbnails flatter than this are treated as blank pages
+MIN_CORRELATION = 0.9
+HASH_HEX_LEN = HASH_SIZE * HASH_SIZE // 4
+# Thumbnails kept in memory (about 90 KB each); others are re-rendered on a hash match
+MAX_CACHED_THUMBNAILS = 500
+# Closest stored pages checked for a hash match
+MAX_KNOWN_CANDIDATES = 5
+
+# Set-bit count for every byte value
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+
+@dataclass
+class DedupReport:
+    """Outcome of a dedup pass: page hashes and which pages were skipped as duplicates."""
+    hashes: dict[PageKey, str] = field(default_factory=dict)
+    # Skipped page -> human-readable description of the page it duplicates
+    duplicate_of: dict[PageKey, str] = field(default_factory=dict)
+
+    @property
+    def skipped(self) -> set[PageKey]:
+        return set(self.duplicate_of)
+
+    def summary_lines(self) -> list[str]:
+        return [
+            f"{Path(path).name} p{page} duplicates {original}"
+            for (path, page), original in sorted(self.duplicate_of.items())
+        ]
+
+
+def dhash(thumbnail: np.ndarray, hash_size: int = HASH_SIZE) -> int:
+    """Difference hash: one bit per horizontally adjacent pixel pair of a (size+1)x(size) resize."""
+    small = cv2.resize(thumbnail, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _normalized(thumbnail: np.ndarray) -> np.ndarray:
+    values = thumbnail.astype(np.float32)
+    return (values - values.mean()) / (values.std() + 1e-6)
+
+
+def _correlation(a: np.ndarray, b: np.ndarray) -> float:
+    if a.shape != b.shape:
+        b = cv2.resize(b, (a.shape[1], a.shape[0]), interpolation=cv2.INTER_AREA)
+        b = _normalized(b)
+    return float((a * b).mean())
+
+
+def _thumbnail(gray: np.ndarray) -> np.ndarray:
+    h, w = gray.shape[:2]
+    height = max(1, round(h * THUMBNAIL_WIDTH / w))
+    return cv2.resize(gray, (THUMBNAIL_WIDTH, height), interpolation=cv2.INTER_AREA)
+
+
+def _frame_thumbnail(frame: Image.Image) -> np.ndarray:
+    frame = frame.convert("L")
+    frame = frame.reduce(max(1, frame.width // (THUMBNAIL_WIDTH * 2)))
+    return _thumbnail(np.array(frame))
+
+
+def iter_thumbnails(file_path: str) -> Iterator[tuple[PageKey, np.ndarray]]:
+    """Yield a small grayscale thumbnail for every page of an image, TIFF or PDF file."""
+    ext = Path(file_path).suffix.lower()
+    if ext in (".tif", ".tiff"):
+        with Image.open(file_path) as tiff:
+            for index in range(getattr(tiff, "n_frames", 1)):
+                tiff.seek(index)
+                yield (file_path, index + 1), _frame_thumbnail(tiff)
+    elif ext == ".pdf":
+        total = pdfinfo_from_path(file_path)["Pages"]
+        for first_page in range(1, total + 1, 50):
+            last_page = min(first_page + 49, total)
+            pages = convert_from_path(
+                file_path,
+                dpi=THUMBNAIL_DPI,
+                first_page=first_page,
+                last_page=last_page,
+                grayscale=True,
+            )
+            for page_number, page in enumerate(pages, start=first_page):
+                yield (file_path, page_number), _thumbnail(np.array(page.convert("L")))
+    else:
+        # Reduced decode is far cheaper than a full-resolution read for JPEGs
+        gray = cv2.imread(file_path, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+        if gray is None:
+            logger.warning(f"Could not read {file_path} for dedup; it will not be deduplicated")
+            return
+        yield (file_path, 1), _thumbnail(gray)
+
+
+def page_thumbnail(file_path: str, page: int) -> np.ndarray | None:
+    """Thumbnail of one page of a file, as iter_thumbnails makes it; None if it cannot be read."""
+    try:
+        ext = Path(file_path).suffix.lower()
+        if ext in (".tif", ".tiff"):
+            with Image.open(file_path) as tiff:
+                tiff.seek(page - 1)
+                return _frame_thumbnail(tiff)
+        if ext == ".pdf":
+            pages = convert_from_path(
+                file_path, dpi=THUMBNAIL_DPI, first_page=page, last_page=page, grayscale=True
+            )
+            return _thumbnail(np.array(pages[0].convert("L"))) if pages else None
+        gray = cv2.imread(file_path, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+        return _thumbnail(gray) if gray is not None and page == 1 else None
+    except Exception as e:
+        logger.debug(f"Could not render {file_path} p{page} for dedup: {e}")
+        return None
+
+
+def _file_thumbnails(file_path: str) -> Iterator[tuple[PageKey, np.ndarray]]:
+    """iter_thumbnails, logging (instead of raising) a file that cannot be read."""
+    try:
+        yield from iter_thumbnails(file_path)
+    except Exception as e:
+        logger.warning(f"Could not hash {file_path}: {e}")
+
+
+class PageDeduplicator:
+    """Groups near-duplicate pages within a book, optionally against already-stored pages."""
+
+    def __init__(self, max_distance: int, max_cached_thumbnails: int = MAX_CACHED_THUMBNAILS):
+        self.max_distance = max_distance
+        self.max_cached_thumbnails = max_cached_thumbnails
+        # Normalized thumbnails by page, least recently used first
+        self._thumbnails: OrderedDict[PageKey, np.ndarray | None] = OrderedDict()
+
+    def find_duplicates(
+        self,
+        files: list[str],
+        known_hashes: list[tuple[str, str, str | None, int | None]] | None = None,
+    ) -> DedupReport:
+        """
+        Hash every page of `files` (in order) and mark the later copy of each
+        near-duplicate pair as skipped. `known_hashes` is an optional list of
+        (hash_hex, description, file_path, page in file) for pages already
+        stored in the collection; a stored page is only matched if its file
+        can be read to confirm the match.
+        """
+        report = DedupReport()
+        self._thumbnails.clear()
+        representatives: list[tuple[PageKey, int]] = []
+
+        known_hashes = [k for k in (known_hashes or []) if k[0] and len(k[0]) == HASH_HEX_LEN]
+        # Stored hashes as an (N, 32) byte matrix so distances are computed in one vectorized pass
+        known = (
+            np.frombuffer(b"".join(bytes.fromhex(k[0]) for k in known_hashes), dtype=np.uint8)
+            .reshape(len(known_hashes), -1)
+            if known_hashes
+            else None
+        )
+
+        for file_path in files:
+            for key, thumb in _file_thumbnails(file_path):
+                if thumb.std() < BLANK_STDDEV:
+                    continue  # blank pages all look alike; keep every one
+
+                value = dhash(thumb)
+                hex_hash = f"{value:0{HASH_HEX_LEN}x}"
+                report.hashes[key] = hex_hash
+                normalized = _normalized(thumb)
+
+                original = next(
+                    (
+                        rep_key
+                        for rep_key, rep_value in representatives
+                        if hamming(value, rep_value) <= self.max_distance
+                        and self._confirmed(normalized, rep_key)
+                    ),
+                    None,
+                )
+                if original:
+                    report.duplicate_of[key] = f"{Path(original[0]).name} p{original[1]}"
+                    continue
+
+                if known is not None:
+                    query = np.frombuffer(bytes.fromhex(hex_hash), dtype=np.uint8)
+                    distances = _POPCOUNT[known ^ query].sum(axis=1)
+                    candidates = [
+                        int(i) for i in np.argsort(distances, kind="stable")[:MAX_KNOWN_CANDIDATES]
+                        if distances[i] <= self.max_distance
+                    ]
+                    match = next(
+                        (
+                            known_hashes[i][1]
+                            for i in candidates
+                            if known_hashes[i][2] and known_hashes[i][3]
+                            and self._confirmed(normalized, (known_hashes[i][2], known_hashes[i][3]))
+                        ),
+                        None,
+                    )
+                    if match:
+                        report.duplicate_of[key] = match
+                        continue
+
+                representatives.append((key, value))
+                self._remember(key, normalized)
+
+        self._thumbnails.clear()
+        if report.duplicate_of:
+            logger.info(f"  Dedup: skipping {len(report.duplicate_of)} duplicate page(s)")
+            for line in report.summary_lines():
+                logger.info(f"    {line}")
+        return report
+
+    def _confirmed(self, normalized: np.ndarray, key: PageKey) -> bool:
+        """Whether a page's thumbnail correlates with that of the page at `key`."""
+        if key in self._thumbnails:
+            self._thumbnails.move_to_end(key)
+            other = self._thumbnails[key]
+        else:
+            thumb = page_thumbnail(*key)
+            other = _normalized(thumb) if thumb is not None else None
+            self._remember(key, other)
+        return other is not None and _correlation(normalized, other) >= MIN_CORRELATION
+
+    def _remember(self, key: PageKey, normalized: np.ndarray | None):
+        self._thumbnails[key] = normalized
+        while len(self._thumbnails) > self.max_cached_thumbnails:
+            self._thumbnails.popitem(last=False)
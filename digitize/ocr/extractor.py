@@ -2,24 +2,54 @@
 OCR module for extracting text from scanned book pages.
 
 Uses Tesseract OCR with image preprocessing for better accuracy.
-Supports: PNG, JPG, TIFF, BMP, and multi-page PDF files.
+Supports: PNG, JPG, BMP, multi-page TIFF, and multi-page PDF files.
 """
 
 import os
 import logging
+import multiprocessing
+import multiprocessing.util
+import subprocess
+import tempfile
+import unicodedata
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from itertools import repeat
 from pathlib import Path
-from dataclasses import dataclass
+from typing import Iterator
 
 import cv2
 import numpy as np
 import pytesseract
 from PIL import Image
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 
 from digitize.config.settings import OCRConfig
+from digitize.ocr.cache import OCRCache
 
 logger = logging.getLogger(__name__)
 
+PREPROCESS_PROFILES = ("fast", "balanced", "max-quality")
+TIFF_FORMATS = (".tif", ".tiff")
+
+
+@dataclass
+class OCRWord:
+    text: str
+    confidence: float
+    left: int
+    top: int
+    width: int
+    height: int
+    block_num: int
+    par_num: int
+    line_num: int
+
+
+# OCRResult.tier of a page taken from a PDF's embedded text layer (no OCR ran)
+TEXT_LAYER = "text-layer"
+
 
 @dataclass
 class OCRResult:
@@ -28,6 +58,263 @@ class OCRResult:
     raw_text: str
     confidence: float
     language: str
+    words: list[OCRWord] = field(default_factory=list)
+    # What produced the text: a preprocessing tier (none, fast, balanced,
+    # max-quality) or TEXT_LAYER for an embedded PDF text layer, which has
+    # no OCR confidence (0)
+    tier: str = ""
+    # Running header detected by layout analysis (often the chapter title)
+    header: str = ""
+    # Perceptual hash of the page image (hex), set by the dedup stage
+    page_hash: str = ""
+    # Page number within file_path, set by the pipeline when page_number is
+    # renumbered for the book (pages of a directory)
+    source_page: int = 0
+
+
+@dataclass
+class PageLayout:
+    """Regions found on a page, as (x, y, width, height) boxes in full-resolution pixels."""
+    blocks: list[tuple[int, int, int, int]] = field(default_factory=list)
+    header: tuple[int, int, int, int] | None = None
+    folios: list[tuple[int, int, int, int]] = field(default_factory=list)
+    figures: list[tuple[int, int, int, int]] = field(default_factory=list)
+
+
+def words_from_ocr_data(ocr_data: dict) -> list[OCRWord]:
+    """Collect recognized words (level 5 rows) from pytesseract's image_to_data dict."""
+    words = []
+    for i, text in enumerate(ocr_data["text"]):
+        if int(ocr_data["level"][i]) != 5 or not str(text).strip():
+            continue
+        words.append(
+            OCRWord(
+                text=str(text).strip(),
+                confidence=float(ocr_data["conf"][i]),
+                left=int(ocr_data["left"][i]),
+                top=int(ocr_data["top"][i]),
+                width=int(ocr_data["width"][i]),
+                height=int(ocr_data["height"][i]),
+                block_num=int(ocr_data["block_num"][i]),
+                par_num=int(ocr_data["par_num"][i]),
+                line_num=int(ocr_data["line_num"][i]),
+            )
+        )
+    return words
+
+
+def text_from_words(words: list[OCRWord]) -> str:
+    """
+    Rebuild page text from word rows the way Tesseract's text renderer does:
+    words joined by spaces, lines by newlines, paragraphs by a blank line.
+    Line-end hyphens are kept as recognized, matching image_to_string.
+    """
+    paragraphs: list[list[list[str]]] = []
+    prev_par = prev_line = None
+    for word in words:
+        par = (word.block_num, word.par_num)
+        if par != prev_par:
+            paragraphs.append([])
+            prev_par, prev_line = par, None
+        if word.line_num != prev_line:
+            paragraphs[-1].append([])
+            prev_line = word.line_num
+        paragraphs[-1][-1].append(word.text)
+
+    return "\n\n".join(
+        "\n".join(" ".join(line) for line in lines) for lines in paragraphs
+    )
+
+
+def estimate_skew(
+    binary: np.ndarray, max_angle: float = 5.0, step: float = 0.25, target_width: int = 800
+) -> float:
+    """
+    Estimate page skew (degrees) with a projection profile on a downscaled copy.
+
+    Each candidate rotation of the downscaled ink mask is scored by how sharply
+    its row sums change; text lines aligned with the rows give the sharpest
+    profile. Returns the rotation angle that straightens the page.
+    """
+    h, w = binary.shape[:2]
+    scale = min(1.0, target_width / w)
+    small = (
+        cv2.resize(binary, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        if scale < 1.0
+        else binary
+    )
+    ink = (small < 128).astype(np.uint8)
+    if cv2.countNonZero(ink) < 100:
+        return 0.0
+
+    sh, sw = ink.shape
+    center = (sw / 2, sh / 2)
+    best_angle, best_score = 0.0, -1.0
+    for angle in np.arange(-max_angle, max_angle + step / 2, step):
+        matrix = cv2.getRotationMatrix2D(center, float(angle), 1.0)
+        rotated = cv2.warpAffine(ink, matrix, (sw, sh), flags=cv2.INTER_NEAREST, borderValue=0)
+        profile = rotated.sum(axis=1, dtype=np.float64)
+        score = float(np.sum(np.diff(profile) ** 2))
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
+
+
+def min_area_rect_skew(binary: np.ndarray) -> float:
+    """Skew (degrees) of the minimum-area rectangle around all ink pixels; no range limit."""
+    coords = np.column_stack(np.where(binary < 128))
+    if len(coords) <= 100:
+        return 0.0
+    angle = cv2.minAreaRect(coords)[-1]
+    if angle < -45:
+        angle = 90 + angle
+    return float(angle)
+
+
+def image_quality(image: np.ndarray, target_width: int = 800) -> dict:
+    """
+    Cheap quality metrics on a downscaled grayscale copy of a page:
+    contrast (intensity std-dev), noise (Immerkaer sigma estimate) and skew (degrees).
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    h, w = gray.shape[:2]
+    scale = min(1.0, target_width / w)
+    if scale < 1.0:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    kernel = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+    response = np.abs(cv2.filter2D(gray.astype(np.float32), -1, kernel))
+    gh, gw = gray.shape
+    noise = float(response[1:-1, 1:-1].sum()) * np.sqrt(np.pi / 2) / (6 * (gw - 2) * (gh - 2))
+
+    return {
+        "contrast": float(gray.std()),
+        "noise": noise,
+        "skew": estimate_skew(gray, target_width=target_width),
+    }
+
+
+# Thresholds under which a scan is clean enough to OCR without preprocessing
+CLEAN_MIN_CONTRAST = 40.0
+CLEAN_MAX_NOISE = 5.0
+CLEAN_MAX_SKEW = 0.5
+
+
+def is_clean_scan(image: np.ndarray) -> bool:
+    """True if a page has good contrast, little noise and no visible skew."""
+    quality = image_quality(image)
+    return (
+        quality["contrast"] >= CLEAN_MIN_CONTRAST
+        and quality["noise"] <= CLEAN_MAX_NOISE
+        and abs(quality["skew"]) <= CLEAN_MAX_SKEW
+    )
+
+
+def detect_layout(image: np.ndarray, target_width: int = 1000) -> PageLayout:
+    """
+    Find text blocks on a page and separate out page furniture.
+
+    Works on a downscaled, Otsu-binarized copy: ink is dilated so characters
+    merge into lines and lines into blocks, then each block is classified.
+    Dense tall regions are treated as illustrations, a short block in the top
+    margin band as the running header, and small blocks in the top/bottom
+    margin bands as folios (page numbers). Everything else is body text,
+    returned in reading order (top to bottom, left to right). Margins and
+    gutter shadows fall outside every block and are never OCR'd.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    h, w = gray.shape[:2]
+    scale = min(1.0, target_width / w)
+    small = (
+        cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        if scale < 1.0
+        else gray
+    )
+    _, ink = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    sh, sw = ink.shape
+
+    # Merge characters into lines and lines into blocks
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, sw // 60), max(3, sh // 150)))
+    merged = cv2.dilate(ink, kernel, iterations=2)
+    contours, _ = cv2.findContours(merged, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    def to_full(box, pad=0.005):
+        x, y, bw, bh = box
+        px, py = int(w * pad), int(h * pad)
+        x0, y0 = max(0, int(x / scale) - px), max(0, int(y / scale) - py)
+        x1, y1 = min(w, int((x + bw) / scale) + px), min(h, int((y + bh) / scale) + py)
+        return (x0, y0, x1 - x0, y1 - y0)
+
+    layout = PageLayout()
+    margin = sh * 0.08
+    body = []
+    for contour in contours:
+        x, y, bw, bh = cv2.boundingRect(contour)
+        if bw * bh < sw * sh * 0.0005:
+            continue  # specks and dust
+        density = cv2.countNonZero(ink[y:y + bh, x:x + bw]) / (bw * bh)
+        in_margin = y + bh <= margin or y >= sh - margin
+        if density > 0.45 and bh > sh * 0.1:
+            layout.figures.append(to_full((x, y, bw, bh)))
+        elif in_margin and bh < sh * 0.04 and bw < sw * 0.1:
+            layout.folios.append(to_full((x, y, bw, bh)))
+        elif y + bh <= margin and bh < sh * 0.04 and layout.header is None:
+            layout.header = to_full((x, y, bw, bh))
+        else:
+            body.append((x, y, bw, bh))
+
+    # Reading order: rows of blocks top to bottom, left to right within a row
+    row_height = max(1.0, sh * 0.02)
+    body.sort(key=lambda b: (int(b[1] // row_height), b[0]))
+    layout.blocks = [to_full(b) for b in body]
+    return layout
+
+
+def has_usable_text(text: str, min_chars: int) -> bool:
+    """
+    True if an embedded PDF text layer looks like real text: long enough, and
+    almost entirely letters, digits, punctuation and whitespace (broken font
+    encodings show up as control, private-use or replacement characters).
+    """
+    stripped = text.strip()
+    if len(stripped) < min_chars:
+        return False
+    readable = sum(
+        1 for ch in stripped if ch.isspace() or unicodedata.category(ch)[0] in "LNP"
+    )
+    return readable / len(stripped) >= 0.9
+
+
+# Tesseract language packs by the script name reported by OSD
+SCRIPT_LANGUAGES = {
+    "Latin": {"eng", "fra", "deu", "spa", "ita", "por", "nld", "pol", "ces", "tur", "swe", "lat"},
+    "Cyrillic": {"rus", "ukr", "bul", "srp", "bel", "mkd"},
+    "Arabic": {"ara", "fas", "urd", "pus"},
+    "Greek": {"ell", "grc"},
+    "Hebrew": {"heb", "yid"},
+    "Devanagari": {"hin", "mar", "nep", "san"},
+    "Han": {"chi_sim", "chi_tra"},
+    "Japanese": {"jpn"},
+    "Hangul": {"kor"},
+    "Thai": {"tha"},
+}
+
+
+def languages_for_script(script: str | None, configured: str) -> str:
+    """
+    Narrow a configured "eng+rus+ara" style language list to the packs that
+    use `script`. Falls back to the full list when the script is unknown or
+    none of the configured packs match it.
+    """
+    packs = configured.split("+")
+    matching = [p for p in packs if p in SCRIPT_LANGUAGES.get(script or "", ())]
+    return "+".join(matching) if matching else configured
+
+
+def average_confidence(words: list[OCRWord]) -> float:
+    """Mean word confidence, excluding non-text (-1) and zero-confidence entries."""
+    confidences = [w.confidence for w in words if w.confidence > 0]
+    return sum(confidences) / len(confidences) if confidences else 0.0
 
 
 class BookOCR:
@@ -35,9 +322,33 @@ class BookOCR:
 
     def __init__(self, config: OCRConfig | None = None):
         self.config = config or OCRConfig()
+        self.cache = (
+            OCRCache(self.config.cache_dir, self.config.cache_max_mb * 1024 * 1024)
+            if self.config.cache_enabled
+            else None
+        )
+        # Long-lived tesserocr handles by language (one set per process)
+        self._tess_apis: dict[str, object] = {}
+        # Book-level language decisions (language_detection="book")
+        self._book_langs: dict[str, str] = {}
+
+    def preprocess_image(self, image: np.ndarray, profile: str | None = None) -> np.ndarray:
+        """
+        Apply preprocessing to improve OCR accuracy on book scans.
+
+        Profiles trade time for robustness on poor scans:
+        - fast: no denoising, coarse deskew search
+        - balanced: 3x3 median blur, coarse deskew search
+        - max-quality: non-local means denoising, fine deskew search
+
+        The deskew search covers +/-`deskew_max_angle` degrees; when the best
+        angle is at the edge of that range the page is likely skewed further,
+        and the unbounded minAreaRect estimate is used instead.
+        """
+        profile = profile or self.config.preprocess_profile
+        if profile not in PREPROCESS_PROFILES:
+            raise ValueError(f"Unknown preprocessing profile '{profile}'. Choose from: {PREPROCESS_PROFILES}")
 
-    def preprocess_image(self, image: np.ndarray) -> np.ndarray:
-        """Apply preprocessing to improve OCR accuracy on book scans."""
         # Convert to grayscale
         if len(image.shape) == 3:
             gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
@@ -45,7 +356,12 @@ class BookOCR:
             gray = image
 
         # Denoise
-        denoised = cv2.fastNlMeansDenoising(gray, h=10)
+        if profile == "max-quality":
+            denoised = cv2.fastNlMeansDenoising(gray, h=10)
+        elif profile == "balanced":
+            denoised = cv2.medianBlur(gray, 3)
+        else:
+            denoised = gray
 
         # Adaptive thresholding for uneven lighting (common in book scans)
         binary = cv2.adaptiveThreshold(
@@ -53,100 +369,550 @@ class BookOCR:
         )
 
         # Deskew — straighten rotated text
-        coords = np.column_stack(np.where(binary < 128))
-        if len(coords) > 100:
-            angle = cv2.minAreaRect(coords)[-1]
-            if angle < -45:
-                angle = 90 + angle
-            if abs(angle) > 0.5:
-                h, w = binary.shape
-                center = (w // 2, h // 2)
-                matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
-                binary = cv2.warpAffine(
-                    binary, matrix, (w, h),
-                    flags=cv2.INTER_CUBIC,
-                    borderMode=cv2.BORDER_REPLICATE,
-                )
+        max_angle = self.config.deskew_max_angle
+        step = 0.1 if profile == "max-quality" else 0.25
+        angle = estimate_skew(binary, max_angle=max_angle, step=step)
+        if abs(angle) >= max_angle - step / 2:
+            angle = min_area_rect_skew(binary)
+        if abs(angle) > 0.5:
+            h, w = binary.shape
+            center = (w // 2, h // 2)
+            matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
+            binary = cv2.warpAffine(
+                binary, matrix, (w, h),
+                flags=cv2.INTER_CUBIC if profile == "max-quality" else cv2.INTER_LINEAR,
+                borderMode=cv2.BORDER_REPLICATE,
+            )
 
         return binary
 
-    def extract_from_image(self, image_path: str, page_number: int = 1) -> OCRResult:
-        """Extract text from a single image file."""
-        logger.info(f"Processing image: {image_path}")
+    def recognize(self, image: np.ndarray, file_path: str, page_number: int) -> OCRResult:
+        """
+        Preprocess a decoded page image and run Tesseract on it.
 
-        image = cv2.imread(image_path)
-        if image is None:
-            raise ValueError(f"Could not read image: {image_path}")
+        With adaptive preprocessing, tiers are tried from cheapest to heaviest
+        and the first whose mean confidence reaches `reocr_confidence` wins;
+        otherwise the most confident attempt is kept.
+        """
+        lang = self.choose_language(image, file_path)
+        best = None
+        for tier in self.preprocessing_tiers(image):
+            prepared = self._prepare(image, tier)
+            text, words, header = self._run_ocr(prepared, lang)
+            confidence = average_confidence(words)
+            if best is None or confidence > best[0]:
+                best = (confidence, tier, text, words, header)
+            if confidence >= self.config.reocr_confidence:
+                break
+            logger.debug(
+                f"  {file_path} p{page_number}: tier '{tier}' confidence {confidence:.1f}% "
+                f"below {self.config.reocr_confidence}%"
+            )
+
+        confidence, tier, text, words, header = best
+        return OCRResult(
+            file_path=file_path,
+            page_number=page_number,
+            raw_text=text.strip(),
+            confidence=round(confidence, 2),
+            language=lang,
+            words=words,
+            tier=tier,
+            header=header,
+        )
+
+    def choose_language(self, image: np.ndarray, file_path: str) -> str:
+        """
+        Pick the Tesseract language pack(s) for a page.
+
+        With language detection on, a cheap orientation/script detection pass
+        (Tesseract OSD) runs on a half-size copy of the page, and only the
+        configured packs written in the detected script are used. In "book"
+        mode the first confident decision is reused for the rest of the book
+        (the PDF, or the directory of page images).
+        """
+        mode = self.config.language_detection
+        if mode == "off" or "+" not in self.config.tesseract_lang:
+            return self.config.tesseract_lang
+
+        book_key = file_path if file_path.lower().endswith(".pdf") else os.path.dirname(file_path)
+        if mode == "book" and book_key in self._book_langs:
+            return self._book_langs[book_key]
+
+        script = self.detect_script(image)
+        lang = languages_for_script(script, self.config.tesseract_lang)
+        if script and mode == "book":
+            self._book_langs[book_key] = lang
+        logger.debug(f"  {file_path}: script {script or 'unknown'} -> lang {lang}")
+        return lang
+
+    def detect_script(self, image: np.ndarray) -> str | None:
+        """Detect the dominant script (e.g. Latin, Cyrillic, Arabic) with Tesseract OSD."""
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        small = cv2.resize(gray, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+        try:
+            if self.config.engine == "tesserocr":
+                from tesserocr import PSM, PyTessBaseAPI
+
+                api = self._tess_apis.get("osd")
+                if api is None:
+                    api = PyTessBaseAPI(lang="osd", psm=PSM.OSD_ONLY)
+                    self._tess_apis["osd"] = api
+                small = np.ascontiguousarray(small)
+                api.SetImageBytes(small.tobytes(), small.shape[1], small.shape[0], 1, small.shape[1])
+                osd = api.DetectOrientationScript() or {}
+                api.Clear()
+                return osd.get("script_name")
+
+            osd = pytesseract.image_to_osd(small, output_type=pytesseract.Output.DICT)
+            return osd.get("script")
+        except Exception as e:
+            # OSD fails on pages with too little text; fall back to all packs
+            logger.debug(f"  Script detection failed: {e}")
+            return None
+
+    def preprocessing_tiers(self, image: np.ndarray) -> list[str]:
+        """Preprocessing tiers to try for a page, cheapest first."""
+        if not self.config.preprocessing:
+            return ["none"]
+        if not self.config.adaptive_preprocessing:
+            return [self.config.preprocess_profile]
+
+        tiers = [self.config.preprocess_profile, "max-quality"]
+        if is_clean_scan(image):
+            tiers.insert(0, "none")
+        return list(dict.fromkeys(tiers))
+
+    def _prepare(self, image: np.ndarray, tier: str) -> np.ndarray:
+        if tier == "none":
+            return image
+        return self.preprocess_image(image, tier)
+
+    def _run_ocr(self, image: np.ndarray, lang: str) -> tuple[str, list[OCRWord], str]:
+        """
+        OCR a prepared page. With layout analysis, only the detected text blocks
+        are recognized and the running header is read separately; otherwise the
+        whole page goes to Tesseract. Returns (text, words, header).
+        """
+        layout = detect_layout(image) if self.config.layout_analysis else None
+        if not layout or not layout.blocks:
+            text, words = self.run_tesseract(image, lang)
+            return text, words, ""
 
-        if self.config.preprocessing:
-            image = self.preprocess_image(image)
+        texts, words = [], []
+        for x, y, w, h in layout.blocks:
+            region_text, region_words = self.run_tesseract(image[y:y + h, x:x + w], lang)
+            # Shift boxes back to page coordinates and keep block numbers unique
+            block_offset = words[-1].block_num if words else 0
+            for word in region_words:
+                word.left += x
+                word.top += y
+                word.block_num += block_offset
+            words.extend(region_words)
+            if region_text.strip():
+                texts.append(region_text.strip())
+
+        header = ""
+        if layout.header:
+            x, y, w, h = layout.header
+            header_text, _ = self.run_tesseract(image[y:y + h, x:x + w], lang)
+            header = " ".join(header_text.split())
+
+        return "\n\n".join(texts), words, header
+
+    def run_tesseract(self, image: np.ndarray, lang: str | None = None) -> tuple[str, list[OCRWord]]:
+        """Run Tesseract on a (preprocessed) image and return text plus word data."""
+        lang = lang or self.config.tesseract_lang
+        if self.config.engine == "tesserocr":
+            return self._run_tesserocr(image, lang)
 
         # Run OCR with detailed output for confidence
         ocr_data = pytesseract.image_to_data(
-            image, lang=self.config.tesseract_lang, output_type=pytesseract.Output.DICT
+            image, lang=lang, output_type=pytesseract.Output.DICT
         )
+        words = words_from_ocr_data(ocr_data)
 
-        # Extract text
-        text = pytesseract.image_to_string(image, lang=self.config.tesseract_lang)
+        if self.config.single_pass:
+            # Rebuild the text from the same recognition pass
+            text = text_from_words(words)
+        else:
+            text = pytesseract.image_to_string(image, lang=lang)
 
-        # Calculate average confidence (excluding -1 entries which are non-text)
-        confidences = [
-            int(c) for c in ocr_data["conf"] if int(c) > 0
-        ]
-        avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return text, words
 
-        return OCRResult(
-            file_path=image_path,
-            page_number=page_number,
-            raw_text=text.strip(),
-            confidence=round(avg_confidence, 2),
-            language=self.config.tesseract_lang,
+    def _run_tesserocr(self, image: np.ndarray, lang: str) -> tuple[str, list[OCRWord]]:
+        """
+        Recognize with a long-lived in-process Tesseract handle (tesserocr).
+
+        The numpy buffer is handed to Tesseract directly, so there is no
+        subprocess start-up, model reload or temp image file per page.
+        """
+        from tesserocr import RIL
+
+        api = self._tesserocr_api(lang)
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        bytes_per_pixel = 1 if image.ndim == 2 else image.shape[2]
+        api.SetImageBytes(image.tobytes(), width, height, bytes_per_pixel, width * bytes_per_pixel)
+        api.Recognize()
+
+        words = []
+        iterator = api.GetIterator()
+        block_num = par_num = line_num = 0
+        while iterator is not None:
+            if iterator.IsAtBeginningOf(RIL.BLOCK):
+                block_num, par_num = block_num + 1, 0
+            if iterator.IsAtBeginningOf(RIL.PARA):
+                par_num, line_num = par_num + 1, 0
+            if iterator.IsAtBeginningOf(RIL.TEXTLINE):
+                line_num += 1
+
+            text = (iterator.GetUTF8Text(RIL.WORD) or "").strip()
+            box = iterator.BoundingBox(RIL.WORD)
+            if text and box:
+                x1, y1, x2, y2 = box
+                words.append(
+                    OCRWord(
+                        text=text,
+                        confidence=float(iterator.Confidence(RIL.WORD)),
+                        left=x1,
+                        top=y1,
+                        width=x2 - x1,
+                        height=y2 - y1,
+                        block_num=block_num,
+                        par_num=par_num,
+                        line_num=line_num,
+                    )
+                )
+            if not iterator.Next(RIL.WORD):
+                break
+
+        text = text_from_words(words) if self.config.single_pass else api.GetUTF8Text()
+        api.Clear()
+        return text, words
+
+    def _tesserocr_api(self, lang: str):
+        """Return the cached tesserocr handle for `lang`, initializing it on first use."""
+        api = self._tess_apis.get(lang)
+        if api is None:
+            try:
+                from tesserocr import PyTessBaseAPI
+            except ImportError as e:
+                raise RuntimeError(
+                    "OCR_ENGINE=tesserocr requires the 'tesserocr' package (pip install tesserocr)"
+                ) from e
+            api = PyTessBaseAPI(lang=lang)
+            self._tess_apis[lang] = api
+        return api
+
+    def close(self):
+        """Release in-process Tesseract handles."""
+        for api in self._tess_apis.values():
+            api.End()
+        self._tess_apis.clear()
+
+    def __enter__(self) -> "BookOCR":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def extract_from_image(self, image_path: str, page_number: int = 1) -> OCRResult:
+        """Extract text from a single image file."""
+        logger.info(f"Processing image: {image_path}")
+
+        key = None
+        if self.cache:
+            key = self.cache_key(OCRCache.file_digest(image_path), page_number=1)
+            cached = self._cached_result(key, image_path, page_number)
+            if cached:
+                return cached
+
+        image = cv2.imread(image_path)
+        if image is None:
+            raise ValueError(f"Could not read image: {image_path}")
+
+        result = self.recognize(image, image_path, page_number)
+        if key:
+            self.cache.put(key, asdict(result))
+        return result
+
+    def render_pdf_page(self, pdf_path: str, page_number: int) -> np.ndarray:
+        """Rasterize a single PDF page to a BGR numpy array."""
+        pages = convert_from_path(
+            pdf_path, dpi=self.config.dpi, first_page=page_number, last_page=page_number
         )
+        if not pages:
+            raise ValueError(f"Could not render page {page_number} of {pdf_path}")
+        return _pil_to_bgr(pages[0])
 
     def extract_from_pdf(self, pdf_path: str) -> list[OCRResult]:
         """Extract text from all pages of a PDF file."""
+        return list(self.iter_pdf(pdf_path))
+
+    def iter_pdf(self, pdf_path: str, skip_pages: set[int] | None = None) -> Iterator[OCRResult]:
+        """
+        Yield OCR results for a PDF page by page, in page order, leaving out
+        any page numbers in `skip_pages`.
+
+        Pages are rasterized in windows of `pdf_window` pages into a temporary
+        directory and decoded one at a time, so resident memory is bounded by
+        a single page image regardless of how long the PDF is. Pages with a
+        usable embedded text layer, and pages found in the OCR cache, are
+        neither rendered nor recognized.
+        """
         logger.info(f"Processing PDF: {pdf_path}")
+        total = pdfinfo_from_path(pdf_path)["Pages"]
 
-        pages = convert_from_path(pdf_path, dpi=self.config.dpi)
-        results = []
+        pages = [n for n in range(1, total + 1) if n not in (skip_pages or ())]
 
-        for i, page_image in enumerate(pages, start=1):
-            # Convert PIL Image to numpy array for OpenCV
-            image_np = np.array(page_image)
-            image_bgr = cv2.cvtColor(image_np, cv2.COLOR_RGB2BGR)
+        text_layer = self.extract_text_layer(pdf_path, total) if self.config.use_text_layer else {}
+        yield from self._iter_pages(pdf_path, pages, total, text_layer)
 
-            if self.config.preprocessing:
-                processed = self.preprocess_image(image_bgr)
-            else:
-                processed = image_bgr
+    def iter_tiff(self, tiff_path: str, skip_pages: set[int] | None = None) -> Iterator[OCRResult]:
+        """
+        Yield OCR results for each frame of a (multi-page) TIFF, in frame order.
+
+        Frames are decoded lazily one at a time with PIL, which reads only the
+        strips/tiles of the frame being loaded, so memory stays bounded by a
+        single frame even for multi-gigabyte archive TIFFs.
+        """
+        logger.info(f"Processing TIFF: {tiff_path}")
+        with Image.open(tiff_path) as tiff:
+            total = getattr(tiff, "n_frames", 1)
+
+        pages = [n for n in range(1, total + 1) if n not in (skip_pages or ())]
+        yield from self._iter_pages(tiff_path, pages, total)
+
+    def _iter_pages(
+        self,
+        file_path: str,
+        pages: list[int],
+        total: int,
+        text_layer: dict[int, str] | None = None,
+    ) -> Iterator[OCRResult]:
+        """
+        Yield results for the given pages of a multi-page file in order, taking
+        text-layer pages as-is, serving cached pages from the OCR cache, and
+        decoding/OCR-ing the rest serially or across the process pool.
+        """
+        text_layer = text_layer or {}
+        ocr_pages = [n for n in pages if n not in text_layer]
+        is_pdf = file_path.lower().endswith(".pdf")
 
-            text = pytesseract.image_to_string(
-                processed, lang=self.config.tesseract_lang
+        keys = {}
+        if self.cache and ocr_pages:
+            digest = OCRCache.file_digest(file_path)
+            keys = {n: self.cache_key(digest, n, pdf=is_pdf) for n in ocr_pages}
+            missing = [n for n, key in keys.items() if not self.cache.contains(key)]
+            self.cache.misses += len(missing)
+        else:
+            missing = ocr_pages
+
+        if self.config.workers > 1 and len(missing) > 1:
+            logger.info(f"  {total} pages, OCR on {self.config.workers} workers")
+            pool = self._executor()
+            # map() yields in submission order, so results stay in page order;
+            # each worker decodes only its own page
+            fresh = pool.map(_ocr_page_worker, repeat(file_path), missing)
+        else:
+            pool = None
+            fresh = (
+                self.recognize(image, file_path, n)
+                for n, image in self._iter_images(file_path, missing)
             )
 
-            ocr_data = pytesseract.image_to_data(
-                processed,
-                lang=self.config.tesseract_lang,
-                output_type=pytesseract.Output.DICT,
+        try:
+            missing_set = set(missing)
+            for page_number in pages:
+                if page_number in text_layer:
+                    result = OCRResult(
+                        file_path=file_path,
+                        page_number=page_number,
+                        raw_text=text_layer[page_number],
+                        confidence=0.0,
+                        language=self.config.tesseract_lang,
+                        tier=TEXT_LAYER,
+                    )
+                    self._log_page(result, total)
+                    yield result
+                    continue
+
+                result = None
+                if page_number not in missing_set:
+                    result = self._cached_result(keys[page_number], file_path, page_number)
+                if result is None:
+                    if page_number not in missing_set:
+                        # Entry vanished (evicted) since the lookup; OCR it directly
+                        image = self.load_page(file_path, page_number)
+                        result = self.recognize(image, file_path, page_number)
+                    else:
+                        result = next(fresh)
+                    if self.cache:
+                        self.cache.put(keys[page_number], asdict(result))
+                self._log_page(result, total)
+                yield result
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+    def page_count(self, file_path: str) -> int:
+        """Number of pages in a scan file (1 for single images)."""
+        ext = Path(file_path).suffix.lower()
+        if ext == ".pdf":
+            return pdfinfo_from_path(file_path)["Pages"]
+        if ext in TIFF_FORMATS:
+            with Image.open(file_path) as tiff:
+                return getattr(tiff, "n_frames", 1)
+        return 1
+
+    def extract_page(self, file_path: str, page_number: int) -> OCRResult:
+        """
+        OCR a single page of an image, TIFF or PDF, using the OCR cache and (for
+        PDFs) the page's text layer. Used by page-level queue jobs.
+        """
+        ext = Path(file_path).suffix.lower()
+        if ext != ".pdf" and ext not in TIFF_FORMATS:
+            return self.extract_from_image(file_path)
+
+        total = self.page_count(file_path)
+        if not 1 <= page_number <= total:
+            raise ValueError(f"{file_path} has no page {page_number} ({total} pages)")
+        text_layer = (
+            self.extract_text_layer(file_path, total, page_number, page_number)
+            if ext == ".pdf" and self.config.use_text_layer
+            else {}
+        )
+        return next(self._iter_pages(file_path, [page_number], total, text_layer))
+
+    def load_page(self, file_path: str, page_number: int) -> np.ndarray:
+        """Decode one page of a PDF or multi-frame TIFF to a BGR numpy array."""
+        if file_path.lower().endswith(".pdf"):
+            return self.render_pdf_page(file_path, page_number)
+        return self.read_tiff_frame(file_path, page_number)
+
+    def read_tiff_frame(self, tiff_path: str, page_number: int) -> np.ndarray:
+        """Decode a single TIFF frame (1-based) without touching the other frames."""
+        with Image.open(tiff_path) as tiff:
+            tiff.seek(page_number - 1)
+            return _pil_to_bgr(tiff)
+
+    def _iter_images(self, file_path: str, page_numbers: list[int]) -> Iterator[tuple[int, np.ndarray]]:
+        if file_path.lower().endswith(".pdf"):
+            yield from self._render_pages(file_path, page_numbers)
+            return
+
+        with Image.open(file_path) as tiff:
+            for page_number in page_numbers:
+                tiff.seek(page_number - 1)
+                image = _pil_to_bgr(tiff)
+                yield page_number, image
+                del image
+
+    def extract_text_layer(
+        self, pdf_path: str, total: int, first_page: int = 1, last_page: int | None = None
+    ) -> dict[int, str]:
+        """
+        Read the embedded text layer of a PDF with poppler's pdftotext (installed
+        alongside pdf2image) and return {page_number: text} for the pages whose
+        text is usable. Scanned pages without a text layer are left out.
+        `first_page`/`last_page` limit the read to a page range.
+        """
+        last_page = min(last_page or total, total)
+        try:
+            completed = subprocess.run(
+                ["pdftotext", "-enc", "UTF-8", "-f", str(first_page), "-l", str(last_page), pdf_path, "-"],
+                capture_output=True,
+                check=True,
             )
-            confidences = [int(c) for c in ocr_data["conf"] if int(c) > 0]
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
-
-            results.append(
-                OCRResult(
-                    file_path=pdf_path,
-                    page_number=i,
-                    raw_text=text.strip(),
-                    confidence=round(avg_confidence, 2),
-                    language=self.config.tesseract_lang,
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"Could not read text layer of {pdf_path}: {e}")
+            return {}
+
+        # pdftotext ends every page with a form feed
+        pages = completed.stdout.decode("utf-8", errors="replace").split("\f")
+        usable = {
+            n: text.strip()
+            for n, text in enumerate(pages[: last_page - first_page + 1], start=first_page)
+            if has_usable_text(text, self.config.text_layer_min_chars)
+        }
+        if usable and last_page > first_page:
+            logger.info(f"  {len(usable)}/{total} pages have a usable text layer")
+        return usable
+
+    def _render_pages(self, pdf_path: str, page_numbers: list[int]) -> Iterator[tuple[int, np.ndarray]]:
+        """
+        Rasterize the given pages in windows of contiguous pages (at most
+        `pdf_window` each) via a temp directory, decoding one page at a time.
+        """
+        window = max(1, self.config.pdf_window)
+        runs: list[list[int]] = []
+        for n in page_numbers:
+            if runs and n == runs[-1][-1] + 1 and len(runs[-1]) < window:
+                runs[-1].append(n)
+            else:
+                runs.append([n])
+
+        for run in runs:
+            with tempfile.TemporaryDirectory(prefix="digitize-pdf-") as tmp_dir:
+                page_paths = convert_from_path(
+                    pdf_path,
+                    dpi=self.config.dpi,
+                    first_page=run[0],
+                    last_page=run[-1],
+                    output_folder=tmp_dir,
+                    paths_only=True,
                 )
-            )
-            logger.info(f"  Page {i}/{len(pages)} done (confidence: {avg_confidence:.1f}%)")
+                for page_number, page_path in zip(run, page_paths):
+                    image = cv2.imread(page_path)
+                    if image is None:
+                        raise ValueError(f"Could not render page {page_number} of {pdf_path}")
+                    os.remove(page_path)
+                    yield page_number, image
+                    del image
+
+    def cache_key(self, digest: str, page_number: int, pdf: bool = False) -> str:
+        """Cache key for one page: source bytes plus every setting that changes the output."""
+        return OCRCache.make_key(
+            source=digest,
+            page=page_number,
+            lang=self.config.tesseract_lang,
+            dpi=self.config.dpi if pdf else None,
+            preprocessing=self.config.preprocessing and self.config.preprocess_profile,
+            deskew_max_angle=self.config.deskew_max_angle,
+            single_pass=self.config.single_pass,
+            engine=self.config.engine,
+            adaptive=self.config.adaptive_preprocessing and self.config.reocr_confidence,
+            layout=self.config.layout_analysis,
+            language_detection=self.config.language_detection,
+        )
 
-        return results
+    def _cached_result(self, key: str, file_path: str, page_number: int) -> OCRResult | None:
+        payload = self.cache.get(key)
+        if payload is None:
+            return None
+        payload["words"] = [OCRWord(**w) for w in payload.get("words", [])]
+        # The same bytes may live under another name or page position
+        payload.update(file_path=file_path, page_number=page_number)
+        return OCRResult(**payload)
 
-    def process_file(self, file_path: str) -> list[OCRResult]:
-        """Process a single file (image or PDF) and return OCR results."""
+    @staticmethod
+    def _log_page(result: OCRResult, total: int):
+        source = "text layer" if result.tier == TEXT_LAYER else f"confidence: {result.confidence:.1f}%"
+        logger.info(f"  Page {result.page_number}/{total} done ({source})")
+
+    def process_file(self, file_path: str, skip: set[tuple[str, int]] | None = None) -> list[OCRResult]:
+        """
+        Process a single file (image or PDF) and return OCR results.
+
+        `skip` holds (file_path, page_number) pairs to leave out, e.g. duplicates.
+        """
+        return list(self.iter_file(file_path, skip))
+
+    def iter_file(self, file_path: str, skip: set[tuple[str, int]] | None = None) -> Iterator[OCRResult]:
+        """Like process_file, but yields results as pages are recognized."""
         ext = Path(file_path).suffix.lower()
 
         if ext not in self.config.supported_formats:
@@ -154,31 +920,111 @@ class BookOCR:
                 f"Unsupported format '{ext}'. Supported: {self.config.supported_formats}"
             )
 
+        skip_pages = {n for path, n in (skip or ()) if path == file_path}
         if ext == ".pdf":
-            return self.extract_from_pdf(file_path)
-        else:
-            return [self.extract_from_image(file_path)]
+            yield from self.iter_pdf(file_path, skip_pages)
+        elif ext in TIFF_FORMATS:
+            yield from self.iter_tiff(file_path, skip_pages)
+        elif 1 not in skip_pages:
+            yield self.extract_from_image(file_path)
 
-    def process_directory(self, directory: str) -> list[OCRResult]:
-        """Process all supported files in a directory."""
+    def list_files(self, directory: str) -> list[Path]:
+        """Supported scan files in a directory, in processing order."""
         dir_path = Path(directory)
         if not dir_path.is_dir():
             raise ValueError(f"Directory not found: {directory}")
 
-        all_results = []
-        files = sorted(
+        return sorted(
             f
             for f in dir_path.iterdir()
             if f.suffix.lower() in self.config.supported_formats
         )
 
+    def process_directory(self, directory: str, skip: set[tuple[str, int]] | None = None) -> list[OCRResult]:
+        """Process all supported files in a directory."""
+        return list(self.iter_directory(directory, skip))
+
+    def iter_directory(self, directory: str, skip: set[tuple[str, int]] | None = None) -> Iterator[OCRResult]:
+        """
+        Like process_directory, but yields results in file order as they are
+        recognized. With several workers, at most two files per worker are in
+        flight, so memory stays bounded for large directories.
+        """
+        files = self.list_files(directory)
         logger.info(f"Found {len(files)} files to process in {directory}")
 
+        if self.config.workers > 1 and len(files) > 1:
+            with self._executor() as pool:
+                remaining = iter(files)
+                pending = deque()
+                for file in remaining:
+                    pending.append((file, pool.submit(_ocr_file_worker, str(file), skip)))
+                    if len(pending) >= self.config.workers * 2:
+                        break
+                while pending:
+                    file, future = pending.popleft()
+                    next_file = next(remaining, None)
+                    if next_file is not None:
+                        pending.append((next_file, pool.submit(_ocr_file_worker, str(next_file), skip)))
+                    try:
+                        results, (hits, misses) = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to process {file}: {e}")
+                        continue
+                    if self.cache:
+                        self.cache.hits += hits
+                        self.cache.misses += misses
+                    yield from results
+            return
+
         for file in files:
             try:
-                results = self.process_file(str(file))
-                all_results.extend(results)
+                yield from self.iter_file(str(file), skip)
             except Exception as e:
                 logger.error(f"Failed to process {file}: {e}")
 
-        return all_results
+    def _executor(self) -> ProcessPoolExecutor:
+        # Never fork: in streaming mode this process already runs GPT, event-loop and
+        # store threads, and a forked child could inherit one of their locks held
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        return ProcessPoolExecutor(
+            max_workers=self.config.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.config,),
+        )
+
+
+def _pil_to_bgr(page_image: Image.Image) -> np.ndarray:
+    """Convert a PIL image to a BGR numpy array for OpenCV."""
+    image_np = np.array(page_image.convert("RGB"))
+    return cv2.cvtColor(image_np, cv2.COLOR_RGB2BGR)
+
+
+# Per-process OCR engine used by pool workers. Workers run serially
+# (workers=1) so a file handed to one worker never spawns a nested pool.
+_worker_ocr: BookOCR | None = None
+
+
+def _init_worker(config: OCRConfig):
+    global _worker_ocr
+    _worker_ocr = BookOCR(replace(config, workers=1))
+    # Pool workers exit without returning to our code; end their Tesseract handles then
+    multiprocessing.util.Finalize(None, _worker_ocr.close, exitpriority=10)
+
+
+def _ocr_file_worker(
+    file_path: str, skip: set[tuple[str, int]] | None
+) -> tuple[list[OCRResult], tuple[int, int]]:
+    """OCR one file; also returns this call's cache (hits, misses) for the parent to tally."""
+    cache = _worker_ocr.cache
+    before = (cache.hits, cache.misses) if cache else (0, 0)
+    results = _worker_ocr.process_file(file_path, skip)
+    after = (cache.hits, cache.misses) if cache else (0, 0)
+    return results, (after[0] - before[0], after[1] - before[1])
+
+
+def _ocr_page_worker(file_path: str, page_number: int) -> OCRResult:
+    image = _worker_ocr.load_page(file_path, page_number)
+    return _worker_ocr.recognize(image, file_path, page_number)
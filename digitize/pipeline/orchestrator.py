@@ -3,35 +3,93 @@ Main pipeline orchestrator.
 
 Flow: Scan Directory -> OCR -> GPT Processing -> PostgreSQL Storage
 
+run() does each step for the whole book before the next; run_streaming()
+overlaps them, passing pages between the stages through bounded queues, and
+can checkpoint each page so an interrupted run is resumed with resume().
+
 Usage:
     from digitize.pipeline.orchestrator import DigitizationPipeline
     from digitize.config.settings import PipelineConfig
 
     config = PipelineConfig()
-    pipeline = DigitizationPipeline(config)
-    pipeline.setup()
-    book_id = pipeline.run("/path/to/scanned/book/images")
+    with DigitizationPipeline(config) as pipeline:
+        pipeline.setup()
+        book_id = pipeline.run("/path/to/scanned/book/images")
 """
 
 import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
+from typing import Iterator
 
 from digitize.config.settings import PipelineConfig
-from digitize.ocr.extractor import BookOCR
-from digitize.ai_processor.gpt_processor import GPTProcessor
+from digitize.ocr.dedup import DedupReport, PageDeduplicator
+from digitize.ocr.extractor import BookOCR, OCRResult
+from digitize.ai_processor.async_processor import AsyncGPTProcessor
+from digitize.ai_processor.batch import GPTBatchProcessor
+from digitize.ai_processor.gpt_processor import BookMetadata, GPTProcessor, ProcessedText
+from digitize.pipeline.streaming import Stage, StagedRunner, StageStats
+from digitize.storage.jobs import JobQueue
+from digitize.storage.manifest import ManifestEntry, manifest_entry, scan_manifest
 from digitize.storage.repository import BookRepository
+from digitize.storage.runs import CheckpointedPage, RunStore
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class UpdateReport:
+    """What an incremental update found and did, by source file."""
+    unchanged: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    # Old path -> new path of files found elsewhere with the same contents; their pages are kept
+    moved: dict[str, str] = field(default_factory=dict)
+    # Changed or new files left as stored because GPT failed on them; retried by the next update
+    failed: list[str] = field(default_factory=list)
+    pages_processed: int = 0
+    total_pages: int = 0
+
+
 class DigitizationPipeline:
     """Orchestrates the full digitization pipeline: OCR -> GPT -> Postgres."""
 
     def __init__(self, config: PipelineConfig | None = None):
         self.config = config or PipelineConfig()
         self.ocr = BookOCR(self.config.ocr)
-        self.processor = GPTProcessor(self.config.openai)
+        self.processor = (
+            AsyncGPTProcessor(self.config.openai)
+            if self.config.openai.max_concurrency > 1
+            else GPTProcessor(self.config.openai)
+        )
         self.repository = BookRepository(self.config.db)
+        self.deduplicator = PageDeduplicator(self.config.dedup_max_distance)
+        # Duplicate pages skipped by the most recent run()
+        self.dedup_report = DedupReport()
+        # Per-stage throughput of the most recent run_streaming()
+        self.stage_stats: list[StageStats] = []
+        self._batch_processor: GPTBatchProcessor | None = None
+        self._run_store: RunStore | None = None
+        # ID of the most recent checkpointed run
+        self.run_id: str | None = None
+        # Size, mtime and hash of the source files of the most recent run
+        self.manifest: dict[str, ManifestEntry] = {}
+
+    def close(self):
+        """Release Tesseract handles and API clients."""
+        self.ocr.close()
+        self.processor.close()
+        if self._batch_processor is not None:
+            self._batch_processor.close()
+
+    def __enter__(self) -> "DigitizationPipeline":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     def setup(self):
         """Initialize database tables."""
@@ -48,21 +106,11 @@ class DigitizationPipeline:
         Returns:
             The database ID of the created book record.
         """
-        path = Path(source_path)
+        if self.config.streaming or self.config.checkpoints:
+            return self.run_streaming(source_path)
 
         # Step 1: OCR — extract raw text from scans
-        logger.info(f"[1/3] Running OCR on: {source_path}")
-        if path.is_dir():
-            ocr_results = self.ocr.process_directory(source_path)
-        elif path.is_file():
-            ocr_results = self.ocr.process_file(source_path)
-        else:
-            raise FileNotFoundError(f"Source not found: {source_path}")
-
-        if not ocr_results:
-            raise ValueError(f"No text could be extracted from: {source_path}")
-
-        logger.info(f"  OCR complete: {len(ocr_results)} pages extracted")
+        ocr_results = self.run_ocr(source_path)
 
         # Step 2: GPT — clean, understand, and structure the text
         logger.info(f"[2/3] Processing {len(ocr_results)} pages with GPT...")
@@ -74,11 +122,515 @@ class DigitizationPipeline:
         book_id = self.repository.create_book(
             source_directory=source_path,
             processed_pages=processed_pages,
+            manifest=self.manifest,
         )
         logger.info(f"  Stored as book ID: {book_id}")
 
         return book_id
 
+    def run_ocr(self, source_path: str) -> list[OCRResult]:
+        """Dedup and OCR a file or directory of scans, returning one result per kept page."""
+        ocr_results = list(self.iter_ocr(source_path))
+        if not ocr_results:
+            raise ValueError(f"No text could be extracted from: {source_path}")
+
+        logger.info(f"  OCR complete: {len(ocr_results)} pages extracted")
+        return ocr_results
+
+    def iter_ocr(
+        self,
+        source_path: str,
+        done: set[tuple[str, int]] | None = None,
+        first_page: int = 1,
+        exclude_book_id: int | None = None,
+    ) -> Iterator[OCRResult]:
+        """
+        Dedup a file or directory of scans, then yield OCR results page by page.
+
+        Pages of a directory are numbered from `first_page` in processing order,
+        since every single-image file is its own page 1; pages of a single PDF
+        or TIFF keep their page number in the file. `done` holds (file, page)
+        keys already OCR'd by an earlier attempt of a checkpointed run.
+        """
+        path = Path(source_path)
+        files = self.source_files(source_path)
+        # Taken before OCR so a file changed mid-run is seen as changed by a later update
+        self.manifest = scan_manifest(files)
+        skip = self.dedup(files, exclude_book_id) | (done or set())
+
+        logger.info(f"[1/3] Running OCR on: {source_path}")
+        if path.is_dir():
+            ocr_results = self.ocr.iter_directory(source_path, skip)
+        else:
+            ocr_results = self.ocr.iter_file(source_path, skip)
+
+        for book_page, result in enumerate(ocr_results, start=first_page):
+            # Dedup hashes are keyed by the page's position in its file
+            result.source_page = result.page_number
+            result.page_hash = self.dedup_report.hashes.get((result.file_path, result.page_number), "")
+            if path.is_dir():
+                result.page_number = book_page
+            yield result
+
+    def source_files(self, source_path: str) -> list[str]:
+        """Scan files of a single file or directory source, in processing order."""
+        path = Path(source_path)
+        if path.is_dir():
+            return [str(f) for f in self.ocr.list_files(source_path)]
+        if path.is_file():
+            return [source_path]
+        raise FileNotFoundError(f"Source not found: {source_path}")
+
+    def dedup(self, files: list[str], exclude_book_id: int | None = None) -> set[tuple[str, int]]:
+        """Hash page images and return the (file, page) keys to skip as near-duplicates."""
+        self.dedup_report = DedupReport()
+        if self.config.dedup_pages:
+            logger.info(f"Checking {len(files)} file(s) for duplicate pages...")
+            known = (
+                self.repository.get_page_hashes(exclude_book_id)
+                if self.config.dedup_across_collection
+                else None
+            )
+            self.dedup_report = self.deduplicator.find_duplicates(files, known)
+        return self.dedup_report.skipped
+
+    def plan_pages(self, source_path: str) -> list[tuple[str, int, int, str]]:
+        """
+        (file_path, page in file, book page number, page hash) for every page
+        of a source that survives dedup, numbered as iter_ocr() numbers them.
+        """
+        files = self.source_files(source_path)
+        skip = self.dedup(files)
+        numbered = Path(source_path).is_dir()
+        pages = []
+        for file_path in files:
+            for source_page in range(1, self.ocr.page_count(file_path) + 1):
+                if (file_path, source_page) in skip:
+                    continue
+                page_number = len(pages) + 1 if numbered else source_page
+                page_hash = self.dedup_report.hashes.get((file_path, source_page), "")
+                pages.append((file_path, source_page, page_number, page_hash))
+        return pages
+
+    def enqueue_pages(self, queue: JobQueue, source_path: str) -> int:
+        """
+        Create a book for `source_path` and queue one job per page for
+        distributed workers, plus the job that finishes the book. Returns the
+        book ID. (Whole-book jobs are queued with JobQueue.enqueue_book.)
+        """
+        planned = self.plan_pages(source_path)
+        if not planned:
+            raise ValueError(f"No pages found in: {source_path}")
+        book_id = self.repository.start_book(source_path)
+        manifest = scan_manifest(dict.fromkeys(file_path for file_path, *_ in planned))
+        queue.enqueue_pages(book_id, source_path, planned, manifest)
+        logger.info(f"Queued {len(planned)} page jobs for book ID {book_id}")
+        return book_id
+
+    @property
+    def run_store(self) -> RunStore:
+        if self._run_store is None:
+            self._run_store = RunStore(self.config.run_state_url or self.config.db.connection_string)
+        return self._run_store
+
+    def resume(self, run_id: str) -> int:
+        """Resume a checkpointed run; returns the database ID of its book."""
+        return self.run_streaming(run_id=run_id)
+
+    def _streaming_processor(self) -> AsyncGPTProcessor:
+        """
+        The GPT stage's threads send requests concurrently, so they always go
+        through AsyncGPTProcessor: one RPM/TPM limiter and one 429 pause for all.
+        """
+        if not isinstance(self.processor, AsyncGPTProcessor):
+            self.processor.close()
+            self.processor = AsyncGPTProcessor(self.config.openai)
+        return self.processor
+
+    def run_streaming(self, source_path: str | None = None, run_id: str | None = None) -> int:
+        """
+        Run the pipeline with OCR, GPT and storage overlapping.
+
+        OCR results feed a pool of `gpt_workers` threads through a bounded
+        queue, and processed pages are committed `batch_size` at a time as they
+        arrive, so memory use does not grow with the book. With page packing
+        on, pages waiting together are sent as packed requests. Pages whose
+        GPT processing failed are not stored. Per-stage throughput is logged
+        and kept in `stage_stats`.
+
+        With checkpoints enabled (or when resuming `run_id`) every page's OCR
+        and GPT results are recorded in the run store as they are produced. A
+        resumed run reuses them, OCRs only the pages it never reached, and
+        retries pages whose GPT processing failed; failed pages are kept out
+        of the book until a later attempt succeeds.
+
+        Returns:
+            The database ID of the created book record.
+        """
+        processor = self._streaming_processor()
+        runs = self.run_store if (self.config.checkpoints or run_id) else None
+        checkpoint: list[CheckpointedPage] = []
+        book_id: int | None = None
+        if run_id:
+            run = runs.get_run(run_id)
+            source_path, book_id = run["source_path"], run["book_id"]
+            checkpoint = runs.pages(run_id)
+            runs.set_status(run_id, "running")
+            logger.info(f"Resuming run {run_id} ({len(checkpoint)} pages recorded)")
+        elif runs:
+            run_id = runs.create_run(source_path)
+            logger.info(f"Run ID: {run_id}")
+        self.run_id = run_id
+
+        # Pages may have been stored just before a crash without being marked
+        stored_pages = self.repository.get_page_numbers(book_id) if book_id else set()
+        unmarked = [p.page_number for p in checkpoint if p.page_number in stored_pages and p.status != "stored"]
+        if unmarked:
+            runs.mark_stored(run_id, unmarked)
+        # GPT results to reuse instead of calling GPT again
+        done = {p.page_number: p.processed for p in checkpoint if p.status == "processed"}
+        stored = len(stored_pages)
+        failed: list[int] = []
+        # Book-level metadata: the metadata-pass pages, or the earliest page with content
+        metadata_pages: list[OCRResult] = []
+        meta_page: ProcessedText | None = None
+
+        def note_metadata_page(result: OCRResult):
+            if (
+                self.config.openai.book_metadata
+                and result.raw_text.strip()
+                and len(metadata_pages) < self.config.openai.metadata_pages
+            ):
+                metadata_pages.append(processor.clean_page(result))
+
+        def note_stored(page: ProcessedText):
+            nonlocal meta_page
+            if (page.title or page.cleaned_text) and (
+                meta_page is None or page.page_number < meta_page.page_number
+            ):
+                meta_page = page
+
+        for page in checkpoint:
+            note_metadata_page(page.ocr)
+            if page.page_number in stored_pages and page.processed:
+                note_stored(page.processed)
+
+        def ocr_source() -> Iterator[OCRResult]:
+            for page in checkpoint:
+                if page.page_number not in stored_pages:
+                    yield page.ocr
+            # Recorded pages are always the first ones in processing order
+            recorded = {(p.ocr.file_path, p.ocr.source_page) for p in checkpoint}
+            for result in self.iter_ocr(source_path, recorded, len(checkpoint) + 1, book_id):
+                if runs:
+                    runs.save_ocr(run_id, result)
+                note_metadata_page(result)
+                yield result
+
+        def keep(processed: ProcessedText, fresh: bool) -> ProcessedText | None:
+            if fresh and runs:
+                runs.save_processed(run_id, processed)
+            if processed.error:
+                failed.append(processed.page_number)
+                return None  # left out of the book until a resumed run succeeds
+            return processed
+
+        def process(result: OCRResult) -> ProcessedText | None:
+            processed = done.get(result.page_number)
+            if processed is not None:
+                return keep(processed, fresh=False)
+            return keep(processor.process_page(result), fresh=True)
+
+        def process_pack(results: list[OCRResult]) -> list[ProcessedText]:
+            # Pages that arrive together are sent as packed requests
+            fresh = iter(processor.process_pages([r for r in results if r.page_number not in done]))
+            kept = []
+            for result in results:
+                processed = done.get(result.page_number)
+                processed = keep(processed, fresh=False) if processed else keep(next(fresh), fresh=True)
+                if processed is not None:
+                    kept.append(processed)
+            return kept
+
+        def store(pages: list[ProcessedText]):
+            nonlocal book_id, stored
+            if book_id is None:
+                book_id = self.repository.start_book(source_path)
+                if runs:
+                    runs.set_status(run_id, "running", book_id=book_id)
+            self.repository.add_pages(book_id, pages, self.manifest)
+            if runs:
+                runs.mark_stored(run_id, [page.page_number for page in pages])
+            stored += len(pages)
+            for page in pages:
+                note_stored(page)
+            logger.info(f"  Stored {stored} pages")
+
+        if self.config.openai.pack_pages:
+            gpt_stage = Stage(
+                "gpt",
+                process_pack,
+                workers=self.config.gpt_workers,
+                batch_size=self.config.openai.pack_max_pages,
+                expands=True,
+            )
+        else:
+            gpt_stage = Stage("gpt", process, workers=self.config.gpt_workers)
+        runner = StagedRunner(
+            [
+                gpt_stage,
+                Stage("store", store, batch_size=self.config.batch_size),
+            ],
+            queue_size=self.config.queue_size,
+            source_name="ocr",
+        )
+        logger.info(
+            f"Streaming {source_path}: OCR -> GPT ({self.config.gpt_workers} workers) -> PostgreSQL"
+        )
+        started = time.monotonic()
+        try:
+            runner.run(ocr_source())
+        except Exception as e:
+            if runs:
+                runs.set_status(run_id, "failed", book_id=book_id, error=str(e))
+                logger.error(f"Run {run_id} failed; resume with: digitize --resume {run_id}")
+            raise
+        finally:
+            self.stage_stats = runner.stats
+            for stats in self.stage_stats:
+                logger.info(f"  {stats.summary()}")
+
+        if book_id is None:
+            error = (
+                f"GPT processing failed for all {len(failed)} pages of: {source_path}"
+                if failed
+                else f"No text could be extracted from: {source_path}"
+            )
+            if runs:
+                runs.set_status(run_id, "incomplete" if failed else "failed", error=error)
+            raise ValueError(error)
+
+        meta = processor.extract_book_metadata(metadata_pages) if metadata_pages else meta_page
+        self.repository.finish_book(book_id, meta, stored)
+        logger.info(f"  Stored as book ID: {book_id} in {time.monotonic() - started:.1f}s")
+        if runs:
+            runs.set_status(run_id, "incomplete" if failed else "completed", book_id=book_id)
+            if failed:
+                logger.warning(
+                    f"  {len(failed)} page(s) failed GPT processing and were not stored; "
+                    f"retry them with: digitize --resume {run_id}"
+                )
+        elif failed:
+            logger.warning(
+                f"  {len(failed)} page(s) failed GPT processing and were not stored; "
+                "run with --checkpoint to be able to retry them"
+            )
+        return book_id
+
+    def update(self, book_id: int, source_path: str | None = None) -> UpdateReport:
+        """
+        Bring a stored book up to date with its scans, processing only what changed.
+
+        Files are compared with the manifest stored on the book's pages: a file
+        whose size and mtime match is unchanged without being read, otherwise
+        its content hash decides. A file that is gone from its stored path is
+        matched by content hash against the new files, so moved or renamed scans
+        keep their pages under the new path. Only pages of new and changed files are
+        deduplicated, OCR'd and sent to GPT; they are upserted by (file, page in
+        file), pages of removed files are deleted, and pages are renumbered in
+        file order. Book-level metadata is kept. Nothing is written if OCR of
+        any changed file fails; a file with a page GPT fails on is left as
+        stored and listed in the report's `failed`.
+
+        Args:
+            book_id: The book to update.
+            source_path: Where the scans are now (default: the book's source directory).
+        """
+        info = self.repository.get_book_info(book_id)
+        source_path = source_path or info["source_directory"]
+        files = self.source_files(source_path)
+        stored = self.repository.get_manifest(book_id)
+        by_file: dict[str, list[dict]] = {}
+        for row in stored:
+            by_file.setdefault(row["source_file"], []).append(row)
+
+        # Diff the directory against the manifest
+        report = UpdateReport()
+        manifest: dict[str, ManifestEntry] = {}
+        for file in files:
+            rows = by_file.get(file)
+            if not rows:
+                report.added.append(file)
+                continue
+            # Pages stored before manifests existed cannot be matched; reprocess their files
+            known = rows[0]["file_digest"] and all(row["source_page"] for row in rows)
+            stat = os.stat(file)
+            if known and (rows[0]["file_size"], rows[0]["file_mtime"]) == (stat.st_size, stat.st_mtime):
+                report.unchanged.append(file)
+                continue
+            manifest[file] = manifest_entry(file)
+            if known and manifest[file].digest == rows[0]["file_digest"]:
+                report.unchanged.append(file)  # touched or copied; only the mtime is refreshed
+            else:
+                report.changed.append(file)
+        current = set(files)
+        # A new file with the contents of a stored file that is gone was moved or renamed
+        gone = {
+            rows[0]["file_digest"]: file
+            for file, rows in by_file.items()
+            if file not in current and rows[0]["file_digest"] and all(row["source_page"] for row in rows)
+        }
+        if gone:
+            for file in list(report.added):
+                manifest[file] = manifest_entry(file)
+                old = gone.pop(manifest[file].digest, None)
+                if old is None:
+                    continue
+                report.added.remove(file)
+                report.moved[old] = file
+                by_file[file] = by_file.pop(old)
+                for row in by_file[file]:
+                    row["source_file"] = file
+        report.removed = [file for file in by_file if file not in current]
+        logger.info(
+            f"Update of book {book_id}: {len(report.changed)} changed, {len(report.added)} new, "
+            f"{len(report.moved)} moved, {len(report.removed)} removed, {len(report.unchanged)} unchanged file(s)"
+        )
+
+        process = report.changed + report.added
+        moved_source = source_path if source_path != info["source_directory"] else None
+        if not (process or report.removed or manifest or moved_source):
+            report.total_pages = len(stored)
+            return report
+        for file in process:
+            manifest.setdefault(file, manifest_entry(file))
+
+        # Dedup new and changed pages against each other and the unchanged pages
+        self.dedup_report = DedupReport()
+        if self.config.dedup_pages and process:
+            unchanged = set(report.unchanged) | set(report.moved.values())
+            known_hashes = [
+                (row["page_hash"], f"page {row['page_number']}", row["source_file"], row["source_page"])
+                for row in stored
+                if row["source_file"] in unchanged and row["page_hash"]
+            ]
+            if self.config.dedup_across_collection:
+                known_hashes += self.repository.get_page_hashes(exclude_book_id=book_id)
+            self.dedup_report = self.deduplicator.find_duplicates(process, known_hashes)
+        skip = self.dedup_report.skipped
+
+        # Page numbers of the updated book: every kept page, in file order
+        numbered = Path(source_path).is_dir()
+        new_pages = {
+            file: [(file, n) for n in range(1, self.ocr.page_count(file) + 1) if (file, n) not in skip]
+            for file in process
+        }
+
+        def page_numbers() -> dict[tuple[str, int], int]:
+            order = []
+            for file in files:
+                if file in new_pages:
+                    order += new_pages[file]
+                elif file in by_file:
+                    order += sorted((file, row["source_page"]) for row in by_file[file])
+            return {key: (i if numbered else key[1]) for i, key in enumerate(order, start=1)}
+
+        numbers = page_numbers()
+
+        ocr_results = []
+        for file in process:
+            for result in self.ocr.iter_file(file, skip):
+                result.source_page = result.page_number
+                result.page_hash = self.dedup_report.hashes.get((file, result.source_page), "")
+                result.page_number = numbers[(file, result.source_page)]
+                ocr_results.append(result)
+
+        processed_pages = []
+        if ocr_results:
+            logger.info(f"Processing {len(ocr_results)} new or changed pages with GPT...")
+            book = None
+            if self.config.openai.book_metadata:
+                book = BookMetadata(
+                    title=info["title"],
+                    author=info["author"],
+                    genre=info["genre"],
+                    estimated_period=info["estimated_period"],
+                    detected_language=info["detected_language"] or "Unknown",
+                    language_code=info["language_code"] or "und",
+                )
+            processed_pages = self.processor.process_batch(ocr_results, book)
+
+        # A file with a page GPT failed on keeps its old pages and manifest entry,
+        # so the next update sees it as changed again and retries it
+        report.failed = sorted({page.source_file for page in processed_pages if page.error})
+        if report.failed:
+            logger.warning(f"GPT processing failed for {len(report.failed)} file(s); they were left as stored")
+            failed = set(report.failed)
+            for file in failed:
+                del new_pages[file]
+                del manifest[file]
+            processed_pages = [page for page in processed_pages if page.source_file not in failed]
+            numbers = page_numbers()
+            for page in processed_pages:
+                page.page_number = numbers[(page.source_file, page.source_page)]
+
+        self.repository.update_pages(
+            book_id, numbers, processed_pages, manifest, moved=report.moved, source_directory=moved_source
+        )
+        report.pages_processed = len(processed_pages)
+        report.total_pages = len(numbers)
+        return report
+
+    def submit_batch_job(self, sources: list[str]) -> str:
+        """
+        OCR several books and submit all their pages as one OpenAI Batch API job.
+
+        Returns the local job ID; pass it to finish_batch_job() (possibly from a
+        later process) to wait for the batch and store the books.
+        """
+        books = {}
+        # Taken at OCR time and kept with the job, so a file changed before the
+        # books are stored is seen as changed by a later update
+        manifest: dict[str, ManifestEntry] = {}
+        for source in sources:
+            try:
+                books[source] = self.run_ocr(source)
+            except Exception as e:
+                logger.error(f"Failed to OCR {source}: {e}")
+                continue
+            manifest.update(self.manifest)
+        if not books:
+            raise ValueError("No pages could be extracted from any source")
+
+        logger.info(f"[2/3] Submitting {sum(len(r) for r in books.values())} pages to the Batch API...")
+        return self.batch_processor.submit(books, {path: asdict(entry) for path, entry in manifest.items()})
+
+    def finish_batch_job(self, job_id: str) -> list[int]:
+        """Wait for a submitted batch job (resuming polling if needed) and store its books."""
+        self.batch_processor.wait(job_id)
+        results = self.batch_processor.collect(job_id)
+        manifest = {
+            path: ManifestEntry(**entry) for path, entry in self.batch_processor.job_manifest(job_id).items()
+        }
+
+        logger.info("[3/3] Storing results in PostgreSQL...")
+        book_ids = []
+        for source, processed_pages in results.items():
+            book_id = self.repository.create_book(
+                source_directory=source,
+                processed_pages=processed_pages,
+                manifest=manifest,
+            )
+            logger.info(f"  {source} stored as book ID: {book_id}")
+            book_ids.append(book_id)
+        return book_ids
+
+    @property
+    def batch_processor(self) -> GPTBatchProcessor:
+        if self._batch_processor is None:
+            self._batch_processor = GPTBatchProcessor(self.config.openai)
+        return self._batch_processor
+
     def run_batch(self, directories: list[str]) -> list[int]:
         """Run the pipeline on multiple book directories."""
         book_ids = []
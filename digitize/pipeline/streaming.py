@@ -0,0 +1,174 @@
+"""
+Producer/consumer stage runner for the streaming pipeline mode.
+
+Items flow from a source iterator through a chain of stages, each with its
+own pool of worker threads, connected by bounded queues. A full queue blocks
+the stage feeding it (backpressure), so at most `queue_size` items wait
+between any two stages and memory use does not grow with the input. Stages
+with a `batch_size` receive lists of whatever items are ready, up to that
+size, which lets the storage stage commit several pages per transaction. A
+stage that `expands` returns a list whose items are passed on one by one.
+
+If a stage raises, the run is marked failed: the source stops, remaining
+items are drained without processing and the first error is re-raised.
+"""
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+    # >1: fn receives a list of up to batch_size items
+    batch_size: int = 1
+    # fn returns a list of items for the next stage
+    expands: bool = False
+
+
+@dataclass
+class StageStats:
+    """Per-stage counters; `blocked` is time spent waiting on a full downstream queue."""
+    name: str
+    items: int = 0
+    busy: float = 0.0
+    idle: float = 0.0
+    blocked: float = 0.0
+    started: float = 0.0
+    finished: float = 0.0
+
+    def summary(self) -> str:
+        elapsed = max(self.finished - self.started, 1e-9)
+        return (
+            f"{self.name}: {self.items} pages in {elapsed:.1f}s "
+            f"({self.items / elapsed:.2f} pages/s; busy {self.busy:.1f}s, "
+            f"waiting for input {self.idle:.1f}s, blocked by next stage {self.blocked:.1f}s)"
+        )
+
+
+class StagedRunner:
+    """Runs a source iterator through stages connected by bounded queues."""
+
+    def __init__(self, stages: list[Stage], queue_size: int, source_name: str = "source"):
+        self.stages = stages
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self.stats = [StageStats(source_name)] + [StageStats(stage.name) for stage in stages]
+        self.error: BaseException | None = None
+        self._lock = threading.Lock()
+        self._remaining = [stage.workers for stage in stages]
+
+    def run(self, source: Iterable) -> list[StageStats]:
+        """Process every item of `source`; returns per-stage statistics (source first)."""
+        threads = [threading.Thread(target=self._produce, args=(source,), name="stage-source", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                threads.append(
+                    threading.Thread(target=self._work, args=(index,), name=f"stage-{stage.name}-{n}", daemon=True)
+                )
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self.error is not None:
+            raise self.error
+        return self.stats
+
+    def _fail(self, error: BaseException):
+        with self._lock:
+            if self.error is None:
+                self.error = error
+
+    def _put(self, index: int, item, stats: StageStats):
+        """Hand an item to stage `index` (or drop it past the last stage), timing backpressure."""
+        if index >= len(self.stages):
+            return
+        start = time.monotonic()
+        self.queues[index].put(item)
+        stats.blocked += time.monotonic() - start
+
+    def _finish(self, index: int):
+        """Signal end of input to every worker of stage `index`."""
+        if index < len(self.stages):
+            for _ in range(self.stages[index].workers):
+                self.queues[index].put(_DONE)
+
+    def _produce(self, source: Iterable):
+        stats = self.stats[0]
+        stats.started = time.monotonic()
+        try:
+            iterator = iter(source)
+            while self.error is None:
+                start = time.monotonic()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    stats.busy += time.monotonic() - start
+                stats.items += 1
+                self._put(0, item, stats)
+        except Exception as e:
+            logger.error(f"Stage source failed: {e}")
+            self._fail(e)
+        finally:
+            stats.finished = time.monotonic()
+            self._finish(0)
+
+    def _work(self, index: int):
+        stage = self.stages[index]
+        stats = self.stats[index + 1]
+        inbox = self.queues[index]
+        with self._lock:
+            if not stats.started:
+                stats.started = time.monotonic()
+
+        done = False
+        while not done:
+            start = time.monotonic()
+            batch = [inbox.get()]
+            stats.idle += time.monotonic() - start
+            # Take whatever else is already waiting, up to the batch size
+            while len(batch) < stage.batch_size and batch[-1] is not _DONE:
+                try:
+                    batch.append(inbox.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is _DONE:
+                batch.pop()
+                done = True
+            if not batch or self.error is not None:
+                continue  # drain without processing after a failure
+
+            start = time.monotonic()
+            try:
+                results = [stage.fn(batch)] if stage.batch_size > 1 else [stage.fn(item) for item in batch]
+            except Exception as e:
+                logger.error(f"Stage {stage.name} failed: {e}")
+                self._fail(e)
+                continue
+            finally:
+                stats.busy += time.monotonic() - start
+            stats.items += len(batch)
+            if stage.expands:
+                results = [item for result in results for item in result]
+            for result in results:
+                if result is not None:
+                    self._put(index + 1, result, stats)
+
+        with self._lock:
+            stats.finished = max(stats.finished, time.monotonic())
+            self._remaining[index] -= 1
+            last = self._remaining[index] == 0
+        if last:
+            self._finish(index + 1)
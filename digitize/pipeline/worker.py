@@ -0,0 +1,162 @@
+"""
+Queue worker for distributed digitization.
+
+Any number of worker processes, on any number of machines, claim jobs from
+the Postgres job queue (see storage/jobs.py) and run them with their own
+DigitizationPipeline. Scan paths must resolve to the same files on every
+machine (e.g. a shared network mount).
+
+- book jobs run the whole pipeline for a file or directory
+- page jobs OCR, process and store a single page of a pre-created book
+- finish jobs set a page-queued book's metadata and page count
+
+While a job runs, a heartbeat thread extends its lease. A job that raises
+is put back in the queue until it has used JOB_MAX_ATTEMPTS; a job whose
+worker died is reclaimed once its lease expires.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from dataclasses import fields
+
+from digitize.ai_processor.gpt_processor import BookMetadata
+from digitize.ocr.extractor import OCRResult
+from digitize.pipeline.orchestrator import DigitizationPipeline
+from digitize.storage.jobs import ClaimedJob, JobQueue
+
+logger = logging.getLogger(__name__)
+
+BOOK_FIELDS = [f.name for f in fields(BookMetadata)]
+
+
+class QueueWorker:
+    """Claims and runs queued jobs until stopped (or until the queue is empty)."""
+
+    def __init__(
+        self,
+        pipeline: DigitizationPipeline,
+        queue: JobQueue,
+        name: str | None = None,
+        poll_seconds: float = 10,
+    ):
+        self.pipeline = pipeline
+        self.queue = queue
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.poll_seconds = poll_seconds
+        self.completed = 0
+        self.failed = 0
+        self._handlers = {
+            "book": self._run_book,
+            "page": self._run_page,
+            "finish": self._run_finish,
+        }
+
+    def run(self, drain: bool = False, max_jobs: int | None = None):
+        """Process jobs; with `drain`, return as soon as no job is claimable."""
+        logger.info(f"Worker {self.name} started")
+        while max_jobs is None or self.completed + self.failed < max_jobs:
+            job = self.queue.claim(self.name)
+            if job is None:
+                if drain:
+                    break
+                time.sleep(self.poll_seconds)
+                continue
+            self.run_job(job)
+        logger.info(f"Worker {self.name} stopped: {self.completed} jobs done, {self.failed} failed")
+
+    def run_job(self, job: ClaimedJob):
+        target = f"{job.file_path} p{job.source_page}" if job.kind == "page" else job.source_path
+        logger.info(f"Job {job.id} ({job.kind}, attempt {job.attempts}): {target}")
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, stop), daemon=True)
+        heartbeat.start()
+        try:
+            result, book_id = self._handlers[job.kind](job)
+        except KeyboardInterrupt:
+            self.queue.release(job.id, self.name)
+            raise
+        except Exception as e:
+            status = self.queue.fail(job.id, self.name, str(e))
+            logger.error(f"Job {job.id} failed ({status or 'reclaimed'}): {e}")
+            self.failed += 1
+            return
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        if self.queue.complete(job.id, self.name, result, book_id):
+            self.completed += 1
+
+    def _heartbeat(self, job: ClaimedJob, stop: threading.Event):
+        interval = max(1.0, self.queue.lease.total_seconds() / 3)
+        while not stop.wait(interval):
+            run_id = self.pipeline.run_id if job.kind == "book" else None
+            try:
+                if not self.queue.heartbeat(job.id, self.name, run_id):
+                    logger.warning(f"Lost the lease on job {job.id}; another worker may rerun it")
+                    return
+            except Exception as e:
+                logger.warning(f"Heartbeat for job {job.id} failed: {e}")
+
+    def _run_book(self, job: ClaimedJob) -> tuple[dict | None, int]:
+        # A retried book job resumes its checkpointed run instead of starting a new book
+        self.pipeline.run_id = None
+        if job.run_id:
+            book_id = self.pipeline.resume(job.run_id)
+        else:
+            book_id = self.pipeline.run(job.source_path)
+        result = {"run_id": self.pipeline.run_id} if self.pipeline.run_id else None
+        return result, book_id
+
+    def _run_page(self, job: ClaimedJob) -> tuple[dict, None]:
+        repository = self.pipeline.repository
+        if repository.has_page(job.book_id, job.page_number):
+            # Stored by an earlier attempt whose worker died before completing the job
+            logger.info(f"  Page {job.page_number} of book {job.book_id} is already stored")
+            return {}, None
+
+        result = self.pipeline.ocr.extract_page(job.file_path, job.source_page)
+        result.source_page = job.source_page
+        result.page_number = job.page_number
+        result.page_hash = job.page_hash or ""
+        processed = self.pipeline.processor.process_page(result)
+        if processed.error:
+            raise RuntimeError(processed.error)
+        # The manifest taken at enqueue time: if the file changed since, a later update sees it
+        manifest = {job.file_path: job.manifest} if job.manifest else {}
+        repository.add_pages(job.book_id, [processed], manifest)
+
+        # Kept on the job so the finish job can pick book-level fields without GPT
+        page_fields = {name: getattr(processed, name) for name in BOOK_FIELDS}
+        return page_fields | {"has_content": bool(processed.title or processed.cleaned_text)}, None
+
+    def _run_finish(self, job: ClaimedJob) -> tuple[dict, None]:
+        config = self.pipeline.config
+        processor = self.pipeline.processor
+        repository = self.pipeline.repository
+
+        meta = None
+        if config.openai.book_metadata:
+            pages = [p for p in repository.get_book_pages(job.book_id) if (p["raw_ocr_text"] or "").strip()]
+            first_pages = [
+                OCRResult(
+                    file_path=p["source_file"],
+                    page_number=p["page_number"],
+                    raw_text=p["raw_ocr_text"],
+                    confidence=p["ocr_confidence"] or 0.0,
+                    language=config.ocr.tesseract_lang,
+                )
+                for p in pages[: config.openai.metadata_pages]
+            ]
+            meta = processor.extract_book_metadata([processor.clean_page(r) for r in first_pages])
+        if meta is None:
+            first = next((r for _, r in self.queue.page_results(job.book_id) if r.get("has_content")), None)
+            meta = BookMetadata(**{name: first[name] for name in BOOK_FIELDS}) if first else None
+
+        total = len(repository.get_page_numbers(job.book_id))
+        repository.finish_book(job.book_id, meta, total)
+        return {"pages": total}, None
@@ -0,0 +1,232 @@
+"""
+Postgres-backed job queue for distributed workers.
+
+Jobs live in the `jobs` table of the book database. A worker claims the
+oldest claimable job with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent
+workers on any number of machines never claim the same row, and holds it
+under a lease. Heartbeats extend the lease while the job runs; if a worker
+dies, its lease expires and the next claim picks the job up again. Lease
+times use the database clock, so worker clocks need not agree.
+
+Job kinds:
+- book:   digitize a whole file or directory in one worker
+- page:   OCR and process one page of a book created at enqueue time
+- finish: set a page-queued book's metadata once none of its pages are pending
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+
+from sqlalchemy import and_, exists, func, or_
+from sqlalchemy.orm import aliased
+
+from digitize.storage.manifest import ManifestEntry
+from digitize.storage.models import Job
+from digitize.storage.repository import BookRepository
+
+logger = logging.getLogger(__name__)
+
+ACTIVE = ("pending", "running")
+
+
+def _manifest_columns(entry: ManifestEntry | None) -> dict:
+    if entry is None:
+        return {}
+    return {"file_size": entry.size, "file_mtime": entry.mtime, "file_digest": entry.digest}
+
+
+@dataclass
+class ClaimedJob:
+    """Snapshot of a job row taken when it was claimed."""
+    id: int
+    kind: str
+    source_path: str
+    book_id: int | None
+    file_path: str | None
+    source_page: int | None
+    page_number: int | None
+    page_hash: str | None
+    run_id: str | None
+    attempts: int
+    # Page jobs: file_path's manifest as of enqueue time (None for jobs queued before it was kept)
+    manifest: ManifestEntry | None = None
+
+
+class JobQueue:
+    """Enqueues, claims and settles jobs in the book database."""
+
+    def __init__(self, repository: BookRepository, lease_seconds: int = 300, max_attempts: int = 3):
+        self.repository = repository
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_attempts = max_attempts
+
+    def enqueue_book(self, source_path: str) -> int:
+        with self.repository.get_session() as session:
+            job = Job(kind="book", source_path=source_path)
+            session.add(job)
+            session.flush()
+            return job.id
+
+    def enqueue_pages(
+        self,
+        book_id: int,
+        source_path: str,
+        pages: list[tuple[str, int, int, str]],
+        manifest: dict[str, ManifestEntry] | None = None,
+    ) -> int:
+        """
+        Queue one job per (file_path, source_page, page_number, page_hash) of a
+        book, plus the book's finish job. Returns the number of page jobs.
+        `manifest` entries are kept on the jobs and stored with their pages, so
+        a file changed before its page runs is seen as changed by a later update.
+        """
+        manifest = manifest or {}
+        with self.repository.get_session() as session:
+            session.add_all(
+                Job(
+                    kind="page",
+                    source_path=source_path,
+                    book_id=book_id,
+                    file_path=file_path,
+                    source_page=source_page,
+                    page_number=page_number,
+                    page_hash=page_hash or None,
+                    **_manifest_columns(manifest.get(file_path)),
+                )
+                for file_path, source_page, page_number, page_hash in pages
+            )
+            session.add(Job(kind="finish", source_path=source_path, book_id=book_id))
+        return len(pages)
+
+    def claim(self, worker: str) -> ClaimedJob | None:
+        """
+        Claim the oldest pending job, or a running job whose lease expired.
+        A finish job is claimable only once its book has no pending or running
+        page jobs. Abandoned jobs that used up their attempts are failed.
+        """
+        page = aliased(Job)
+        pages_active = exists().where(
+            page.book_id == Job.book_id, page.kind == "page", page.status.in_(ACTIVE)
+        )
+        while True:
+            with self.repository.get_session() as session:
+                job = (
+                    session.query(Job)
+                    .filter(
+                        or_(
+                            Job.status == "pending",
+                            and_(Job.status == "running", Job.lease_expires_at < func.now()),
+                        ),
+                        or_(Job.kind != "finish", ~pages_active),
+                    )
+                    .order_by(Job.id)
+                    .with_for_update(skip_locked=True)
+                    .first()
+                )
+                if job is None:
+                    return None
+
+                if job.status == "running":
+                    logger.warning(f"Reclaiming job {job.id} from {job.worker} (lease expired)")
+                    if job.attempts >= self.max_attempts:
+                        job.status = "failed"
+                        job.error = f"Abandoned by {job.worker} after {job.attempts} attempts"
+                        continue
+
+                job.status = "running"
+                job.worker = worker
+                job.attempts = (job.attempts or 0) + 1
+                job.heartbeat_at = func.now()
+                job.lease_expires_at = func.now() + self.lease
+                return ClaimedJob(
+                    id=job.id,
+                    kind=job.kind,
+                    source_path=job.source_path,
+                    book_id=job.book_id,
+                    file_path=job.file_path,
+                    source_page=job.source_page,
+                    page_number=job.page_number,
+                    page_hash=job.page_hash,
+                    run_id=job.run_id,
+                    attempts=job.attempts,
+                    manifest=(
+                        ManifestEntry(job.file_size, job.file_mtime, job.file_digest)
+                        if job.file_digest
+                        else None
+                    ),
+                )
+
+    def heartbeat(self, job_id: int, worker: str, run_id: str | None = None) -> bool:
+        """Extend a job's lease; False if the job is no longer held by `worker`."""
+        with self.repository.get_session() as session:
+            job = self._held(session, job_id, worker)
+            if job is None:
+                return False
+            job.heartbeat_at = func.now()
+            job.lease_expires_at = func.now() + self.lease
+            if run_id:
+                job.run_id = run_id
+            return True
+
+    def complete(self, job_id: int, worker: str, result: dict | None = None, book_id: int | None = None) -> bool:
+        with self.repository.get_session() as session:
+            job = self._held(session, job_id, worker)
+            if job is None:
+                logger.warning(f"Job {job_id} was reclaimed by another worker; result discarded")
+                return False
+            job.status = "done"
+            job.error = None
+            job.lease_expires_at = None
+            if result is not None:
+                job.result = json.dumps(result, ensure_ascii=False)
+            if book_id is not None:
+                job.book_id = book_id
+            return True
+
+    def fail(self, job_id: int, worker: str, error: str) -> str | None:
+        """Record a failure; the job is retried until it has used `max_attempts`. Returns the new status."""
+        with self.repository.get_session() as session:
+            job = self._held(session, job_id, worker)
+            if job is None:
+                return None
+            job.error = error
+            job.lease_expires_at = None
+            job.status = "pending" if job.attempts < self.max_attempts else "failed"
+            return job.status
+
+    def release(self, job_id: int, worker: str):
+        """Hand a claimed job back without counting the attempt (e.g. on shutdown)."""
+        with self.repository.get_session() as session:
+            job = self._held(session, job_id, worker)
+            if job is not None:
+                job.status = "pending"
+                job.attempts = max(0, (job.attempts or 0) - 1)
+                job.lease_expires_at = None
+
+    def page_results(self, book_id: int) -> list[tuple[int, dict]]:
+        """(page_number, result) of a book's completed page jobs, in page order."""
+        with self.repository.get_session() as session:
+            rows = (
+                session.query(Job.page_number, Job.result)
+                .filter(Job.book_id == book_id, Job.kind == "page", Job.status == "done")
+                .order_by(Job.page_number)
+                .all()
+            )
+            return [(page_number, json.loads(result)) for page_number, result in rows if result]
+
+    def counts(self) -> dict[tuple[str, str], int]:
+        """Number of jobs per (kind, status)."""
+        with self.repository.get_session() as session:
+            rows = session.query(Job.kind, Job.status, func.count(Job.id)).group_by(Job.kind, Job.status).all()
+            return {(kind, status): n for kind, status, n in rows}
+
+    @staticmethod
+    def _held(session, job_id: int, worker: str) -> Job | None:
+        return (
+            session.query(Job)
+            .filter(Job.id == job_id, Job.worker == worker, Job.status == "running")
+            .with_for_update()
+            .first()
+        )
@@ -0,0 +1,39 @@
+"""
+Scan file manifest stored alongside pages.source_file.
+
+Each page row records the size, mtime and SHA-256 of the file it came from
+(and its page number within that file). An update compares the directory
+against these values: files whose size and mtime match are unchanged without
+being read; otherwise the content hash decides, so a file that was only
+touched or copied is not reprocessed.
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+from digitize.ocr.cache import OCRCache
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    size: int
+    mtime: float
+    digest: str
+
+
+@lru_cache(maxsize=256)
+def _digest(path: str, size: int, mtime: float) -> str:
+    # Keyed by size and mtime so a file changed on disk is hashed again
+    return OCRCache.file_digest(path)
+
+
+def manifest_entry(path: str) -> ManifestEntry:
+    """Size, mtime and content hash of a scan file (hashes are memoized per file version)."""
+    stat = os.stat(path)
+    return ManifestEntry(stat.st_size, stat.st_mtime, _digest(path, stat.st_size, stat.st_mtime))
+
+
+def scan_manifest(paths) -> dict[str, ManifestEntry]:
+    """Manifest entries for several files, keyed by path."""
+    return {path: manifest_entry(path) for path in paths}
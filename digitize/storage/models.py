@@ -6,11 +6,13 @@ Schema:
 - pages: individual scanned pages belonging to a book
 - passages: notable passages/quotes extracted from pages
 - themes: unique themes with many-to-many relation to pages
+- jobs: work queue shared by distributed workers (books, pages, book finish)
 """
 
 from datetime import datetime
 
 from sqlalchemy import (
+    BigInteger,
     Column,
     Integer,
     String,
@@ -71,9 +73,17 @@ class Page(Base):
     source_file = Column(String(1000), nullable=False)
     chapter = Column(String(500), nullable=True)
 
+    # Manifest of the source file, used to detect changed scans on update
+    source_page = Column(Integer, nullable=True)  # page number within source_file
+    file_size = Column(BigInteger, nullable=True)
+    file_mtime = Column(Float, nullable=True)
+    file_digest = Column(String(64), nullable=True)  # SHA-256 of the file contents
+
     # OCR data
     raw_ocr_text = Column(Text, nullable=True)
     ocr_confidence = Column(Float, nullable=True)
+    page_hash = Column(String(64), nullable=True, index=True)  # perceptual hash for dedup
+    processing_path = Column(String(16), nullable=True)  # gpt, cheap, local or empty
 
     # GPT-processed data
     cleaned_text = Column(Text, nullable=True)
@@ -118,6 +128,45 @@ class Theme(Base):
         return f"<Theme(id={self.id}, name='{self.name}')>"
 
 
+class Job(Base):
+    """
+    A unit of queued work. Workers claim jobs with SELECT ... FOR UPDATE SKIP
+    LOCKED and hold them under a lease that heartbeats extend; a running job
+    whose lease has expired is reclaimed by the next worker.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String(10), nullable=False)  # book, page, finish
+    source_path = Column(String(1000), nullable=False)
+    book_id = Column(Integer, ForeignKey("books.id", ondelete="CASCADE"), nullable=True, index=True)
+
+    # Page jobs: the page to OCR and where it goes in the book
+    file_path = Column(String(1000), nullable=True)
+    source_page = Column(Integer, nullable=True)
+    page_number = Column(Integer, nullable=True)
+    page_hash = Column(String(64), nullable=True)
+    # Manifest of file_path taken at enqueue time, stored with the page
+    file_size = Column(BigInteger, nullable=True)
+    file_mtime = Column(Float, nullable=True)
+    file_digest = Column(String(64), nullable=True)
+
+    status = Column(String(20), nullable=False, default="pending", index=True)  # pending, running, done, failed
+    attempts = Column(Integer, default=0)
+    worker = Column(String(200), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    run_id = Column(String(40), nullable=True)  # checkpointed run of a book job, resumed on retry
+    result = Column(Text, nullable=True)  # JSON
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, kind='{self.kind}', status='{self.status}')>"
+
+
 def init_db(connection_string: str):
     """Create all tables in the database."""
     engine = create_engine(connection_string)
@@ -5,10 +5,12 @@ Repository layer for storing and querying digitized book data in PostgreSQL.
 import logging
 from contextlib import contextmanager
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.orm import sessionmaker, Session
 
 from digitize.config.settings import DatabaseConfig
+from digitize.storage.manifest import ManifestEntry
 from digitize.storage.models import Base, Book, Page, Passage, Theme
 from digitize.ai_processor.gpt_processor import ProcessedText
 
@@ -24,10 +26,47 @@ class BookRepository:
         self.SessionLocal = sessionmaker(bind=self.engine)
 
     def create_tables(self):
-        """Create all database tables if they don't exist."""
+        """Create all database tables if they don't exist, and add columns added since."""
         Base.metadata.create_all(self.engine)
+        self.add_missing_columns()
         logger.info("Database tables created/verified.")
 
+    def add_missing_columns(self) -> list[str]:
+        """
+        create_all() never alters an existing table, so columns added to the
+        models after a table was created (and their indexes) are added here.
+        Only nullable columns can be added this way; if any other is missing,
+        raises RuntimeError listing the statements to run by hand. Returns the
+        statements that were run.
+        """
+        inspector = inspect(self.engine)
+        dialect = self.engine.dialect
+        statements, required = [], []
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            missing = {column.name for column in table.columns if column.name not in existing}
+            for column in table.columns:
+                if column.name in missing:
+                    statements.append(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect)}"
+                    )
+                    if not column.nullable:
+                        required.append(f"{table.name}.{column.name}")
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                if missing & {column.name for column in index.columns}:
+                    statements.append(str(CreateIndex(index).compile(dialect=dialect)))
+        if required:
+            raise RuntimeError(
+                f"Database is missing required column(s) {', '.join(required)}; run:\n"
+                + ";\n".join(statements) + ";"
+            )
+        if statements:
+            with self.engine.begin() as connection:
+                for statement in statements:
+                    logger.info(f"Upgrading schema: {statement}")
+                    connection.execute(text(statement))
+        return statements
+
     @contextmanager
     def get_session(self):
         """Provide a transactional session scope."""
@@ -41,19 +80,22 @@ class BookRepository:
         finally:
             session.close()
 
-    def create_book(self, source_directory: str, processed_pages: list[ProcessedText]) -> int:
-        """Create a new book record with all its pages, passages, and themes."""
+    def create_book(
+        self,
+        source_directory: str,
+        processed_pages: list[ProcessedText],
+        manifest: dict[str, ManifestEntry] | None = None,
+    ) -> int:
+        """
+        Create a new book record with all its pages, passages, and themes.
+        `manifest` holds the size, mtime and hash of each source file.
+        """
         # Use the first non-empty page to get book-level metadata
         meta_page = next((p for p in processed_pages if p.title or p.cleaned_text), None)
 
         with self.get_session() as session:
             book = Book(
-                title=meta_page.title if meta_page else None,
-                author=meta_page.author if meta_page else None,
-                genre=meta_page.genre if meta_page else None,
-                detected_language=meta_page.detected_language if meta_page else None,
-                language_code=meta_page.language_code if meta_page else None,
-                estimated_period=meta_page.estimated_period if meta_page else None,
+                **_book_fields(meta_page),
                 source_directory=source_directory,
                 total_pages=len(processed_pages),
             )
@@ -61,46 +103,187 @@ class BookRepository:
             session.flush()  # Get the book.id
 
             for processed in processed_pages:
-                page = Page(
-                    book_id=book.id,
-                    page_number=processed.page_number,
-                    source_file=processed.source_file,
-                    chapter=processed.chapter,
-                    raw_ocr_text=processed.original_ocr,
-                    ocr_confidence=processed.ocr_confidence,
-                    cleaned_text=processed.cleaned_text,
-                    summary=processed.summary,
-                    writing_style=processed.writing_style,
-                    confidence_notes=processed.confidence_notes,
-                )
-                session.add(page)
-                session.flush()
-
-                # Add key passages
-                for passage_text in processed.key_passages:
-                    passage = Passage(
-                        page_id=page.id,
-                        text=passage_text,
-                        passage_type="quote",
-                    )
-                    session.add(passage)
-
-                # Add themes (get or create)
-                for theme_name in processed.themes:
-                    theme = (
-                        session.query(Theme)
-                        .filter(Theme.name == theme_name)
-                        .first()
-                    )
-                    if not theme:
-                        theme = Theme(name=theme_name)
-                        session.add(theme)
-                        session.flush()
-                    page.themes.append(theme)
+                self._add_page(session, book.id, processed, manifest)
 
             logger.info(f"Saved book '{book.title}' (id={book.id}) with {len(processed_pages)} pages")
             return book.id
 
+    def start_book(self, source_directory: str) -> int:
+        """Create an empty book record for pages that will be added incrementally."""
+        with self.get_session() as session:
+            book = Book(source_directory=source_directory, total_pages=0)
+            session.add(book)
+            session.flush()
+            return book.id
+
+    def add_pages(
+        self,
+        book_id: int,
+        processed_pages: list[ProcessedText],
+        manifest: dict[str, ManifestEntry] | None = None,
+    ):
+        """Store pages (with passages and themes) of an existing book in one transaction."""
+        with self.get_session() as session:
+            for processed in processed_pages:
+                self._add_page(session, book_id, processed, manifest)
+
+    def finish_book(self, book_id: int, meta, total_pages: int):
+        """
+        Set book-level metadata and the page count once all pages are stored.
+        `meta` is a ProcessedText or BookMetadata (or None).
+        """
+        with self.get_session() as session:
+            book = session.query(Book).filter(Book.id == book_id).one()
+            for name, value in _book_fields(meta).items():
+                setattr(book, name, value)
+            book.total_pages = total_pages
+            logger.info(f"Saved book '{book.title}' (id={book.id}) with {total_pages} pages")
+
+    def _add_page(
+        self,
+        session: Session,
+        book_id: int,
+        processed: ProcessedText,
+        manifest: dict[str, ManifestEntry] | None = None,
+    ) -> Page:
+        page = Page(book_id=book_id, page_number=processed.page_number)
+        session.add(page)
+        self._set_page(session, page, processed, (manifest or {}).get(processed.source_file))
+        return page
+
+    def _set_page(self, session: Session, page: Page, processed: ProcessedText, entry: ManifestEntry | None):
+        """Fill a new or existing page row, replacing its passages and themes."""
+        page.source_file = processed.source_file
+        page.source_page = processed.source_page or None
+        page.chapter = processed.chapter
+        page.raw_ocr_text = processed.original_ocr
+        page.ocr_confidence = processed.ocr_confidence
+        page.page_hash = processed.page_hash or None
+        page.processing_path = processed.processing_path
+        page.cleaned_text = processed.cleaned_text
+        page.summary = processed.summary
+        page.writing_style = processed.writing_style
+        page.confidence_notes = processed.confidence_notes
+        if entry is not None:
+            page.file_size = entry.size
+            page.file_mtime = entry.mtime
+            page.file_digest = entry.digest
+
+        # Key passages
+        page.passages = [
+            Passage(text=passage_text, passage_type="quote")
+            for passage_text in processed.key_passages
+        ]
+
+        # Themes (get or create)
+        themes = []
+        for theme_name in processed.themes:
+            theme = (
+                session.query(Theme)
+                .filter(Theme.name == theme_name)
+                .first()
+            )
+            if not theme:
+                theme = Theme(name=theme_name)
+                session.add(theme)
+                session.flush()
+            themes.append(theme)
+        page.themes = themes
+
+    def get_book_info(self, book_id: int) -> dict:
+        """Source directory and book-level fields of a stored book."""
+        with self.get_session() as session:
+            book = session.query(Book).filter(Book.id == book_id).first()
+            if book is None:
+                raise ValueError(f"No book with ID {book_id}")
+            return {
+                "source_directory": book.source_directory,
+                "title": book.title,
+                "author": book.author,
+                "genre": book.genre,
+                "estimated_period": book.estimated_period,
+                "detected_language": book.detected_language,
+                "language_code": book.language_code,
+            }
+
+    def get_manifest(self, book_id: int) -> list[dict]:
+        """Per-page manifest of a book: where each page came from and that file's stat and hash."""
+        with self.get_session() as session:
+            rows = (
+                session.query(
+                    Page.page_number,
+                    Page.source_file,
+                    Page.source_page,
+                    Page.page_hash,
+                    Page.file_size,
+                    Page.file_mtime,
+                    Page.file_digest,
+                )
+                .filter(Page.book_id == book_id)
+                .order_by(Page.page_number)
+                .all()
+            )
+            return [row._asdict() for row in rows]
+
+    def update_pages(
+        self,
+        book_id: int,
+        numbers: dict[tuple[str, int], int],
+        processed_pages: list[ProcessedText],
+        manifest: dict[str, ManifestEntry],
+        moved: dict[str, str] | None = None,
+        source_directory: str | None = None,
+    ):
+        """
+        Apply an incremental update to a book in one transaction.
+
+        `numbers` maps (source_file, source_page) to the page number of every
+        page the book should have afterwards. Stored pages missing from it are
+        deleted. `processed_pages` are upserted by (source_file, source_page),
+        keeping the row (and its ID) of a re-scanned page. `manifest` entries
+        are written to every page of their file. Kept pages are renumbered in
+        two steps so no intermediate state violates uq_book_page. `moved` maps
+        old source_file paths to new ones; it is applied first. A given
+        `source_directory` replaces the book's.
+        """
+        moved = moved or {}
+        with self.get_session() as session:
+            pages = session.query(Page).filter(Page.book_id == book_id).all()
+            for page in pages:
+                page.source_file = moved.get(page.source_file, page.source_file)
+            by_key = {(p.source_file, p.source_page): p for p in pages}
+
+            kept = []
+            for key, page in by_key.items():
+                if key in numbers:
+                    kept.append(page)
+                else:
+                    session.delete(page)
+            # Step 1: move kept pages out of the way (negative numbers are never used)
+            for page in kept:
+                page.page_number = -page.id
+            session.flush()
+            # Step 2: final numbers, now guaranteed free
+            for page in kept:
+                page.page_number = numbers[(page.source_file, page.source_page)]
+                entry = manifest.get(page.source_file)
+                if entry is not None:
+                    page.file_size, page.file_mtime, page.file_digest = entry.size, entry.mtime, entry.digest
+            session.flush()
+
+            for processed in processed_pages:
+                page = by_key.get((processed.source_file, processed.source_page))
+                if page is None:
+                    self._add_page(session, book_id, processed, manifest)
+                else:
+                    self._set_page(session, page, processed, manifest.get(processed.source_file))
+
+            book = session.query(Book).filter(Book.id == book_id).one()
+            book.total_pages = len(numbers)
+            if source_directory:
+                book.source_directory = source_directory
+            logger.info(f"Updated book '{book.title}' (id={book_id}): {len(numbers)} pages")
+
     def get_book(self, book_id: int) -> Book | None:
         with self.get_session() as session:
             return session.query(Book).filter(Book.id == book_id).first()
@@ -132,10 +315,13 @@ class BookRepository:
             return [
                 {
                     "page_number": p.page_number,
+                    "source_file": p.source_file,
                     "chapter": p.chapter,
+                    "raw_ocr_text": p.raw_ocr_text,
                     "cleaned_text": p.cleaned_text,
                     "summary": p.summary,
                     "ocr_confidence": p.ocr_confidence,
+                    "processing_path": p.processing_path,
                     "themes": [t.name for t in p.themes],
                     "passages": [ps.text for ps in p.passages],
                 }
@@ -184,6 +370,34 @@ class BookRepository:
                 for p in theme.pages
             ]
 
+    def has_page(self, book_id: int, page_number: int) -> bool:
+        with self.get_session() as session:
+            query = session.query(Page.id).filter(Page.book_id == book_id, Page.page_number == page_number)
+            return session.query(query.exists()).scalar()
+
+    def get_page_numbers(self, book_id: int) -> set[int]:
+        """Page numbers already stored for a book."""
+        with self.get_session() as session:
+            rows = session.query(Page.page_number).filter(Page.book_id == book_id).all()
+            return {page_number for (page_number,) in rows}
+
+    def get_page_hashes(self, exclude_book_id: int | None = None) -> list[tuple[str, str, str, int | None]]:
+        """
+        (page_hash, description, source_file, page in file) for every stored
+        page that has a perceptual hash.
+        """
+        with self.get_session() as session:
+            query = session.query(
+                Page.page_hash, Page.book_id, Page.page_number, Page.source_file, Page.source_page
+            ).filter(Page.page_hash.isnot(None))
+            if exclude_book_id is not None:
+                query = query.filter(Page.book_id != exclude_book_id)
+            rows = query.all()
+            return [
+                (h, f"book {book_id} page {page_number}", source_file, source_page)
+                for h, book_id, page_number, source_file, source_page in rows
+            ]
+
     @staticmethod
     def _extract_snippet(text: str, query: str, context_chars: int = 150) -> str:
         """Extract a snippet around the query match."""
@@ -201,3 +415,9 @@ class BookRepository:
         if end < len(text):
             snippet = snippet + "..."
         return snippet
+
+
+def _book_fields(meta) -> dict:
+    """Book columns taken from a ProcessedText or BookMetadata (all None without one)."""
+    names = ("title", "author", "genre", "detected_language", "language_code", "estimated_period")
+    return {name: getattr(meta, name, None) for name in names}
@@ -0,0 +1,207 @@
+"""
+Persistent state of checkpointed digitization runs.
+
+A run records its source and the book it writes to. Each page of the run has
+a row holding its stage status together with its OCR result and GPT result
+as JSON, so a resumed run skips work that is already done:
+
+    ocr -> processed -> stored
+            \\-> failed      (GPT failed; retried when the run is resumed)
+
+State lives in the main database by default, or in any SQLAlchemy URL given
+by RUN_STATE_URL (e.g. a local SQLite file). The tables use their own
+declarative base so they can live apart from the book tables.
+"""
+
+import json
+import logging
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, create_engine
+from sqlalchemy.orm import DeclarativeBase, sessionmaker
+
+from digitize.ai_processor.gpt_processor import ProcessedText
+from digitize.ocr.extractor import OCRResult, OCRWord
+
+logger = logging.getLogger(__name__)
+
+
+class RunBase(DeclarativeBase):
+    pass
+
+
+class Run(RunBase):
+    __tablename__ = "runs"
+
+    id = Column(String(40), primary_key=True)
+    source_path = Column(String(1000), nullable=False)
+    book_id = Column(Integer, nullable=True)
+    status = Column(String(20), default="running")  # running, completed, incomplete, failed
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class RunPage(RunBase):
+    __tablename__ = "run_pages"
+    __table_args__ = (
+        UniqueConstraint("run_id", "page_number", name="uq_run_page"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(String(40), ForeignKey("runs.id", ondelete="CASCADE"), nullable=False, index=True)
+    page_number = Column(Integer, nullable=False)  # page number in the book
+    file_path = Column(String(1000), nullable=False)
+    source_page = Column(Integer, nullable=False)  # page number within file_path
+    status = Column(String(20), nullable=False)  # ocr, processed, failed, stored
+    attempts = Column(Integer, default=0)
+    ocr_result = Column(Text, nullable=True)
+    processed = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+@dataclass
+class CheckpointedPage:
+    """A page of a run as recorded so far."""
+    page_number: int
+    status: str
+    ocr: OCRResult
+    processed: ProcessedText | None
+    attempts: int
+
+
+class RunStore:
+    """Creates runs and records per-page stage status."""
+
+    def __init__(self, url: str):
+        self.engine = create_engine(url, echo=False)
+        self.SessionLocal = sessionmaker(bind=self.engine)
+        RunBase.metadata.create_all(self.engine)
+
+    @contextmanager
+    def get_session(self):
+        """Provide a transactional session scope."""
+        session = self.SessionLocal()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def create_run(self, source_path: str) -> str:
+        run_id = datetime.utcnow().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        with self.get_session() as session:
+            session.add(Run(id=run_id, source_path=source_path, status="running"))
+        return run_id
+
+    def get_run(self, run_id: str) -> dict:
+        with self.get_session() as session:
+            run = session.get(Run, run_id)
+            if run is None:
+                raise ValueError(f"No run with ID '{run_id}'")
+            return {
+                "id": run.id,
+                "source_path": run.source_path,
+                "book_id": run.book_id,
+                "status": run.status,
+                "error": run.error,
+            }
+
+    def list_runs(self) -> list[dict]:
+        with self.get_session() as session:
+            runs = session.query(Run).order_by(Run.created_at.desc()).all()
+            result = []
+            for run in runs:
+                counts: dict[str, int] = {}
+                for (status,) in session.query(RunPage.status).filter(RunPage.run_id == run.id):
+                    counts[status] = counts.get(status, 0) + 1
+                result.append({
+                    "id": run.id,
+                    "source_path": run.source_path,
+                    "book_id": run.book_id,
+                    "status": run.status,
+                    "pages": counts,
+                    "updated_at": str(run.updated_at),
+                })
+            return result
+
+    def set_status(self, run_id: str, status: str, book_id: int | None = None, error: str | None = None):
+        with self.get_session() as session:
+            run = session.get(Run, run_id)
+            run.status = status
+            run.error = error
+            if book_id is not None:
+                run.book_id = book_id
+
+    def pages(self, run_id: str) -> list[CheckpointedPage]:
+        """Every recorded page of a run, in book page order."""
+        with self.get_session() as session:
+            rows = (
+                session.query(RunPage)
+                .filter(RunPage.run_id == run_id)
+                .order_by(RunPage.page_number)
+                .all()
+            )
+            return [
+                CheckpointedPage(
+                    page_number=row.page_number,
+                    status=row.status,
+                    ocr=_ocr_from_json(row.ocr_result),
+                    processed=ProcessedText(**json.loads(row.processed)) if row.processed else None,
+                    attempts=row.attempts or 0,
+                )
+                for row in rows
+            ]
+
+    def save_ocr(self, run_id: str, result: OCRResult):
+        with self.get_session() as session:
+            session.add(RunPage(
+                run_id=run_id,
+                page_number=result.page_number,
+                file_path=result.file_path,
+                source_page=result.source_page or result.page_number,
+                status="ocr",
+                ocr_result=json.dumps(asdict(result), ensure_ascii=False),
+            ))
+
+    def save_processed(self, run_id: str, processed: ProcessedText):
+        """Record a GPT result; pages whose processing failed are marked for retry."""
+        with self.get_session() as session:
+            row = self._row(session, run_id, processed.page_number)
+            row.attempts = (row.attempts or 0) + 1
+            if processed.error:
+                row.status = "failed"
+                row.error = processed.error
+            else:
+                row.status = "processed"
+                row.error = None
+                row.processed = json.dumps(asdict(processed), ensure_ascii=False)
+
+    def mark_stored(self, run_id: str, page_numbers: list[int]):
+        with self.get_session() as session:
+            (
+                session.query(RunPage)
+                .filter(RunPage.run_id == run_id, RunPage.page_number.in_(page_numbers))
+                .update({RunPage.status: "stored"}, synchronize_session=False)
+            )
+
+    @staticmethod
+    def _row(session, run_id: str, page_number: int) -> RunPage:
+        return (
+            session.query(RunPage)
+            .filter(RunPage.run_id == run_id, RunPage.page_number == page_number)
+            .one()
+        )
+
+
+def _ocr_from_json(data: str) -> OCRResult:
+    payload = json.loads(data)
+    payload["words"] = [OCRWord(**w) for w in payload.get("words", [])]
+    return OCRResult(**payload)
@@ -0,0 +1,332 @@
+"""
+AsyncGPTProcessor against a local OpenAI-compatible stub (http.server):
+result ordering, 429 backoff, retries of transient errors and truncated
+replies, and RPM/TPM throttling.
+"""
+
+import asyncio
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from digitize.ai_processor.async_processor import AsyncGPTProcessor, RateLimiter
+from digitize.config.settings import OpenAIConfig
+from digitize.ocr.extractor import OCRResult
+
+PAGE = re.compile(r"PAGE-(\d+)")
+
+
+class StubAPI:
+    """Chat completions endpoint that echoes each page's marker back as its cleaned text."""
+
+    def __init__(self):
+        self.requests: list[tuple[float, int]] = []  # (arrival time, page)
+        self.max_tokens: list[int] = []  # max_tokens of each request
+        self.rate_limited: list[float] = []  # when each 429 was sent
+        self.fail_first = 0  # answer this many requests with `fail_status`
+        self.fail_status = 429
+        self.drop_first = 0  # close the connection without a reply on this many requests
+        self.truncate_first = 0  # answer this many requests with finish_reason "length"
+        self.retry_after = 0.0
+        self.delay = lambda page: 0.0
+        self.lock = threading.Lock()
+
+    def handle(self, handler: BaseHTTPRequestHandler):
+        body = json.loads(handler.rfile.read(int(handler.headers["content-length"])))
+        page = int(PAGE.search(json.dumps(body["messages"])).group(1))
+        with self.lock:
+            self.requests.append((time.monotonic(), page))
+            self.max_tokens.append(body["max_tokens"])
+            limited = self.fail_first > 0
+            if limited:
+                self.fail_first -= 1
+                self.rate_limited.append(time.monotonic())
+            dropped = not limited and self.drop_first > 0
+            if dropped:
+                self.drop_first -= 1
+            truncated = not (limited or dropped) and self.truncate_first > 0
+            if truncated:
+                self.truncate_first -= 1
+
+        if limited:
+            message = "Rate limit reached" if self.fail_status == 429 else "Server error"
+            self._send(handler, self.fail_status, {"error": {"message": message, "type": "requests"}},
+                       {"retry-after": str(self.retry_after)})
+            return
+        if dropped:
+            handler.close_connection = True
+            return
+
+        time.sleep(self.delay(page))
+        content = {
+            "cleaned_text": f"cleaned PAGE-{page}",
+            "detected_language": "English",
+            "language_code": "en",
+            "themes": [],
+            "key_passages": [],
+            "summary": "",
+            "writing_style": "",
+            "confidence_notes": "",
+        }
+        self._send(handler, 200, {
+            "id": f"chatcmpl-{page}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "finish_reason": "length" if truncated else "stop",
+                "message": {"role": "assistant", "content": json.dumps(content)[: 20 if truncated else None]},
+            }],
+        })
+
+    @staticmethod
+    def _send(handler, status: int, payload: dict, headers: dict | None = None):
+        data = json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header("content-type", "application/json")
+        handler.send_header("content-length", str(len(data)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+@pytest.fixture
+def api():
+    stub = StubAPI()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            stub.handle(self)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub.base_url = f"http://127.0.0.1:{server.server_port}/v1"
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+def openai_config(api: StubAPI, **overrides) -> OpenAIConfig:
+    settings = dict(
+        api_key="test",
+        base_url=api.base_url,
+        max_concurrency=4,
+        requests_per_minute=0,
+        tokens_per_minute=0,
+        max_retries=3,
+        response_mode="full",
+        book_metadata=False,
+        pack_pages=False,
+        local_cleanup=False,
+        bypass_confidence=0,
+        cheap_model="",
+        cache_enabled=False,
+    )
+    return OpenAIConfig(**(settings | overrides))
+
+
+def make_processor(api: StubAPI, **overrides) -> AsyncGPTProcessor:
+    return AsyncGPTProcessor(openai_config(api, **overrides))
+
+
+def pages(n: int) -> list[OCRResult]:
+    return [
+        OCRResult(file_path="book.pdf", page_number=i, raw_text=f"PAGE-{i} some words", confidence=80.0, language="eng")
+        for i in range(1, n + 1)
+    ]
+
+
+def test_results_keep_page_order(api):
+    # Later pages answer first
+    api.delay = lambda page: 0.1 * (8 - page)
+    processor = make_processor(api)
+    started = time.monotonic()
+    try:
+        results = processor.process_batch(pages(8))
+    finally:
+        processor.close()
+
+    assert [r.page_number for r in results] == list(range(1, 9))
+    assert [r.cleaned_text for r in results] == [f"cleaned PAGE-{i}" for i in range(1, 9)]
+    assert not any(r.error for r in results)
+    # Requests overlapped: one at a time would take 2.8s
+    assert time.monotonic() - started < 2.0
+
+
+def test_429_pauses_and_retries(api):
+    api.fail_first = 1
+    api.retry_after = 0.5
+    processor = make_processor(api, max_concurrency=1)
+    try:
+        results = processor.process_batch(pages(3))
+    finally:
+        processor.close()
+
+    assert [r.cleaned_text for r in results] == [f"cleaned PAGE-{i}" for i in range(1, 4)]
+    assert not any(r.error for r in results)
+    limited_at = api.rate_limited[0]
+    # Every request after the 429 waited out its Retry-After
+    later = [at for at, _ in api.requests if at > limited_at]
+    assert len(later) == 3
+    assert min(later) - limited_at >= 0.45
+
+
+def test_429_pauses_threaded_process_page(api):
+    # Streaming GPT workers call process_page from threads; they share one limiter
+    api.fail_first = 1
+    api.retry_after = 0.5
+    processor = make_processor(api)
+    first, *rest = pages(4)
+    try:
+        with ThreadPoolExecutor(4) as pool:
+            pending = pool.submit(processor.process_page, first)
+            # Start the other workers once the 429 has paused the limiter
+            while not processor.limiter._paused_until:
+                time.sleep(0.01)
+            results = [pending] + [pool.submit(processor.process_page, page) for page in rest]
+            results = [future.result() for future in results]
+    finally:
+        processor.close()
+
+    assert [r.cleaned_text for r in results] == [f"cleaned PAGE-{i}" for i in range(1, 5)]
+    limited_at = api.rate_limited[0]
+    assert len(api.requests) == 5
+    assert all(at - limited_at >= 0.45 for at, _ in api.requests[1:])
+
+
+def test_429_gives_up_after_max_retries(api):
+    api.fail_first = 10
+    processor = make_processor(api, max_concurrency=1, max_retries=1)
+    try:
+        [result] = processor.process_batch(pages(1))
+    finally:
+        processor.close()
+
+    assert result.cleaned_text == ""
+    assert "Rate limit" in result.error
+    assert len(api.requests) == 2
+
+
+def test_server_errors_are_retried(api):
+    api.fail_first = 2
+    api.fail_status = 500
+    api.retry_after = 0.1
+    processor = make_processor(api, max_concurrency=1, max_retries=2)
+    try:
+        [result] = processor.process_batch(pages(1))
+    finally:
+        processor.close()
+
+    assert result.cleaned_text == "cleaned PAGE-1" and not result.error
+    assert len(api.requests) == 3
+    assert api.rate_limited[1] - api.rate_limited[0] >= 0.09
+
+
+def test_dropped_connection_is_retried(api):
+    api.drop_first = 1
+    processor = make_processor(api, max_concurrency=1, max_retries=1)
+    try:
+        [result] = processor.process_batch(pages(1))
+    finally:
+        processor.close()
+
+    assert result.cleaned_text == "cleaned PAGE-1" and not result.error
+    assert len(api.requests) == 2
+
+
+def test_truncated_reply_retry_does_not_use_an_attempt(api):
+    api.truncate_first = 1
+    processor = make_processor(api, max_concurrency=1, max_retries=0, max_tokens=4096)
+    try:
+        [result] = processor.process_batch(pages(1))
+    finally:
+        processor.close()
+
+    assert result.cleaned_text == "cleaned PAGE-1" and not result.error
+    assert len(api.requests) == 2
+    assert api.max_tokens[0] < 4096 and api.max_tokens[1] == 4096
+
+
+def test_requests_per_minute_throttle(api):
+    # 120/min: the bucket holds 120 requests, then refills one every 0.5s
+    processor = make_processor(api, max_concurrency=8, requests_per_minute=120)
+    started = time.monotonic()
+    try:
+        results = processor.process_batch(pages(124))
+    finally:
+        processor.close()
+    elapsed = time.monotonic() - started
+
+    assert len(results) == 124 and not any(r.error for r in results)
+    assert elapsed >= 1.0
+    # Past the burst, requests arrive no faster than the refill rate
+    tail = sorted(at for at, _ in api.requests)[-4:]
+    assert tail[-1] - tail[0] >= 0.9
+
+
+def test_rate_limiter_requests_per_minute():
+    limiter = RateLimiter(requests_per_minute=120, tokens_per_minute=0)
+
+    async def run():
+        for _ in range(120):
+            await limiter.acquire(0)
+        started = time.monotonic()
+        await limiter.acquire(0)
+        await limiter.acquire(0)
+        return time.monotonic() - started
+
+    assert 0.9 <= asyncio.run(run()) < 2.0
+
+
+def test_rate_limiter_tokens_per_minute():
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=60000)
+
+    async def run():
+        await limiter.acquire(60000)
+        started = time.monotonic()
+        await limiter.acquire(500)  # 500 tokens refill in 0.5s
+        return time.monotonic() - started
+
+    assert 0.45 <= asyncio.run(run()) < 1.5
+
+
+def test_rate_limiter_pause():
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+
+    async def run():
+        limiter.pause(0.3)
+        started = time.monotonic()
+        await limiter.acquire(100)
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.25
+
+
+class FakeRepository:
+    def __init__(self, config=None):
+        pass
+
+
+def test_streaming_uses_rate_limited_processor(api, monkeypatch):
+    # Even at the default OPENAI_MAX_CONCURRENCY=1, the GPT stage's threads share a limiter
+    from digitize.config.settings import PipelineConfig
+    from digitize.pipeline.orchestrator import DigitizationPipeline
+
+    monkeypatch.setattr("digitize.pipeline.orchestrator.BookRepository", FakeRepository)
+    config = PipelineConfig(streaming=True)
+    config.openai = openai_config(api, max_concurrency=1)
+    with DigitizationPipeline(config) as pipeline:
+        processor = pipeline._streaming_processor()
+
+        assert isinstance(processor, AsyncGPTProcessor)
+        assert pipeline.processor is processor and pipeline._streaming_processor() is processor
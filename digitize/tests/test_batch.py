@@ -0,0 +1,204 @@
+"""
+Batch API path with a fake OpenAI client: submit -> wait -> collect, resuming
+from state.json in a new processor, and the manifest kept with the job.
+"""
+
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from digitize.ai_processor.batch import GPTBatchProcessor
+from digitize.config.settings import OpenAIConfig, PipelineConfig
+from digitize.ocr.extractor import OCRResult
+from digitize.pipeline.orchestrator import DigitizationPipeline
+from digitize.storage.manifest import manifest_entry
+
+PAGE = re.compile(r"PAGE-(\d+)")
+
+
+class FakeOpenAI:
+    """
+    Files and batches endpoints kept in memory. A batch is in progress on its
+    first retrieve and completed on the second; requests for pages listed in
+    `failing` get an error reply.
+    """
+
+    def __init__(self):
+        self.uploads: dict[str, str] = {}
+        self.batch_state: dict[str, dict] = {}
+        self.failing: set[int] = set()
+        self.retrieve_errors = 0  # raise on this many retrieve calls (a crash while polling)
+        self.files = SimpleNamespace(create=self._create_file, content=self._content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve)
+
+    def _create_file(self, file, purpose):
+        file_id = f"file-{len(self.uploads)}"
+        self.uploads[file_id] = file.read().decode()
+        return SimpleNamespace(id=file_id)
+
+    def _content(self, file_id):
+        return SimpleNamespace(text=self.uploads[file_id])
+
+    def _create_batch(self, input_file_id, endpoint, completion_window, metadata):
+        batch_id = f"batch-{len(self.batch_state)}"
+        self.batch_state[batch_id] = {"input": input_file_id, "polls": 0}
+        return SimpleNamespace(id=batch_id, status="validating")
+
+    def _retrieve(self, batch_id):
+        if self.retrieve_errors:
+            self.retrieve_errors -= 1
+            raise ConnectionError("connection reset")
+        batch = self.batch_state[batch_id]
+        batch["polls"] += 1
+        requests = [json.loads(line) for line in self.uploads[batch["input"]].splitlines()]
+        if batch["polls"] == 1:
+            return SimpleNamespace(
+                id=batch_id, status="in_progress", output_file_id=None, error_file_id=None,
+                request_counts=SimpleNamespace(completed=0, total=len(requests)),
+            )
+        output_id = f"file-{batch_id}-output"
+        self.uploads[output_id] = "\n".join(json.dumps(self._reply(r)) for r in requests)
+        return SimpleNamespace(
+            id=batch_id, status="completed", output_file_id=output_id, error_file_id=None,
+            request_counts=SimpleNamespace(completed=len(requests), total=len(requests)),
+        )
+
+    def _reply(self, request: dict) -> dict:
+        page = int(PAGE.search(json.dumps(request["body"]["messages"])).group(1))
+        if page in self.failing:
+            return {
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 500, "body": {"error": {"message": "server error"}}},
+            }
+        content = {
+            "cleaned_text": f"cleaned PAGE-{page}",
+            "detected_language": "English",
+            "language_code": "en",
+            "themes": ["test"],
+        }
+        return {
+            "custom_id": request["custom_id"],
+            "response": {
+                "status_code": 200,
+                "body": {"choices": [{"finish_reason": "stop", "message": {"content": json.dumps(content)}}]},
+            },
+        }
+
+
+def openai_config(tmp_path) -> OpenAIConfig:
+    return OpenAIConfig(
+        api_key="test",
+        response_mode="full",
+        book_metadata=False,
+        local_cleanup=False,
+        bypass_confidence=0,
+        cheap_model="",
+        cache_enabled=False,
+        batch_dir=str(tmp_path / "batches"),
+        batch_poll_seconds=0,
+    )
+
+
+def make_processor(tmp_path, client: FakeOpenAI) -> GPTBatchProcessor:
+    processor = GPTBatchProcessor(openai_config(tmp_path))
+    processor.client = client
+    return processor
+
+
+def pages(source: str, n: int, first: int = 1) -> list[OCRResult]:
+    return [
+        OCRResult(file_path=source, page_number=i, raw_text=f"PAGE-{i} text", confidence=80.0,
+                  language="eng", source_page=i)
+        for i in range(first, first + n)
+    ]
+
+
+@pytest.fixture
+def client():
+    return FakeOpenAI()
+
+
+def test_submit_wait_collect(tmp_path, client):
+    client.failing = {5}
+    processor = make_processor(tmp_path, client)
+    books = {"book1.pdf": pages("book1.pdf", 3), "book2.pdf": pages("book2.pdf", 2, first=4)}
+    # An empty page is not submitted
+    books["book2.pdf"].append(OCRResult("book2.pdf", 6, "  ", 0.0, "eng", source_page=6))
+
+    job_id = processor.submit(books)
+    state = processor.wait(job_id)
+    results = processor.collect(job_id)
+
+    assert [b["status"] for b in state["batches"]] == ["completed"]
+    assert len(client.uploads[state["batches"][0]["input_file_id"]].splitlines()) == 5
+    assert list(results) == ["book1.pdf", "book2.pdf"]
+    assert [p.cleaned_text for p in results["book1.pdf"]] == [f"cleaned PAGE-{i}" for i in (1, 2, 3)]
+    page4, page5, page6 = results["book2.pdf"]
+    assert page4.cleaned_text == "cleaned PAGE-4" and page4.themes == ["test"]
+    assert page5.cleaned_text == "" and "server error" in page5.error
+    assert page6.processing_path == "empty" and not page6.error
+
+
+def test_resume_from_state_after_restart(tmp_path, client):
+    processor = make_processor(tmp_path, client)
+    job_id = processor.submit({"book.pdf": pages("book.pdf", 2)})
+
+    # The first process dies while polling
+    client.retrieve_errors = 1
+    with pytest.raises(ConnectionError):
+        processor.wait(job_id)
+
+    # A new process picks the job up from state.json alone
+    restarted = make_processor(tmp_path, client)
+    state = restarted.wait(job_id)
+    results = restarted.collect(job_id)
+
+    assert state["batches"][0]["status"] == "completed"
+    assert client.batch_state[state["batches"][0]["id"]]["polls"] == 2
+    assert [p.cleaned_text for p in results["book.pdf"]] == ["cleaned PAGE-1", "cleaned PAGE-2"]
+    saved = json.loads((tmp_path / "batches" / job_id / "state.json").read_text())
+    assert saved["batches"][0]["output_file_id"] == state["batches"][0]["output_file_id"]
+
+
+def test_unknown_job(tmp_path, client):
+    with pytest.raises(FileNotFoundError):
+        make_processor(tmp_path, client).wait("no-such-job")
+
+
+class FakeRepository:
+    def __init__(self, config=None):
+        self.books = []
+
+    def create_book(self, source_directory, processed_pages, manifest=None):
+        self.books.append((source_directory, processed_pages, manifest))
+        return len(self.books)
+
+
+def test_finish_batch_job_uses_manifest_from_submit(tmp_path, client, monkeypatch):
+    scan = tmp_path / "book.pdf"
+    scan.write_bytes(b"first version")
+    submitted = manifest_entry(str(scan))
+
+    monkeypatch.setattr("digitize.pipeline.orchestrator.BookRepository", FakeRepository)
+    config = PipelineConfig()
+    config.openai = openai_config(tmp_path)
+    pipeline = DigitizationPipeline(config)
+    pipeline.batch_processor.client = client
+
+    def run_ocr(source):
+        pipeline.manifest = {source: manifest_entry(source)}
+        return pages(source, 2)
+
+    pipeline.run_ocr = run_ocr
+    job_id = pipeline.submit_batch_job([str(scan)])
+
+    # Re-scanned while the batch ran: the stored pages describe the old version
+    scan.write_bytes(b"second version, re-scanned")
+    [book_id] = pipeline.finish_batch_job(job_id)
+
+    [(source, processed, manifest)] = pipeline.repository.books
+    assert (book_id, source) == (1, str(scan))
+    assert [p.cleaned_text for p in processed] == ["cleaned PAGE-1", "cleaned PAGE-2"]
+    assert manifest == {str(scan): submitted}
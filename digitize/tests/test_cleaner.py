@@ -0,0 +1,67 @@
+"""LocalCleaner rules, with a small fake dictionary in place of pyspellchecker."""
+
+import pytest
+
+from digitize.ai_processor import cleaner
+from digitize.ai_processor.cleaner import LocalCleaner
+
+WORDS = {"example", "exam", "well", "known", "thirteen", "the", "clocks", "were", "striking", "self", "made"}
+
+
+class FakeSpellChecker:
+    def __init__(self, language, distance):
+        self.language = language
+
+    def known(self, words):
+        return {w for w in words if w in WORDS}
+
+    def unknown(self, words):
+        return {w for w in words if w not in WORDS}
+
+    def candidates(self, word):
+        return None
+
+
+@pytest.fixture
+def dictionary(monkeypatch):
+    monkeypatch.setattr(cleaner, "SpellChecker", FakeSpellChecker)
+    cleaner._spell_checker.cache_clear()
+    yield
+    cleaner._spell_checker.cache_clear()
+
+
+def test_joins_words_hyphenated_across_lines(dictionary):
+    text = "An exam-\nple of the clocks striking thir-\nteen."
+    assert LocalCleaner().clean(text, "eng") == "An example of the clocks striking thirteen."
+
+
+def test_keeps_hyphen_of_compounds(dictionary):
+    # "wellknown" is not a word but "well" and "known" are
+    assert LocalCleaner().clean("a well-\nknown and self-\nmade man", "eng") == "a well-\nknown and self-\nmade man"
+
+
+def test_joins_when_pieces_are_not_words(dictionary):
+    assert LocalCleaner().clean("sesqui-\npedalian", "eng") == "sesquipedalian"
+
+
+def test_keeps_capitalized_continuation(dictionary):
+    assert LocalCleaner().clean("Anglo-\nSaxon", "eng") == "Anglo-\nSaxon"
+
+
+def test_without_dictionary_only_soft_hyphens_are_joined(monkeypatch):
+    monkeypatch.setattr(cleaner, "SpellChecker", None)
+    assert LocalCleaner().clean("exam-\nple", "eng") == "exam-\nple"
+    assert LocalCleaner().clean("exam\u00ad\nple", "eng") == "example"
+
+
+def test_language_without_dictionary(dictionary):
+    assert LocalCleaner().clean("exam-\nple", "chi_sim") == "exam-\nple"
+
+
+def test_leaves_quotes_alone():
+    text = "„Guten Tag“, sagte er. «Bonjour» ‘hi’ “there”"
+    assert LocalCleaner().clean(text, "deu") == text
+
+
+def test_expands_ligatures_and_fixes_spacing():
+    assert LocalCleaner().clean("The ﬁrst  ﬂoor ( left ) , g0od", "eng") == "The first floor (left), good"
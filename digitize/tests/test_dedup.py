@@ -0,0 +1,85 @@
+"""PageDeduplicator on generated page images."""
+
+import cv2
+import numpy as np
+import pytest
+
+from digitize.ocr.dedup import PageDeduplicator
+
+
+def write_page(path, seed: int) -> str:
+    """A white page with dark text-like bars placed by `seed`."""
+    rng = np.random.default_rng(seed)
+    image = np.full((800, 600), 255, np.uint8)
+    for _ in range(60):
+        x, y = int(rng.integers(20, 400)), int(rng.integers(20, 780))
+        cv2.rectangle(image, (x, y), (x + int(rng.integers(50, 180)), y + 8), 0, -1)
+    cv2.imwrite(str(path), image)
+    return str(path)
+
+
+@pytest.fixture
+def book(tmp_path):
+    files = [write_page(tmp_path / f"p{i}.png", seed=i) for i in range(5)]
+    # A re-scan of page 2 at the end of the batch
+    files.append(write_page(tmp_path / "p5.png", seed=2))
+    return files
+
+
+def test_within_book_duplicate(book):
+    report = PageDeduplicator(max_distance=20).find_duplicates(book)
+
+    assert report.skipped == {(book[5], 1)}
+    assert report.duplicate_of[(book[5], 1)] == "p2.png p1"
+    assert len(report.hashes) == 6
+
+
+def test_duplicate_found_after_thumbnail_eviction(book):
+    # Only one thumbnail is kept; page 2's is rendered again from its file
+    report = PageDeduplicator(max_distance=20, max_cached_thumbnails=1).find_duplicates(book)
+
+    assert report.skipped == {(book[5], 1)}
+
+
+def test_stored_match_is_confirmed_by_thumbnail(tmp_path, book):
+    stored = write_page(tmp_path / "stored.png", seed=3)
+    known = [(PageDeduplicator(20).find_duplicates([stored]).hashes[(stored, 1)], "book 1 page 7", stored, 1)]
+
+    report = PageDeduplicator(max_distance=20).find_duplicates(book[:5], known)
+
+    assert report.duplicate_of == {(book[3], 1): "book 1 page 7"}
+
+
+def test_stored_match_is_kept_when_thumbnails_differ(tmp_path, book):
+    # Same hash, but the stored file now shows a different page
+    page_hash = PageDeduplicator(20).find_duplicates([book[3]]).hashes[(book[3], 1)]
+    other = write_page(tmp_path / "other.png", seed=42)
+    known = [(page_hash, "book 1 page 7", other, 1)]
+
+    report = PageDeduplicator(max_distance=20).find_duplicates(book[:5], known)
+
+    assert report.skipped == set()
+
+
+def test_stored_match_is_kept_when_file_is_missing(tmp_path, book):
+    page_hash = PageDeduplicator(20).find_duplicates([book[3]]).hashes[(book[3], 1)]
+    known = [
+        (page_hash, "book 1 page 7", str(tmp_path / "gone.png"), 1),
+        (page_hash, "book 2 page 1", book[3], None),  # stored before source_page existed
+    ]
+
+    report = PageDeduplicator(max_distance=20).find_duplicates(book[:5], known)
+
+    assert report.skipped == set()
+
+
+def test_blank_pages_are_kept(tmp_path):
+    blank = np.full((800, 600), 255, np.uint8)
+    files = []
+    for i in range(2):
+        cv2.imwrite(str(tmp_path / f"blank{i}.png"), blank)
+        files.append(str(tmp_path / f"blank{i}.png"))
+
+    report = PageDeduplicator(max_distance=20).find_duplicates(files)
+
+    assert report.skipped == set() and report.hashes == {}
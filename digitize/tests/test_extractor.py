@@ -0,0 +1,149 @@
+"""
+Parity of the single-pass text reconstruction (text_from_words) with
+Tesseract's own text renderer (image_to_string), the deskew range fallback,
+and BookOCR releasing its Tesseract handles.
+"""
+
+import os
+import shutil
+
+import cv2
+import numpy as np
+import pytest
+
+from digitize.config.settings import OCRConfig
+from digitize.ocr import extractor
+from digitize.ocr.extractor import BookOCR, text_from_words, words_from_ocr_data
+
+# The parity tests need a real Tesseract; CI installs it, so there they must run
+requires_tesseract = pytest.mark.skipif(
+    shutil.which("tesseract") is None and not os.getenv("CI"),
+    reason="tesseract is not installed",
+)
+
+
+def _paragraphs(text: str) -> list[list[str]]:
+    return [paragraph.split("\n") for paragraph in text.strip().split("\n\n")]
+
+
+def _render(blocks: list[tuple[int, int, list[str]]], size=(1400, 900)):
+    """Draw text blocks, each (x, y, lines); an empty line leaves a paragraph gap."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    try:
+        font = ImageFont.load_default(size=28)
+    except TypeError:  # Pillow < 10.1 has only the small bitmap font
+        pytest.skip("Pillow cannot scale the default font")
+
+    image = Image.new("L", size, 255)
+    draw = ImageDraw.Draw(image)
+    for x, y, lines in blocks:
+        for line in lines:
+            if line:
+                draw.text((x, y), line, fill=0, font=font)
+            y += 44
+    return image
+
+
+PAGES = {
+    "hyphenated paragraphs": [
+        (40, 40, [
+            "The quick brown fox jumps over", "the lazy dog near the river-", "bank at dawn.", "",
+            "A second paragraph follows", "after a blank line.",
+        ]),
+    ],
+    "heading and blocks": [
+        (40, 40, ["CHAPTER ONE"]),
+        (40, 200, ["It was a bright cold day in April,", "and the clocks were striking thirteen."]),
+        (40, 500, ["Winston Smith slipped quickly through", "the glass doors of Victory Mansions."]),
+    ],
+    "two columns": [
+        (40, 40, ["Left column text runs", "down the page in short", "lines of print.", "", "Its second paragraph", "ends here."]),
+        (760, 40, ["Right column starts", "at the top again and", "continues below."]),
+    ],
+}
+
+
+@requires_tesseract
+@pytest.mark.parametrize("layout", PAGES)
+def test_text_from_words_matches_image_to_string(layout):
+    import pytesseract
+
+    image = _render(PAGES[layout])
+    ocr_data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+    expected = pytesseract.image_to_string(image)
+
+    text = text_from_words(words_from_ocr_data(ocr_data))
+
+    assert _paragraphs(text) == _paragraphs(expected)
+    assert text == expected.strip()
+
+
+def test_words_from_ocr_data_keeps_only_recognized_words():
+    rows = [  # level, block, par, line, conf, text
+        (1, 0, 0, 0, -1, ""),
+        (4, 1, 1, 1, -1, ""),
+        (5, 1, 1, 1, 96, "Hello"),
+        (5, 1, 1, 1, 91, " "),
+        (5, 1, 1, 1, 88, "world"),
+    ]
+    ocr_data = {
+        "level": [r[0] for r in rows],
+        "block_num": [r[1] for r in rows],
+        "par_num": [r[2] for r in rows],
+        "line_num": [r[3] for r in rows],
+        "conf": [r[4] for r in rows],
+        "text": [r[5] for r in rows],
+        "left": [0] * len(rows),
+        "top": [0] * len(rows),
+        "width": [0] * len(rows),
+        "height": [0] * len(rows),
+    }
+
+    words = words_from_ocr_data(ocr_data)
+
+    assert [(w.text, w.confidence) for w in words] == [("Hello", 96.0), ("world", 88.0)]
+    assert text_from_words(words) == "Hello world"
+
+
+def skewed_page(angle: float) -> np.ndarray:
+    """A white page of dark text-like bars, rotated by `angle` degrees."""
+    page = np.full((800, 600), 255, np.uint8)
+    for y in range(100, 700, 30):
+        cv2.rectangle(page, (80, y), (520, y + 8), 0, -1)
+    matrix = cv2.getRotationMatrix2D((300, 400), angle, 1.0)
+    return cv2.warpAffine(page, matrix, (600, 800), borderValue=255)
+
+
+@pytest.mark.parametrize("angle, falls_back", [(2.0, False), (12.0, True)])
+def test_deskew_falls_back_past_search_range(monkeypatch, angle, falls_back):
+    calls = []
+    monkeypatch.setattr(extractor, "min_area_rect_skew", lambda binary: calls.append(binary) or 0.0)
+
+    BookOCR(OCRConfig(deskew_max_angle=5)).preprocess_image(skewed_page(angle), "fast")
+
+    assert bool(calls) == falls_back
+
+
+class FakeTessAPI:
+    def __init__(self):
+        self.ended = False
+
+    def End(self):
+        self.ended = True
+
+
+def test_leaving_with_block_ends_tesseract_handles():
+    api = FakeTessAPI()
+    with BookOCR() as ocr:
+        ocr._tess_apis["eng"] = api
+
+    assert api.ended and ocr._tess_apis == {}
+
+
+def test_worker_pool_does_not_fork():
+    ocr = BookOCR(OCRConfig(workers=2))
+    with ocr._executor() as pool:
+        assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+        # A worker starts and initializes its own BookOCR
+        assert pool.submit(os.getpid).result() != os.getpid()
@@ -0,0 +1,46 @@
+"""GPTProcessor page routing."""
+
+import pytest
+
+from digitize.ai_processor.gpt_processor import GPTProcessor
+from digitize.config.settings import OpenAIConfig
+from digitize.ocr.extractor import TEXT_LAYER, OCRResult
+
+
+@pytest.fixture
+def processor():
+    config = OpenAIConfig(
+        api_key="test",
+        bypass_confidence=95,
+        cheap_model="gpt-4o-mini",
+        cheap_confidence=85,
+        local_cleanup=False,
+        cache_enabled=False,
+    )
+    return GPTProcessor(config)
+
+
+def page(confidence: float, text: str = "Some text", tier: str = "balanced") -> OCRResult:
+    return OCRResult("book.pdf", 1, text, confidence, "eng", tier=tier)
+
+
+def test_route_by_confidence(processor):
+    assert processor.route(page(97)) == "local"
+    assert processor.route(page(90)) == "cheap"
+    assert processor.route(page(60)) == "gpt"
+    assert processor.route(page(97, text="  \n")) == "empty"
+
+
+def test_text_layer_pages_skip_confidence_routing(processor):
+    assert processor.route(page(0, tier=TEXT_LAYER)) == "gpt"
+    # Checkpoints written before text-layer pages had no confidence
+    assert processor.route(page(100, tier=TEXT_LAYER)) == "gpt"
+    assert processor.route(page(100, text="", tier=TEXT_LAYER)) == "empty"
+
+
+def test_text_layer_prompt(processor):
+    [_, user] = processor._build_messages(page(0, tier=TEXT_LAYER))
+    assert "text layer" in user["content"]
+    assert "OCR confidence" not in user["content"]
+    [_, user] = processor._build_messages(page(72.5))
+    assert "OCR confidence: 72.5%" in user["content"]
@@ -0,0 +1,27 @@
+"""OCRCache size tracking and eviction."""
+
+from digitize.ocr.cache import OCRCache
+
+
+def disk_size(cache: OCRCache) -> int:
+    return sum(path.stat().st_size for path in cache.directory.glob("*/*.json"))
+
+
+def test_overwriting_an_entry_does_not_grow_the_tracked_size(tmp_path):
+    cache = OCRCache(str(tmp_path / "cache"), max_bytes=10_000)
+    cache.put("a" * 64, {"text": "first"})
+    for i in range(50):
+        cache.put("b" * 64, {"text": "x" * 100, "i": i})
+
+    assert cache._size == disk_size(cache)
+    assert cache.get("a" * 64) == {"text": "first"}
+
+
+def test_evicts_least_recently_used_over_the_limit(tmp_path):
+    cache = OCRCache(str(tmp_path / "cache"), max_bytes=1_000)
+    for i in range(20):
+        cache.put(f"{i:064x}", {"text": "x" * 100})
+
+    assert disk_size(cache) <= 900
+    assert cache._size == disk_size(cache)
+    assert cache.get(f"{19:064x}") is not None
@@ -0,0 +1,60 @@
+"""Schema upgrades of an existing database, on SQLite."""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import inspect, text
+
+from digitize.storage.repository import BookRepository
+
+# pages as created by the first release
+OLD_PAGES = """
+CREATE TABLE pages (
+    id INTEGER PRIMARY KEY,
+    book_id INTEGER NOT NULL REFERENCES books (id),
+    page_number INTEGER NOT NULL,
+    source_file VARCHAR(1000) NOT NULL,
+    chapter VARCHAR(500),
+    raw_ocr_text TEXT,
+    ocr_confidence FLOAT,
+    cleaned_text TEXT,
+    summary TEXT,
+    writing_style VARCHAR(500),
+    confidence_notes TEXT,
+    created_at DATETIME
+)
+"""
+
+
+def repository(tmp_path, pages_table: str) -> BookRepository:
+    repo = BookRepository(SimpleNamespace(connection_string=f"sqlite:///{tmp_path / 'books.db'}"))
+    with repo.engine.begin() as connection:
+        connection.execute(text("CREATE TABLE books (id INTEGER PRIMARY KEY, source_directory VARCHAR(1000) NOT NULL)"))
+        connection.execute(text(pages_table))
+    return repo
+
+
+def test_setup_adds_columns_missing_from_existing_tables(tmp_path):
+    repo = repository(tmp_path, OLD_PAGES)
+    with repo.engine.begin() as connection:
+        connection.execute(text("INSERT INTO books (id, source_directory) VALUES (1, '/scans')"))
+        connection.execute(text("INSERT INTO pages (book_id, page_number, source_file) VALUES (1, 1, '/scans/p1.png')"))
+
+    repo.create_tables()
+
+    columns = {column["name"] for column in inspect(repo.engine).get_columns("pages")}
+    assert {"source_page", "file_digest", "page_hash", "processing_path"} <= columns
+    assert "ix_pages_page_hash" in {index["name"] for index in inspect(repo.engine).get_indexes("pages")}
+    assert [row["source_file"] for row in repo.get_manifest(1)] == ["/scans/p1.png"]
+    # Nothing left to add on the next start
+    assert repo.add_missing_columns() == []
+
+
+def test_missing_required_column_fails_with_statements(tmp_path):
+    repo = repository(tmp_path, OLD_PAGES.replace("source_file VARCHAR(1000) NOT NULL,", ""))
+
+    with pytest.raises(RuntimeError, match="pages.source_file") as error:
+        repo.create_tables()
+
+    assert "ALTER TABLE pages ADD COLUMN source_file VARCHAR(1000)" in str(error.value)
+    assert "source_page" not in {column["name"] for column in inspect(repo.engine).get_columns("pages")}
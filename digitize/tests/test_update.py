@@ -0,0 +1,113 @@
+"""DigitizationPipeline.update() against an in-memory repository, with OCR and GPT faked."""
+
+import shutil
+
+import pytest
+
+from digitize.config.settings import PipelineConfig
+from digitize.ocr.extractor import OCRResult
+from digitize.pipeline.orchestrator import DigitizationPipeline
+from digitize.storage.manifest import manifest_entry
+
+
+class FakeRepository:
+    """Pages as manifest rows; update_pages applies moves and renumbering like the real one."""
+
+    def __init__(self, config=None):
+        self.source_directory = ""
+        self.rows: list[dict] = []
+
+    def get_book_info(self, book_id):
+        return {"source_directory": self.source_directory}
+
+    def get_manifest(self, book_id):
+        return [dict(row) for row in self.rows]
+
+    def update_pages(self, book_id, numbers, processed_pages, manifest, moved=None, source_directory=None):
+        moved = moved or {}
+        for row in self.rows:
+            row["source_file"] = moved.get(row["source_file"], row["source_file"])
+        rows = {(row["source_file"], row["source_page"]): row for row in self.rows}
+        for page in processed_pages:
+            rows[(page.source_file, page.source_page)] = {"source_file": page.source_file, "source_page": page.source_page}
+        self.rows = []
+        for key, number in sorted(numbers.items(), key=lambda item: item[1]):
+            row = rows[key] | {"page_number": number, "page_hash": ""}
+            entry = manifest.get(key[0])
+            if entry is not None:
+                row |= {"file_size": entry.size, "file_mtime": entry.mtime, "file_digest": entry.digest}
+            self.rows.append(row)
+        if source_directory:
+            self.source_directory = source_directory
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr("digitize.pipeline.orchestrator.BookRepository", FakeRepository)
+    config = PipelineConfig()
+    config.dedup_pages = False
+    config.openai.api_key = "test"
+    config.openai.book_metadata = False
+    pipeline = DigitizationPipeline(config)
+    pipeline.gpt_calls = []
+
+    def iter_file(file, skip):
+        yield OCRResult(file, 1, f"text of {file}", 90.0, "eng")
+
+    def process_batch(ocr_results, book=None):
+        pipeline.gpt_calls += [r.file_path for r in ocr_results]
+        processed = [pipeline.processor._text_only_result(r, r.raw_text, "") for r in ocr_results]
+        for page, result in zip(processed, ocr_results):
+            page.source_page = result.source_page
+        return processed
+
+    pipeline.ocr.iter_file = iter_file
+    pipeline.processor.process_batch = process_batch
+    yield pipeline
+    pipeline.close()
+
+
+def stored_book(pipeline, directory):
+    """Record every scan in `directory` as already digitized, one page per file."""
+    files = pipeline.source_files(str(directory))
+    pipeline.repository.source_directory = str(directory)
+    for number, file in enumerate(files, start=1):
+        entry = manifest_entry(file)
+        pipeline.repository.rows.append({
+            "page_number": number, "source_file": file, "source_page": 1, "page_hash": "",
+            "file_size": entry.size, "file_mtime": entry.mtime, "file_digest": entry.digest,
+        })
+
+
+def test_moved_book_is_not_reprocessed(pipeline, tmp_path):
+    old = tmp_path / "old"
+    old.mkdir()
+    for i in range(4):
+        (old / f"p{i}.png").write_bytes(f"scan {i}".encode())
+    stored_book(pipeline, old)
+
+    new = tmp_path / "new"
+    shutil.move(old, new)
+    # One page was re-scanned after the move
+    (new / "p2.png").write_bytes(b"scan 2, re-scanned")
+    report = pipeline.update(1, str(new))
+
+    assert report.moved == {str(old / f"p{i}.png"): str(new / f"p{i}.png") for i in (0, 1, 3)}
+    assert report.added == [str(new / "p2.png")] and report.removed == [str(old / "p2.png")]
+    assert pipeline.gpt_calls == [str(new / "p2.png")]
+    repository = pipeline.repository
+    assert [row["source_file"] for row in repository.rows] == [str(new / f"p{i}.png") for i in range(4)]
+    assert repository.source_directory == str(new)
+
+
+def test_renamed_file_keeps_its_pages(pipeline, tmp_path):
+    for i in range(2):
+        (tmp_path / f"p{i}.png").write_bytes(f"scan {i}".encode())
+    stored_book(pipeline, tmp_path)
+
+    (tmp_path / "p1.png").rename(tmp_path / "p0a.png")
+    report = pipeline.update(1)
+
+    assert report.moved == {str(tmp_path / "p1.png"): str(tmp_path / "p0a.png")}
+    assert not (report.added or report.removed or pipeline.gpt_calls)
+    assert [row["page_number"] for row in pipeline.repository.rows] == [1, 2]
@@ -0,0 +1,70 @@
+"""QueueWorker page jobs with OCR, GPT and storage faked."""
+
+import pytest
+
+from digitize.config.settings import PipelineConfig
+from digitize.ocr.extractor import OCRResult
+from digitize.pipeline.orchestrator import DigitizationPipeline
+from digitize.pipeline.worker import QueueWorker
+from digitize.storage.jobs import ClaimedJob
+from digitize.storage.manifest import manifest_entry
+
+
+class FakeRepository:
+    def __init__(self, config=None):
+        self.added = []
+
+    def has_page(self, book_id, page_number):
+        return False
+
+    def add_pages(self, book_id, pages, manifest=None):
+        self.added.append((book_id, pages, manifest))
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr("digitize.pipeline.orchestrator.BookRepository", FakeRepository)
+    config = PipelineConfig()
+    config.openai.api_key = "test"
+    pipeline = DigitizationPipeline(config)
+    pipeline.ocr.extract_page = lambda file, page: OCRResult(file, page, "text", 90.0, "eng")
+
+    def process_page(result):
+        processed = pipeline.processor._text_only_result(result, result.raw_text, "")
+        processed.source_page = result.source_page
+        return processed
+
+    pipeline.processor.process_page = process_page
+    yield pipeline
+    pipeline.close()
+
+
+def page_job(file_path, manifest) -> ClaimedJob:
+    return ClaimedJob(
+        id=1, kind="page", source_path=file_path, book_id=7, file_path=file_path, source_page=1,
+        page_number=3, page_hash=None, run_id=None, attempts=1, manifest=manifest,
+    )
+
+
+def test_page_is_stored_with_manifest_from_enqueue(pipeline, tmp_path):
+    scan = tmp_path / "p1.png"
+    scan.write_bytes(b"scanned at enqueue")
+    queued = manifest_entry(str(scan))
+    # Re-scanned while the job waited in the queue
+    scan.write_bytes(b"re-scanned before the job ran")
+
+    QueueWorker(pipeline, queue=None)._run_page(page_job(str(scan), queued))
+
+    [(book_id, [page], manifest)] = pipeline.repository.added
+    assert (book_id, page.page_number, page.source_page) == (7, 3, 1)
+    assert manifest == {str(scan): queued}
+
+
+def test_job_queued_without_manifest_stores_no_manifest(pipeline, tmp_path):
+    scan = tmp_path / "p1.png"
+    scan.write_bytes(b"scan")
+
+    QueueWorker(pipeline, queue=None)._run_page(page_job(str(scan), None))
+
+    [(_, _, manifest)] = pipeline.repository.added
+    assert manifest == {}